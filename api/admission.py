@@ -0,0 +1,202 @@
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+
+PRIORITIES = {"read": 1.0, "write": 0.75, "signup": 0.5}
+SHED_ON_LATENCY = ("write", "signup")
+
+_controller = None
+
+
+def admission_config():
+    config = getattr(settings, "ADMISSION_CONTROL", {})
+    return {
+        "ENABLED": config.get("ENABLED", True),
+        "RETRY_AFTER": config.get("RETRY_AFTER", 5),
+    }
+
+
+class AdmissionController:
+    """
+    Decides whether a request may start, from the number of requests in
+    flight and a moving average of recent request latency.
+
+    Each priority may fill its share of ``max_in_flight`` slots, so reads
+    keep the last slots to themselves. While the average latency is above
+    ``target_latency`` the priorities in ``shed_on_latency`` (signups and
+    writes) are refused outright and the instance reports itself saturated.
+
+    The average also halves every ``half_life`` seconds without a finished
+    request, so an instance drained by its load balancer, or refusing all
+    of its write traffic, recovers on its own.
+    """
+
+    def __init__(self, max_in_flight=32, target_latency=1.0, smoothing=0.2, half_life=5.0, priorities=None,
+                 shed_on_latency=SHED_ON_LATENCY):
+        self.max_in_flight = max_in_flight
+        self.target_latency = target_latency
+        self.smoothing = smoothing
+        self.half_life = half_life
+        self.priorities = PRIORITIES if priorities is None else priorities
+        self.shed_on_latency = tuple(shed_on_latency)
+        self.in_flight = 0
+        self.latency = 0.0
+        self.updated = time.monotonic()
+        self.admitted = 0
+        self.rejected = dict.fromkeys(self.priorities, 0)
+        self._lock = threading.Lock()
+
+    def limit(self, priority):
+        return max(1, int(self.max_in_flight * self.priorities.get(priority, 1.0)))
+
+    def current_latency(self, now=None):
+        """The average latency, decayed for the time since the last finished request."""
+        idle = (time.monotonic() if now is None else now) - self.updated
+        if idle <= 0:
+            return self.latency
+        return self.latency * 0.5 ** (idle / self.half_life)
+
+    def admit(self, priority):
+        with self._lock:
+            if self.in_flight >= self.limit(priority) or (
+                priority in self.shed_on_latency and self.current_latency() > self.target_latency
+            ):
+                self.rejected[priority] = self.rejected.get(priority, 0) + 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self, duration):
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            latency = self.current_latency(now)
+            self.latency = latency + self.smoothing * (duration - latency)
+            self.updated = now
+
+    def is_saturated(self):
+        return self.in_flight >= self.max_in_flight or self.current_latency() > self.target_latency
+
+    def reset(self):
+        with self._lock:
+            self.in_flight = 0
+            self.latency = 0.0
+            self.updated = time.monotonic()
+            self.admitted = 0
+            self.rejected = dict.fromkeys(self.priorities, 0)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "latency_seconds": self.current_latency(),
+                "target_latency_seconds": self.target_latency,
+                "saturated": int(self.is_saturated()),
+                "admitted": self.admitted,
+            }
+            for priority, count in self.rejected.items():
+                stats[f"rejected_{priority}"] = count
+        return stats
+
+
+def get_admission_controller():
+    global _controller
+    if _controller is None:
+        config = getattr(settings, "ADMISSION_CONTROL", {})
+        _controller = AdmissionController(
+            max_in_flight=config.get("MAX_IN_FLIGHT", 32),
+            target_latency=config.get("TARGET_LATENCY", 1.0),
+            smoothing=config.get("SMOOTHING", 0.2),
+            half_life=config.get("HALF_LIFE", 5.0),
+            priorities=config.get("PRIORITIES"),
+            shed_on_latency=config.get("SHED_ON_LATENCY", SHED_ON_LATENCY),
+        )
+    return _controller
+
+
+def is_saturated():
+    return admission_config()["ENABLED"] and get_admission_controller().is_saturated()
+
+
+def admission_exempt(view_func):
+    """Mark a view (health checks, metrics) as never shed and not counted."""
+    view_func.admission_exempt = True
+    return view_func
+
+
+def request_priority(view_func, method):
+    """The view's ``admission_priority`` (a name or a dict by method), else read or write by method."""
+    priority = getattr(getattr(view_func, "view_class", view_func), "admission_priority", None)
+    if isinstance(priority, dict):
+        priority = priority.get(method)
+    if priority is None:
+        priority = "read" if method in SAFE_METHODS else "write"
+    return priority
+
+
+class AdmissionControlMiddleware:
+    """
+    Load shedding: once the view is resolved, and before it runs, a request
+    is admitted by the ``AdmissionController`` or answered at once with
+    ``503`` and ``Retry-After``. Admitted requests feed their latency back
+    into the controller when they finish. Put it right after
+    ``MetricsMiddleware`` so shed requests are still counted.
+
+    Runs natively under ASGI: ``admit`` and ``release`` only take a short
+    lock, so the async branch calls them on the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Django runs a sync process_view through sync_to_async
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not admission_config()["ENABLED"]:
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            if getattr(request, "_admitted", False):
+                get_admission_controller().release(time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not admission_config()["ENABLED"]:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            if getattr(request, "_admitted", False):
+                get_admission_controller().release(time.perf_counter() - started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return self.admit(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return self.admit(request, view_func)
+
+    def admit(self, request, view_func):
+        config = admission_config()
+        if not config["ENABLED"] or getattr(view_func, "admission_exempt", False):
+            return None
+        if get_admission_controller().admit(request_priority(view_func, request.method)):
+            request._admitted = True
+            return None
+        response = JsonResponse({"detail": "Server overloaded, retry later."}, status=503)
+        response["Retry-After"] = str(config["RETRY_AFTER"])
+        return response
@@ -0,0 +1,18 @@
+from django.urls import path
+from . import urls
+from .async_views import AsyncProductCreateView, AsyncProductDetailView, AsyncUserDetailView
+from .views import ProductDetailView, ProductListCreateView, UserDetailView, UserSelfView
+
+# Native async versions of the busiest endpoints, used instead of api.urls
+# when ASYNC_API_VIEWS is on (serve through webapp.asgi). Every other route
+# falls through to the sync views, as do OPTIONS and the browsable API on
+# these routes (sync_view).
+urlpatterns = [
+    path("v1/user/<int:pk>/", AsyncUserDetailView.as_view(sync_view=UserDetailView.as_view()), name="user-detail"),
+    path("v1/user/self/", AsyncUserDetailView.as_view(sync_view=UserSelfView.as_view()), name="user-self"),
+    path("v1/product/", AsyncProductCreateView.as_view(sync_view=ProductListCreateView.as_view()), name="product-list"),
+    path(
+        "v1/product/<int:pk>/", AsyncProductDetailView.as_view(sync_view=ProductDetailView.as_view()),
+        name="product-detail",
+    ),
+] + urls.urlpatterns
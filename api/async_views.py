@@ -0,0 +1,265 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db import DEFAULT_DB_ALIAS, IntegrityError
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, serializers, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .authentication import CachedBasicAuthentication, CachedTokenAuthentication, invalidate_user_credentials
+from .conditional import ConditionalRequestMixin
+from .exceptions import Conflict
+from .models import Product, User
+from .product_cache import get_product_cache
+from .serializers import ProductSerializer, UserSerializer, PRODUCT_FIELDS, product_reader, user_reader
+from .serializers import parse_fieldset, select_fields
+from .throttling import BucketThrottle
+from .views import IsOwnerOrReadOnly, ProductDetailView
+
+
+class AsyncAPIView(View):
+    """
+    Small async counterpart of DRF's ``APIView``, whose dispatch is sync only.
+
+    Authenticates through the async paths of the cached authenticators,
+    parses bodies with DRF's parsers, negotiates the renderer and maps
+    exceptions through DRF's exception handler, so the async endpoints in
+    ``api.async_urls`` answer like their sync versions. What only the sync
+    view can answer, ``OPTIONS`` (metadata from its serializer) and the
+    browsable API, is handed to ``sync_view``.
+    """
+
+    authentication_classes = [CachedTokenAuthentication, CachedBasicAuthentication]
+    throttle_classes = [BucketThrottle]
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.accepted = api_settings.DEFAULT_RENDERER_CLASSES[0](), None
+        try:
+            renderer, media_type = self.negotiate(request)
+            if self.sync_view is not None and (request.method == "OPTIONS" or not isinstance(renderer, JSONRenderer)):
+                return await self.delegate(request, *args, **kwargs)
+            self.accepted = renderer, media_type
+            await self.authenticate(request)
+            self.check_throttles(request)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(request, response)
+
+    async def delegate(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    def negotiate(self, request):
+        renderers = [renderer_class() for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES]
+        if self.sync_view is None:
+            renderers = [renderer for renderer in renderers if isinstance(renderer, JSONRenderer)]
+        negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+        return negotiator.select_renderer(Request(request), renderers)
+
+    async def authenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            result = await authentication_class().aauthenticate(request)
+            if result is not None:
+                request.user, request.auth = result
+                return
+        request.user, request.auth = AnonymousUser(), None
+
+    def check_throttles(self, request):
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+
+    def parse(self, request):
+        parsers = [parser_class() for parser_class in api_settings.DEFAULT_PARSER_CLASSES]
+        return Request(request, parsers=parsers).data
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        if data is None:
+            return HttpResponse(status=status_code)
+        renderer, media_type = self.accepted
+        media_type = media_type or renderer.media_type
+        return HttpResponse(renderer.render(data, media_type), status=status_code, content_type=media_type)
+
+    def permission_denied(self, request, message=None):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(detail=message)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            exc.auth_header = self.authentication_classes[0]().authenticate_header(self.request)
+        context = {"view": self, "args": self.args, "kwargs": self.kwargs, "request": self.request}
+        response = api_settings.EXCEPTION_HANDLER(exc, context)
+        if response is None:
+            raise exc
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            if header != "Content-Type":
+                rendered[header] = value
+        return rendered
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        return response
+
+
+class AsyncProductSerializer(ProductSerializer):
+    # Uniqueness is checked by the view with an async query (check_unique_sku);
+    # the model field's UniqueValidator would query synchronously
+    sku = serializers.CharField(max_length=100)
+
+
+async def check_unique_sku(sku, exclude_pk=None):
+    if sku is not None and await Product.objects.filter(sku=sku).exclude(id=exclude_pk).aexists():
+        raise exceptions.ValidationError({"sku": ["SKU must be unique."]})
+
+
+class AsyncProductCreateView(AsyncAPIView):
+    http_method_names = ["get", "head", "post"]
+    query_budget = {"GET": 2, "POST": 3}
+    # GET is throttled by the DRF list view it delegates to
+    throttle_scope = {"GET": None, "HEAD": None}
+
+    async def get(self, request):
+        # Keyset pagination is sync; listing stays on the DRF view
+        return await self.delegate(request)
+
+    async def post(self, request):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        serializer = AsyncProductSerializer(data=self.parse(request))
+        serializer.is_valid(raise_exception=True)
+        await check_unique_sku(serializer.validated_data.get("sku"))
+        try:
+            product = await Product.objects.acreate(owner=request.user, **serializer.validated_data)
+        except IntegrityError:
+            raise exceptions.ValidationError({"sku": ["SKU must be unique."]})
+        return self.render(AsyncProductSerializer(product).data, status.HTTP_201_CREATED)
+
+
+class AsyncProductDetailView(ConditionalRequestMixin, AsyncAPIView):
+    http_method_names = ["get", "head", "put", "patch", "delete"]
+    query_budget = {"GET": 2, "PUT": 4, "PATCH": 4, "DELETE": 7}
+    throttle_scope = {"GET": "product_read", "HEAD": "product_read"}
+    last_modified_field = "date_updated"
+
+    @staticmethod
+    async def load_entry(pk):
+        # From the primary, as in ProductDetailView.load_entry
+        product = await Product.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).afirst()
+        if product is None:
+            return None
+        return {"data": product_reader.to_representation(product), "last_modified": product.date_updated}
+
+    async def get_object(self, request, pk):
+        product = await Product.objects.filter(pk=pk).afirst()
+        if product is None:
+            raise exceptions.NotFound()
+        if not IsOwnerOrReadOnly().has_object_permission(request, self, product):
+            self.permission_denied(request)
+        return product
+
+    async def get(self, request, pk):
+        fieldset = parse_fieldset(request.GET, PRODUCT_FIELDS)
+        entry = await get_product_cache().aget_or_load(pk, self.load_entry)
+        if entry is None:
+            raise exceptions.NotFound()
+        self.enforce_preconditions(request, entry["last_modified"])
+        return self.render(select_fields(entry["data"], fieldset))
+
+    async def put(self, request, pk, partial=False):
+        instance = await self.get_object(request, pk)
+        self.enforce_preconditions(request, instance.date_updated)
+        serializer = AsyncProductSerializer(instance, data=self.parse(request), partial=partial)
+        serializer.is_valid(raise_exception=True)
+        changes = ProductDetailView.changed_fields(instance, serializer.validated_data)
+        if changes:
+            await check_unique_sku(changes.get("sku"), instance.pk)
+            now = timezone.now()
+            try:
+                updated = await Product.objects.filter(
+                    pk=instance.pk, date_updated=instance.date_updated
+                ).aupdate(date_updated=now, **changes)
+            except IntegrityError:
+                raise exceptions.ValidationError({"sku": ["SKU must be unique."]})
+            if not updated:
+                raise Conflict()
+            for field, value in changes.items():
+                setattr(instance, field, value)
+            instance.date_updated = now
+            await get_product_cache().ainvalidate(instance.pk)
+        self.set_last_modified(instance)
+        return self.render(serializer.data)
+
+    async def patch(self, request, pk):
+        return await self.put(request, pk, partial=True)
+
+    async def delete(self, request, pk):
+        instance = await self.get_object(request, pk)
+        self.enforce_preconditions(request, instance.date_updated)
+        deleted, _ = await Product.objects.filter(pk=instance.pk, date_updated=instance.date_updated).adelete()
+        if not deleted:
+            raise Conflict()
+        return self.render(None, status.HTTP_204_NO_CONTENT)
+
+
+class AsyncUserDetailView(ConditionalRequestMixin, AsyncAPIView):
+    """Serves both ``/v1/user/<pk>/`` and ``/v1/user/self/``."""
+
+    http_method_names = ["get", "head", "put", "patch"]
+    query_budget = {"GET": 2, "PUT": 3, "PATCH": 3}
+    last_modified_field = "account_updated"
+    disallowed_fields = {"email", "account_created", "account_updated"}
+
+    async def check_access(self, request, pk):
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+        if pk is not None and pk != request.user.pk:
+            if not await User.objects.filter(pk=pk).aexists():
+                raise exceptions.NotFound()
+            raise exceptions.PermissionDenied("You cannot access this user.")
+
+    async def get(self, request, pk=None):
+        await self.check_access(request, pk)
+        # request.user was just loaded by authentication; no query needed
+        self.enforce_preconditions(request, request.user.account_updated)
+        return self.render(user_reader.to_representation(request.user))
+
+    async def put(self, request, pk=None, partial=False):
+        await self.check_access(request, pk)
+        instance = await User.objects.aget(pk=request.user.pk)
+        self.enforce_preconditions(request, instance.account_updated)
+        data = self.parse(request)
+        if any(field in data for field in self.disallowed_fields):
+            return self.render(
+                {"error": "You can only update first_name, last_name, or password."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = UserSerializer(instance, data=data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+
+        changes = dict(serializer.validated_data)
+        password = changes.pop("password", None)
+        for field, value in changes.items():
+            setattr(instance, field, value)
+        if password is not None:
+            await instance.aset_password(password)
+            invalidate_user_credentials(instance.pk)
+        await instance.asave()
+        self.set_last_modified(instance)
+        return self.render(UserSerializer(instance).data)
+
+    async def patch(self, request, pk=None):
+        return await self.put(request, pk, partial=True)
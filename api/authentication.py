@@ -0,0 +1,292 @@
+import base64
+import binascii
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication, get_authorization_header
+
+from .caching import LRUCache
+from .hashing import ahash_password, averify_password
+from .throttling import check_auth_failures, record_auth_failure
+
+
+_credential_cache = None
+_token_cache = None
+_token_shared_stats = {"hits": 0, "misses": 0}
+
+
+def _build_cache(setting_name, max_size, ttl):
+    config = getattr(settings, setting_name, {})
+    return LRUCache(max_size=config.get("MAX_SIZE", max_size), ttl=config.get("TTL", ttl))
+
+
+def get_credential_cache():
+    global _credential_cache
+    if _credential_cache is None:
+        _credential_cache = _build_cache("BASIC_AUTH_CACHE", 1024, 300)
+    return _credential_cache
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = _build_cache("TOKEN_AUTH_CACHE", 4096, 60)
+    return _token_cache
+
+
+def get_shared_token_cache():
+    alias = getattr(settings, "TOKEN_AUTH_CACHE", {}).get("SHARED_CACHE")
+    return caches[alias] if alias else None
+
+
+def credential_cache_key(userid, password):
+    # Keyed digest so raw passwords never sit in memory as cache keys
+    return salted_hmac(
+        "api.authentication.credential_cache_key",
+        f"{userid}\x00{password}",
+        algorithm="sha256",
+    ).hexdigest()
+
+
+def invalidate_user_credentials(user_id):
+    return get_credential_cache().delete_where(lambda entry: entry[0] == user_id)
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    """
+    Basic authentication that remembers recently verified credentials so the
+    password hasher (bcrypt) only runs on a cache miss.
+
+    A hit still loads the user by primary key and compares the stored password
+    hash, so a password changed through any code path invalidates the entry.
+    Failed attempts are counted per client IP and per account
+    (``THROTTLING["AUTH_FAILURES"]``); once either runs out, a miss is refused
+    with a 429 before the hasher runs.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        cache = get_credential_cache()
+        key = credential_cache_key(userid, password)
+
+        entry = cache.get(key)
+        if entry is not None:
+            user_id, password_hash = entry
+            user = get_user_model()._default_manager.filter(pk=user_id).first()
+            if user is not None and user.is_active and user.password == password_hash:
+                return (user, None)
+            cache.delete(key)
+
+        check_auth_failures(request, userid)
+        try:
+            user, auth = super().authenticate_credentials(userid, password, request)
+        except exceptions.AuthenticationFailed:
+            record_auth_failure(request, userid)
+            raise
+        cache.set(key, (user.pk, user.password))
+        return (user, auth)
+
+    async def aauthenticate(self, request):
+        # Used by api.async_views; password checks run on the hashing pool
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != b"basic":
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid basic header."))
+        try:
+            userid, sep, password = base64.b64decode(auth[1]).decode().partition(":")
+        except (TypeError, ValueError, binascii.Error):
+            raise exceptions.AuthenticationFailed(_("Invalid basic header. Credentials not correctly base64 encoded."))
+        return await self.aauthenticate_credentials(userid, password, request)
+
+    async def aauthenticate_credentials(self, userid, password, request=None):
+        cache = get_credential_cache()
+        key = credential_cache_key(userid, password)
+        manager = get_user_model()._default_manager
+
+        entry = cache.get(key)
+        if entry is not None:
+            user_id, password_hash = entry
+            user = await manager.filter(pk=user_id).afirst()
+            if user is not None and user.is_active and user.password == password_hash:
+                return (user, None)
+            cache.delete(key)
+
+        check_auth_failures(request, userid)
+        user = await manager.filter(**{get_user_model().USERNAME_FIELD: userid}).afirst()
+        if user is None:
+            # Hash anyway so an unknown account takes as long as a wrong password
+            await ahash_password(password)
+            record_auth_failure(request, userid)
+            raise exceptions.AuthenticationFailed(_("Invalid username/password."))
+        is_correct, must_update = await averify_password(password, user.password)
+        if not is_correct or not user.is_active:
+            record_auth_failure(request, userid)
+            raise exceptions.AuthenticationFailed(_("Invalid username/password."))
+        if must_update:
+            await user.aset_password(password)
+            await user.asave(update_fields=["password"])
+        cache.set(key, (user.pk, user.password))
+        return (user, None)
+
+
+def shared_token_cache_key(key):
+    return f"api:token:{key}"
+
+
+def token_generation_key(user_id):
+    return f"api:token:user:{user_id}"
+
+
+def token_generation(shared, user_id):
+    """The user's token generation in the shared cache, created if missing."""
+    key = token_generation_key(user_id)
+    generation = shared.get(key)
+    if generation is None:
+        shared.add(key, uuid.uuid4().hex, None)
+        generation = shared.get(key)
+    return generation
+
+
+def bump_token_generation(user_id):
+    # Every worker's cached entries of the user stop matching
+    shared = get_shared_token_cache()
+    if shared is not None:
+        shared.set(token_generation_key(user_id), uuid.uuid4().hex, None)
+
+
+def invalidate_token(key, user_id=None):
+    get_token_cache().delete(key)
+    shared = get_shared_token_cache()
+    if shared is not None:
+        shared.delete(shared_token_cache_key(key))
+    if user_id is not None:
+        bump_token_generation(user_id)
+
+
+def invalidate_user_tokens(user_id):
+    get_token_cache().delete_where(lambda entry: entry[0] == user_id)
+    bump_token_generation(user_id)
+
+
+def token_cache_stats():
+    stats = get_token_cache().stats()
+    stats["shared_hits"] = _token_shared_stats["hits"]
+    stats["shared_misses"] = _token_shared_stats["misses"]
+    return stats
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication backed by a process-local LRU and an optional shared
+    Django cache (``TOKEN_AUTH_CACHE["SHARED_CACHE"]``).
+
+    Each entry is a compact snapshot of the token and its user, rebuilt with
+    ``Model.from_db`` so a cache hit costs no queries. The password hash is left
+    out of the snapshot; it is loaded lazily if a view actually needs it.
+
+    Without a shared cache, invalidation only reaches the local LRU: other
+    processes keep a revoked token or an inactive user for up to
+    ``TOKEN_AUTH_CACHE["TTL"]`` seconds. With one, entries carry the user's
+    generation from the shared cache (see ``bump_token_generation``) and a
+    hit is checked against it, so revocation reaches every process at once.
+    """
+
+    snapshot_exclude = ("password",)
+
+    def get_user_field_names(self):
+        return [
+            field.attname for field in get_user_model()._meta.concrete_fields
+            if field.attname not in self.snapshot_exclude
+        ]
+
+    def snapshot(self, token, generation=None):
+        user = token.user
+        values = tuple(getattr(user, name) for name in self.get_user_field_names())
+        return (user.pk, token.created, values, generation)
+
+    def restore(self, key, entry):
+        user_model = get_user_model()
+        _, created, values, _ = entry
+        user = user_model.from_db(
+            router.db_for_read(user_model), self.get_user_field_names(), values
+        )
+        token_model = self.get_model()
+        token = token_model.from_db(
+            router.db_for_read(token_model), ["key", "user_id", "created"], (key, user.pk, created)
+        )
+        token.user = user
+        return token
+
+    def is_current(self, entry):
+        shared = get_shared_token_cache()
+        return shared is None or shared.get(token_generation_key(entry[0])) == entry[3]
+
+    async def ais_current(self, entry):
+        shared = get_shared_token_cache()
+        return shared is None or await shared.aget(token_generation_key(entry[0])) == entry[3]
+
+    def lookup(self, key):
+        entry = get_token_cache().get(key)
+        if entry is not None and self.is_current(entry):
+            return entry
+        return self.load(key)
+
+    def load(self, key):
+        local = get_token_cache()
+        shared = get_shared_token_cache()
+        if shared is not None:
+            entry = shared.get(shared_token_cache_key(key))
+            if entry is not None and self.is_current(entry):
+                _token_shared_stats["hits"] += 1
+                local.set(key, entry)
+                return entry
+            _token_shared_stats["misses"] += 1
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related("user").get(key=key)
+        except model.DoesNotExist:
+            return None
+
+        entry = self.snapshot(token, token_generation(shared, token.user_id) if shared is not None else None)
+        local.set(key, entry)
+        if shared is not None:
+            shared.set(shared_token_cache_key(key), entry, local.ttl)
+        return entry
+
+    def authenticate_credentials(self, key):
+        return self.credentials_from_entry(key, self.lookup(key))
+
+    async def aauthenticate(self, request):
+        # Used by api.async_views
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_("Invalid token header. Token string should not contain invalid characters."))
+        # Cache hits need no I/O; only a miss hops to a thread for the lookup
+        entry = get_token_cache().get(key)
+        if entry is None or not await self.ais_current(entry):
+            entry = await sync_to_async(self.load)(key)
+        return self.credentials_from_entry(key, entry)
+
+    def credentials_from_entry(self, key, entry):
+        if entry is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        token = self.restore(key, entry)
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        return (token.user, token)
@@ -0,0 +1,93 @@
+import calendar
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def version_etag(last_modified):
+    # Microsecond resolution, unlike Last-Modified which only carries seconds
+    micros = calendar.timegm(last_modified.utctimetuple()) * 1_000_000 + last_modified.microsecond
+    return quote_etag(format(micros, "x"))
+
+
+class PreconditionResponse(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalRequestMixin:
+    """
+    Adds ETag / Last-Modified validators to a DRF view.
+
+    ``get_last_modified()`` must be a cheap lookup (a cached value or a narrow
+    ``values_list`` query) that never loads or serializes the full object. The
+    default reads ``last_modified_field`` of the object a generic view looks
+    up by ``lookup_field``; views without that field get no validators.
+
+    GET/HEAD answer 304 for a matching ``If-None-Match`` or
+    ``If-Modified-Since``; writes answer 412 when ``If-Match`` or
+    ``If-Unmodified-Since`` does not match the current version. Preconditions
+    are evaluated after authentication and permission checks.
+    """
+
+    conditional_methods = ("GET", "HEAD", "PUT", "PATCH", "DELETE")
+    last_modified_field = None
+
+    def get_last_modified(self):
+        if self.last_modified_field is None:
+            return None
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list(self.last_modified_field, flat=True)
+            .first()
+        )
+
+    def get_etag(self, last_modified):
+        return version_etag(last_modified)
+
+    def set_last_modified(self, instance):
+        # Called after a write so the response carries the new validators
+        self.last_modified = getattr(instance, self.last_modified_field)
+
+    def check_preconditions(self, request):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            # Unknown or forbidden resource; let the handler produce its 404/403
+            return None
+        return self.evaluate_preconditions(request, last_modified)
+
+    def evaluate_preconditions(self, request, last_modified):
+        self.last_modified = last_modified
+        return get_conditional_response(
+            request,
+            etag=self.get_etag(last_modified),
+            last_modified=calendar.timegm(last_modified.utctimetuple()),
+        )
+
+    def enforce_preconditions(self, request, last_modified):
+        # For handlers that evaluate preconditions against an object they already loaded
+        response = self.evaluate_preconditions(request, last_modified)
+        if response is not None:
+            raise PreconditionResponse(response)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in self.conditional_methods and hasattr(self, request.method.lower()):
+            response = self.check_preconditions(request)
+            if response is not None:
+                raise PreconditionResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, PreconditionResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        last_modified = getattr(self, "last_modified", None)
+        if last_modified is not None and response.status_code in (200, 304) and request.method != "DELETE":
+            response["ETag"] = self.get_etag(last_modified)
+            response["Last-Modified"] = http_date(calendar.timegm(last_modified.utctimetuple()))
+        return response
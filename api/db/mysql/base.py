@@ -0,0 +1,9 @@
+from django.db.backends.mysql import base
+
+from api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    @staticmethod
+    def check_connection(connection):
+        connection.ping()
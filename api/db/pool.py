@@ -0,0 +1,230 @@
+import functools
+import os
+import threading
+import time
+
+from django.db import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections for one database alias.
+
+    At most ``max_size`` connections exist at once; callers beyond that wait
+    up to ``timeout`` seconds for one to be released and then get
+    ``PoolTimeout``. Idle connections are reused most-recently-released
+    first, pinged with ``check`` when they sat idle longer than
+    ``check_interval``, and closed once older than ``max_lifetime`` or idle
+    longer than ``max_idle`` seconds.
+    """
+
+    def __init__(self, max_size=10, timeout=5, max_lifetime=1800, max_idle=300, check_interval=30, check=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_interval = check_interval
+        self.check = check
+        # Idle connections as (connection, created_at, released_at), newest last
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._cond:
+            self.counters = {
+                "acquired": 0, "created": 0, "reused": 0, "closed": 0, "recycled": 0,
+                "failed_checks": 0, "waits": 0, "timeouts": 0,
+            }
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self.counters)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["max_size"] = self.max_size
+            stats["wait_time_total"] = self.wait_time_total
+            stats["wait_time_max"] = self.wait_time_max
+        return stats
+
+    def _expired(self, created_at, released_at, now):
+        return (
+            (self.max_lifetime is not None and now - created_at > self.max_lifetime)
+            or (self.max_idle is not None and now - released_at > self.max_idle)
+        )
+
+    def _discard(self, connection, counter="closed"):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created_at.pop(id(connection), None)
+            self._size -= 1
+            self.counters[counter] += 1
+            self._cond.notify()
+
+    def acquire(self, connect):
+        """
+        Return ``(connection, reused)``, calling ``connect()`` when a new
+        connection is needed.
+        """
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self.counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {self.timeout}s "
+                            f"(pool size {self.max_size})."
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    connection, created_at, released_at = self._idle.pop()
+                else:
+                    connection = None
+                    self._size += 1
+                if waited:
+                    elapsed = time.monotonic() - started
+                    self.counters["waits"] += 1
+                    self.wait_time_total += elapsed
+                    self.wait_time_max = max(self.wait_time_max, elapsed)
+                    waited = False
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._created_at[id(connection)] = time.monotonic()
+                    self.counters["created"] += 1
+                    self.counters["acquired"] += 1
+                return connection, False
+
+            now = time.monotonic()
+            if self._expired(created_at, released_at, now):
+                self._discard(connection, "recycled")
+                continue
+            if self.check is not None and now - released_at > self.check_interval:
+                try:
+                    self.check(connection)
+                except Exception:
+                    self._discard(connection, "failed_checks")
+                    continue
+            with self._cond:
+                self.counters["acquired"] += 1
+                self.counters["reused"] += 1
+            return connection, True
+
+    def release(self, connection, discard=False):
+        now = time.monotonic()
+        with self._cond:
+            created_at = self._created_at.get(id(connection), now)
+        if discard or self._expired(created_at, now, now):
+            self._discard(connection, "closed" if discard else "recycled")
+            return
+        with self._cond:
+            self._idle.append((connection, created_at, now))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = None
+
+
+def get_pool(alias, config, check=None):
+    """The process-wide pool for ``alias``, created on first use (and again after a fork)."""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Connections inherited from a parent process must not be shared
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                max_size=config.get("MAX_SIZE", 10),
+                timeout=config.get("TIMEOUT", 5),
+                max_lifetime=config.get("MAX_LIFETIME", 1800),
+                max_idle=config.get("MAX_IDLE", 300),
+                check_interval=config.get("CHECK_INTERVAL", 30),
+                check=check,
+            )
+        return pool
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Hands Django connections out of a ``ConnectionPool``: ``close()`` returns
+    the connection to the pool instead of closing it, so a request reuses an
+    open connection without a new handshake. Configured by the ``POOL`` dict
+    of the ``DATABASES`` entry; use ``CONN_MAX_AGE = 0`` so every request
+    gives its connection back.
+    """
+
+    pool_reused = False
+
+    @staticmethod
+    def check_connection(connection):
+        # Generic DB-API ping; backends override it with a cheaper native one
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict.get("POOL", {}), self.check_connection)
+
+    def get_new_connection(self, conn_params):
+        connection, self.pool_reused = self.get_pool().acquire(
+            functools.partial(super().get_new_connection, conn_params)
+        )
+        return connection
+
+    def init_connection_state(self):
+        # Session state set on the first checkout survives in the pool
+        if not self.pool_reused:
+            super().init_connection_state()
+
+    def _close(self):
+        connection = self.connection
+        discard = self.errors_occurred and not self.is_usable()
+        if not discard and (self.in_atomic_block or not self.autocommit):
+            # Never hand out a connection with a transaction still open
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+        self.get_pool().release(connection, discard=discard)
@@ -0,0 +1,7 @@
+from django.db.backends.sqlite3 import base
+
+from api.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """Pooled SQLite, for tests and benchmarks of the pool (file databases only)."""
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+import zlib
+from datetime import timezone as dt_timezone
+
+from .models import Product
+from .serializers import format_datetime
+
+
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# (output key, column) pairs; keys match ProductSerializer
+EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("name", "name"),
+    ("description", "description"),
+    ("sku", "sku"),
+    ("manufacturer", "manufacturer"),
+    ("quantity", "quantity"),
+    ("owner", "owner_id"),
+    ("date_added", "date_added"),
+]
+
+
+def iter_product_rows(queryset, chunk_size=2000):
+    """
+    Yield lists of product tuples, ``chunk_size`` rows at a time.
+
+    Chunks are fetched with keyset pagination on ``id`` rather than a single
+    cursor, because the MySQL driver buffers whole result sets client-side.
+    """
+    columns = [column for _, column in EXPORT_COLUMNS]
+    date_index = columns.index("date_added")
+    queryset = queryset.order_by("id").values_list(*columns)
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [
+            row[:date_index] + (format_datetime(row[date_index], dt_timezone.utc),) + row[date_index + 1:]
+            for row in rows
+        ]
+
+
+def render_ndjson(chunks):
+    keys = [key for key, _ in EXPORT_COLUMNS]
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows).encode()
+
+
+def render_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([key for key, _ in EXPORT_COLUMNS])
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def gzip_chunks(chunks):
+    # Sync-flush after every chunk so clients can decompress as data arrives
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def export_products(fmt, owner_id=None, compress=False, chunk_size=2000):
+    queryset = Product.objects.all()
+    if owner_id is not None:
+        queryset = queryset.filter(owner_id=owner_id)
+    chunks = RENDERERS[fmt](iter_product_rows(queryset, chunk_size))
+    return gzip_chunks(chunks) if compress else chunks
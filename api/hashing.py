@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher, make_password, verify_password
+
+from .exceptions import HashingBusy
+
+
+class ConfigurableBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """
+    ``bcrypt_sha256`` with the work factor taken from
+    ``PASSWORD_HASHING["BCRYPT_ROUNDS"]``. Hashes made with other rounds still
+    verify and are upgraded on the next successful login.
+    """
+
+    @property
+    def rounds(self):
+        return getattr(settings, "PASSWORD_HASHING", {}).get("BCRYPT_ROUNDS", 12)
+
+
+def init_worker(settings_module):
+    # Worker processes may be spawned rather than forked; configure Django there too
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+class PasswordHashingService:
+    """
+    Runs password hashing on a bounded pool instead of the request thread.
+
+    At most ``max_pending`` hashes are queued or running; further callers wait
+    up to ``acquire_timeout`` seconds for a slot and then get ``HashingBusy``
+    (503) rather than piling up behind the pool. ``hash_password`` blocks the
+    calling thread; ``ahash_password`` and ``averify_password`` await without
+    blocking the event loop.
+    """
+
+    poll_interval = 0.01
+
+    def __init__(self, executor="thread", workers=4, max_pending=64, acquire_timeout=2):
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._pool = None
+        self.reset_stats()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._stats_lock:
+                if self._pool is None:
+                    if self.executor == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            initializer=init_worker,
+                            initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "webapp.settings"),),
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+        return self._pool
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.counters = {"submitted": 0, "completed": 0, "rejected": 0, "queue_depth": 0}
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self.counters)
+            stats["latency_avg"] = self.latency_total / stats["completed"] if stats["completed"] else 0.0
+            stats["latency_max"] = self.latency_max
+        stats["max_pending"] = self.max_pending
+        stats["workers"] = self.workers
+        return stats
+
+    def _reject(self):
+        with self._stats_lock:
+            self.counters["rejected"] += 1
+        raise HashingBusy()
+
+    def _submit(self, func, *args):
+        started = time.monotonic()
+        with self._stats_lock:
+            self.counters["submitted"] += 1
+            self.counters["queue_depth"] += 1
+        try:
+            future = self.pool.submit(func, *args)
+        except BaseException:
+            self._done(started)
+            raise
+        future.add_done_callback(lambda _: self._done(started))
+        return future
+
+    def _done(self, started):
+        elapsed = time.monotonic() - started
+        with self._stats_lock:
+            self.counters["completed"] += 1
+            self.counters["queue_depth"] -= 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+        self._slots.release()
+
+    def run(self, func, *args):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            self._reject()
+        return self._submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        # A blocking acquire would stall the event loop, so poll for a slot
+        deadline = time.monotonic() + self.acquire_timeout
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                self._reject()
+            await asyncio.sleep(self.poll_interval)
+        return await asyncio.wrap_future(self._submit(func, *args))
+
+    def hash_password(self, password):
+        return self.run(make_password, password)
+
+    async def ahash_password(self, password):
+        return await self.arun(make_password, password)
+
+    async def averify_password(self, password, encoded):
+        """Return ``(is_correct, must_update)`` like ``django.contrib.auth.hashers.verify_password``."""
+        return await self.arun(verify_password, password, encoded)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+_hashing_service = None
+
+
+def get_hashing_service():
+    global _hashing_service
+    if _hashing_service is None:
+        config = getattr(settings, "PASSWORD_HASHING", {})
+        _hashing_service = PasswordHashingService(
+            executor=config.get("EXECUTOR", "thread"),
+            workers=config.get("WORKERS", 4),
+            max_pending=config.get("MAX_PENDING", 64),
+            acquire_timeout=config.get("ACQUIRE_TIMEOUT", 2),
+        )
+    return _hashing_service
+
+
+def hash_password(password):
+    return get_hashing_service().hash_password(password)
+
+
+async def ahash_password(password):
+    return await get_hashing_service().ahash_password(password)
+
+
+async def averify_password(password, encoded):
+    return await get_hashing_service().averify_password(password, encoded)
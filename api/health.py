@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Row reused by the "heartbeat" probe mode instead of inserting a new row per check
+HEARTBEAT_ID = 1
+
+
+class HealthProber:
+    """
+    Keeps the latest database readiness result in memory.
+
+    With ``HEALTHCHECK["BACKGROUND"]`` enabled a daemon thread refreshes the
+    result every ``PROBE_INTERVAL`` seconds, so ``/healthz`` answers without
+    touching the database. A missing or stale result is refreshed inline.
+    """
+
+    def __init__(self, interval=5, mode="select", background=True, using="default"):
+        self.interval = interval
+        self.mode = mode
+        self.background = background
+        self.using = using
+        self.healthy = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def check(self):
+        if self.mode == "heartbeat":
+            from .models import HealthCheck
+            now = timezone.now()
+            if not HealthCheck.objects.using(self.using).filter(pk=HEARTBEAT_ID).update(checked_at=now):
+                HealthCheck.objects.using(self.using).get_or_create(pk=HEARTBEAT_ID)
+        else:
+            with connections[self.using].cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+
+    def probe(self):
+        try:
+            self.check()
+            healthy = True
+        except DatabaseError:
+            logger.warning("Database readiness probe failed", exc_info=True)
+            # Drop the broken connection so the next probe reconnects
+            connections[self.using].close()
+            healthy = False
+        with self._lock:
+            self.healthy = healthy
+            self.checked_at = time.monotonic()
+        return healthy
+
+    def is_stale(self):
+        # Allow a couple of missed background ticks before probing inline
+        return self.checked_at is None or time.monotonic() - self.checked_at > self.interval * 3
+
+    def is_ready(self):
+        if self.background:
+            self.start()
+        if self.is_stale():
+            return self.probe()
+        return self.healthy
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="healthz-prober", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self.probe()
+            time.sleep(self.interval)
+
+
+_prober = None
+
+
+def get_prober():
+    global _prober
+    if _prober is None:
+        config = getattr(settings, "HEALTHCHECK", {})
+        _prober = HealthProber(
+            interval=config.get("PROBE_INTERVAL", 5),
+            mode=config.get("PROBE_MODE", "select"),
+            background=config.get("BACKGROUND", True),
+        )
+    return _prober
@@ -0,0 +1,176 @@
+import csv
+import json
+
+from django.db import connections, router, transaction
+from rest_framework import serializers
+
+from .exceptions import Conflict
+from .models import Product
+from .product_cache import get_product_cache
+from .serializers import ProductSerializer
+
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonlines": "ndjson",
+}
+
+UPSERT_FIELDS = ["name", "description", "manufacturer", "quantity", "date_updated"]
+# Chunks that raced another user's insert of the same SKU are retried this often
+RACE_RETRIES = 3
+
+
+class SkuTakenConcurrently(Exception):
+    pass
+
+
+class ProductImportSerializer(ProductSerializer):
+    # Plain field: SKU uniqueness is checked once per chunk by ProductImporter,
+    # not by a UniqueValidator/validate_sku query per row.
+    sku = serializers.CharField(max_length=100)
+
+    def validate_sku(self, value):
+        return value
+
+
+def iter_lines(stream):
+    # Works with files opened in binary mode and with Django's HttpRequest
+    for line in stream:
+        yield line.decode("utf-8") if isinstance(line, bytes) else line
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(row_number, data, error)`` tuples without reading the whole stream."""
+    lines = iter_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for number, row in enumerate(reader, start=1):
+            yield number, row, None
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield number, None, {"non_field_errors": ["Invalid JSON."]}
+            continue
+        if not isinstance(data, dict):
+            yield number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        yield number, data, None
+
+
+class ProductImporter:
+    """
+    Upserts products for ``owner`` on ``sku`` in chunks.
+
+    Every chunk costs one SKU lookup plus one ``bulk_create`` upsert inside its
+    own transaction. Rows whose SKU belongs to another user are reported as
+    errors instead of being overwritten. Owners are checked again after the
+    upsert: if another user inserted one of the SKUs in between, the chunk is
+    rolled back and retried, and then reports that row as an error.
+    """
+
+    def __init__(self, owner, chunk_size=500):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    def run(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+    def import_chunk(self, chunk):
+        valid = {}
+        for number, data, error in chunk:
+            if error is None:
+                serializer = ProductImportSerializer(data=data)
+                if serializer.is_valid():
+                    sku = serializer.validated_data["sku"]
+                    if sku in valid:
+                        error = {"sku": ["Duplicate SKU in import."]}
+                    else:
+                        valid[sku] = (number, serializer.validated_data)
+                        continue
+                else:
+                    error = serializer.errors
+            self.errors.append({"row": number, "errors": error})
+
+        if not valid:
+            return
+
+        for _ in range(RACE_RETRIES):
+            try:
+                errors, created, updated = self.upsert(valid)
+                break
+            except SkuTakenConcurrently:
+                continue
+        else:
+            raise Conflict("SKUs in this import were created concurrently by another user. Retry the import.")
+        self.errors.extend(errors)
+        self.created += created
+        self.updated += updated
+
+    @staticmethod
+    def lookup(skus):
+        """``{sku: (id, owner_id)}`` of the products that already exist."""
+        return {
+            sku: (pk, owner_id)
+            for sku, pk, owner_id in Product.objects.filter(sku__in=skus).values_list("sku", "id", "owner_id")
+        }
+
+    def upsert(self, valid):
+        """Upsert one chunk of ``{sku: (row number, data)}``; returns ``(errors, created, updated)``."""
+        errors = []
+        with transaction.atomic():
+            existing = self.lookup(list(valid))
+            products = []
+            for sku, (number, data) in valid.items():
+                if existing.get(sku, (None, self.owner.pk))[1] != self.owner.pk:
+                    errors.append({"row": number, "errors": {"sku": ["SKU must be unique."]}})
+                    continue
+                products.append(Product(owner=self.owner, **data))
+            if not products:
+                return errors, 0, 0
+
+            Product.objects.bulk_create(products, update_conflicts=True, update_fields=UPSERT_FIELDS, **upsert_target())
+            # owner_id is not an update field, so a row another user inserted
+            # since the lookup keeps its owner and shows up here
+            skus = [product.sku for product in products if product.sku not in existing]
+            if skus and Product.objects.filter(sku__in=skus).exclude(owner_id=self.owner.pk).exists():
+                raise SkuTakenConcurrently()
+
+        # bulk_create sends no post_save, so drop cached copies of updated rows
+        updated = [existing[product.sku][0] for product in products if product.sku in existing]
+        get_product_cache().invalidate_many(updated)
+        return errors, len(products) - len(updated), len(updated)
+
+
+def upsert_target():
+    # MySQL upserts on any unique key and rejects an explicit conflict target
+    connection = connections[router.db_for_write(Product)]
+    if connection.features.supports_update_conflicts_with_target:
+        return {"unique_fields": ["sku"]}
+    return {}
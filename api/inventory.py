@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+
+from .exceptions import Conflict
+from .models import Product
+from .product_cache import get_product_cache
+
+# Largest value of the quantity column (PositiveIntegerField) on every backend
+MAX_QUANTITY = 2147483647
+
+
+class InventoryAdjustmentSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    sku = serializers.CharField(max_length=100, required=False)
+    delta = serializers.IntegerField(min_value=-MAX_QUANTITY, max_value=MAX_QUANTITY)
+
+    def validate(self, attrs):
+        if ("id" in attrs) == ("sku" in attrs):
+            raise serializers.ValidationError("Provide exactly one of id or sku.")
+        return attrs
+
+
+class InventoryBatchSerializer(serializers.Serializer):
+    adjustments = InventoryAdjustmentSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class InsufficientStock(Conflict):
+    default_detail = "Not enough stock for this adjustment."
+    default_code = "insufficient_stock"
+
+
+def resolve_products(adjustments):
+    """Map each adjustment to a product row with one query; returns ``{key: (id, sku, owner_id)}``."""
+    ids = [entry["id"] for entry in adjustments if "id" in entry]
+    skus = [entry["sku"] for entry in adjustments if "sku" in entry]
+    rows = Product.objects.filter(Q(id__in=ids) | Q(sku__in=skus)).values_list("id", "sku", "owner_id")
+    resolved = {}
+    for pk, sku, owner_id in rows:
+        resolved[("id", pk)] = resolved[("sku", sku)] = (pk, sku, owner_id)
+    return resolved
+
+
+def apply_adjustments(owner, adjustments):
+    """
+    Apply ``{id|sku, delta}`` adjustments to ``owner``'s products atomically.
+
+    Each product gets a single ``UPDATE ... SET quantity = quantity + delta``;
+    decrements also carry ``WHERE quantity >= -delta`` so the database rejects
+    anything that would go below zero without locking rows up front, and
+    increments ``WHERE quantity <= MAX_QUANTITY - delta`` so the column never
+    overflows. If any product lacks stock the whole batch is rolled back.
+    """
+    resolved = resolve_products(adjustments)
+
+    deltas = defaultdict(int)
+    errors = {}
+    for index, entry in enumerate(adjustments):
+        key = ("id", entry["id"]) if "id" in entry else ("sku", entry["sku"])
+        if key not in resolved:
+            errors[index] = [f"No product with {key[0]} {key[1]}."]
+            continue
+        pk, _, owner_id = resolved[key]
+        if owner_id != owner.pk:
+            raise PermissionDenied("You can only adjust inventory of your own products.")
+        deltas[pk] += entry["delta"]
+    if errors:
+        raise serializers.ValidationError({"adjustments": errors})
+
+    now = timezone.now()
+    with transaction.atomic():
+        # Fixed id order so concurrent batches take row locks in the same order
+        for pk in sorted(deltas):
+            delta = deltas[pk]
+            if delta == 0:
+                continue
+            queryset = Product.objects.filter(pk=pk)
+            if delta < 0:
+                queryset = queryset.filter(quantity__gte=-delta)
+            else:
+                queryset = queryset.filter(quantity__lte=MAX_QUANTITY - delta)
+            if not queryset.update(quantity=F("quantity") + delta, date_updated=now):
+                if delta > 0:
+                    raise serializers.ValidationError(
+                        {"adjustments": [f"Quantity of product {pk} would exceed {MAX_QUANTITY}."]}
+                    )
+                raise InsufficientStock(f"Not enough stock for product {pk}.")
+        quantities = list(
+            Product.objects.filter(pk__in=list(deltas)).order_by("id").values("id", "sku", "quantity")
+        )
+
+    # QuerySet.update() sends no post_save
+    get_product_cache().invalidate_many(list(deltas))
+    return quantities
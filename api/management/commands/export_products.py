@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exporters import export_products
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = "Stream products to a file (or stdout) as NDJSON or CSV with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="Output file, or - for stdout.")
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--owner", default=None, help="Only export products owned by this email.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        owner_id = None
+        if options["owner"]:
+            try:
+                owner_id = User.objects.values_list("id", flat=True).get(email=options["owner"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['owner']}.")
+
+        chunks = export_products(
+            options["format"],
+            owner_id=owner_id,
+            compress=options["gzip"],
+            chunk_size=max(1, options["chunk_size"]),
+        )
+        if options["path"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(options["path"], "wb") as out:
+                for chunk in chunks:
+                    out.write(chunk)
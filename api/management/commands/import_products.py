@@ -0,0 +1,42 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import ProductImporter, iter_rows
+from api.models import User
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of products into the catalog, upserting on SKU."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--owner", required=True, help="Email of the user who will own the products.")
+        parser.add_argument("--format", choices=["csv", "ndjson"], default=None,
+                            help="Input format (default: guessed from the file extension).")
+        parser.add_argument("--chunk-size", type=int, default=settings.PRODUCT_IMPORT["CHUNK_SIZE"],
+                            help="Rows validated and upserted per transaction.")
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(email=options["owner"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}.")
+
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        importer = ProductImporter(owner, chunk_size=max(1, options["chunk_size"]))
+
+        if path == "-":
+            report = importer.run(iter_rows(sys.stdin.buffer, fmt))
+        else:
+            with open(path, "rb") as stream:
+                report = importer.run(iter_rows(stream, fmt))
+
+        for error in report["errors"]:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            f"Created {report['created']}, updated {report['updated']}, failed {report['failed']}."
+        )
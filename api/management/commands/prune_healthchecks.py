@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.health import HEARTBEAT_ID
+from api.models import HealthCheck
+
+
+class Command(BaseCommand):
+    help = "Delete old HealthCheck rows in bounded batches, keeping the heartbeat row."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=7,
+                            help="Delete rows checked before this many days ago (default: 7).")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows deleted per statement (default: 1000).")
+        parser.add_argument("--max-batches", type=int, default=None,
+                            help="Stop after this many batches (default: no limit).")
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Seconds to pause between batches to limit replication lag.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than_days"])
+        batch_size = options["batch_size"]
+        stale = (
+            HealthCheck.objects.filter(checked_at__lt=cutoff)
+            .exclude(pk=HEARTBEAT_ID)
+            .order_by("pk")
+        )
+
+        deleted = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            # Delete by primary key so each statement touches at most batch_size rows
+            ids = list(stale.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += HealthCheck.objects.filter(pk__in=ids).delete()[0]
+            batches += 1
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(f"Deleted {deleted} HealthCheck rows in {batches} batches.")
@@ -0,0 +1,138 @@
+import itertools
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.models import Product, User
+
+WORDS = (
+    "wireless compact durable portable premium steel aluminium ergonomic adjustable rechargeable "
+    "battery cable charger adapter kit pack set case cover mount stand holder bracket sensor module "
+    "display panel controller switch router hub dock lamp fan filter pump valve motor gear belt "
+    "with for and the of in to high low fast quiet smart outdoor indoor waterproof lightweight heavy "
+    "duty replacement compatible warranty included black white grey silver red blue green model series"
+).split()
+NOUNS = ("Cable", "Charger", "Adapter", "Router", "Switch", "Lamp", "Sensor", "Hub", "Dock", "Fan", "Pump", "Kit")
+ADJECTIVES = ("Compact", "Pro", "Mini", "Smart", "Ultra", "Basic", "Max", "Lite", "Plus", "Prime")
+MANUFACTURERS = (
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne",
+    "Soylent", "Massive", "Aperture", "Vandelay", "Gekko", "Oscorp", "Nakatomi", "Virtucon", "Monarch", "Dunder",
+)
+
+
+def zipf_cum_weights(n, skew):
+    """Cumulative weights of ranks 1..n under Zipf's law (``skew`` 0 is uniform)."""
+    return list(itertools.accumulate(1 / rank ** skew for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset for scale testing: N users and M products, with products "
+        "spread over owners (and manufacturers) by a Zipf distribution. One password hash is shared "
+        "by all users; users, tokens and products are bulk inserted. Deterministic for a given --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--skew", type=float, default=1.1,
+                            help="Zipf exponent for products per owner; 0 spreads them evenly (default: 1.1).")
+        parser.add_argument("--description-length", type=int, default=200,
+                            help="Median description length in characters (default: 200).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Rows inserted per statement and transaction (default: 5000).")
+        parser.add_argument("--prefix", default="seed", help="Prefix of generated emails and SKUs (default: seed).")
+        parser.add_argument("--password", default="seedpass123", help="Password of every generated user.")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["products"] < 0:
+            raise CommandError("--users must be at least 1 and --products not negative.")
+        prefix = options["prefix"]
+        if User.objects.filter(email__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Data with prefix {prefix!r} already exists; use another --prefix.")
+
+        rng = random.Random(options["seed"])
+        started = time.monotonic()
+        owner_ids = self.create_users(prefix, options["users"], options["password"], options["batch_size"])
+        users_done = time.monotonic()
+        owner_counts = self.create_products(prefix, owner_ids, options, rng)
+        products_done = time.monotonic()
+
+        counts = sorted(owner_counts.values(), reverse=True)
+        self.stdout.write(
+            f"Created {len(owner_ids)} users and tokens in {users_done - started:.1f}s, "
+            f"{options['products']} products in {products_done - users_done:.1f}s."
+        )
+        if counts:
+            self.stdout.write(
+                f"Products per owner: max {counts[0]}, median {counts[len(counts) // 2]}, "
+                f"{len(owner_ids) - len(counts)} owners without products."
+            )
+
+    def create_users(self, prefix, count, password, batch_size):
+        # bcrypt once: every synthetic account shares the hash
+        hashed = make_password(password)
+        now = timezone.now()
+        width = len(str(count))
+        for start in range(0, count, batch_size):
+            users = [
+                User(email=f"{prefix}-{i:0{width}d}@example.com", password=hashed, first_name="Seed",
+                     last_name=f"User{i}", account_created=now, account_updated=now)
+                for i in range(start, min(start + batch_size, count))
+            ]
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                # bulk_create sends no post_save, and MySQL returns no ids
+                user_ids = User.objects.filter(email__in=[user.email for user in users]).values_list("id", flat=True)
+                Token.objects.bulk_create([Token(key=Token.generate_key(), user_id=user_id) for user_id in user_ids])
+        # Zero-padded emails sort in creation order, so ids line up with Zipf ranks
+        return list(
+            User.objects.filter(email__startswith=f"{prefix}-").order_by("email").values_list("id", flat=True)
+        )
+
+    def create_products(self, prefix, owner_ids, options, rng):
+        count, batch_size = options["products"], options["batch_size"]
+        owner_weights = zipf_cum_weights(len(owner_ids), options["skew"])
+        manufacturer_weights = zipf_cum_weights(len(MANUFACTURERS), 1.0)
+        # Descriptions are cut from one long generated text, so each costs O(1)
+        text = " ".join(rng.choices(WORDS, k=20000))
+        median = max(1, options["description_length"])
+        width = len(str(count))
+        owner_counts = {}
+
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            owners = rng.choices(owner_ids, cum_weights=owner_weights, k=size)
+            manufacturers = rng.choices(MANUFACTURERS, cum_weights=manufacturer_weights, k=size)
+            products = []
+            for offset, (owner_id, manufacturer) in enumerate(zip(owners, manufacturers)):
+                i = start + offset
+                owner_counts[owner_id] = owner_counts.get(owner_id, 0) + 1
+                products.append(Product(
+                    name=f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+                    description=self.description(text, median, rng),
+                    sku=f"{prefix}-{i:0{width}d}",
+                    manufacturer=manufacturer,
+                    # A few out of stock, most with modest stock
+                    quantity=0 if rng.random() < 0.05 else min(int(rng.paretovariate(1.5) * 10), 10000),
+                    owner_id=owner_id,
+                ))
+            with transaction.atomic():
+                Product.objects.bulk_create(products)
+        return owner_counts
+
+    @staticmethod
+    def description(text, median, rng):
+        # Log-normal lengths: mostly near the median, with a long tail; some empty
+        if rng.random() < 0.1:
+            return ""
+        length = min(int(rng.lognormvariate(0, 0.8) * median), 4000, len(text) // 2)
+        start = text.find(" ", rng.randrange(len(text) - length)) + 1
+        end = text.rfind(" ", start, start + length)
+        return text[start:end] if end > start else text[start:start + length].split(" ")[0]
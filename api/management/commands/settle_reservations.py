@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.reservations import settle
+
+
+class Command(BaseCommand):
+    help = "Deduct committed stock reservations from product quantities and drop expired holds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Reservations settled per transaction (default: 1000).")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running as a sweeper instead of exiting once drained.")
+        parser.add_argument("--interval", type=float, default=5.0,
+                            help="Seconds to sleep between sweeps with --loop (default: 5).")
+
+    def handle(self, *args, **options):
+        while True:
+            total_settled = total_expired = 0
+            while True:
+                settled, expired = settle(batch_size=options["batch_size"])
+                total_settled += settled
+                total_expired += expired
+                if settled < options["batch_size"] and expired < options["batch_size"]:
+                    break
+            if total_settled or total_expired or not options["loop"]:
+                self.stdout.write(f"Settled {total_settled} reservations, dropped {total_expired} expired holds.")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,332 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+# Requests that matched no URL pattern share one label
+UNMATCHED = "<unmatched>"
+
+
+def metrics_config():
+    config = getattr(settings, "METRICS", {})
+    return {
+        "ENABLED": config.get("ENABLED", True),
+        "LATENCY_BUCKETS": tuple(config.get("LATENCY_BUCKETS", LATENCY_BUCKETS)),
+        "QUERY_BUDGET": config.get("QUERY_BUDGET", "off"),
+        "QUERY_BUDGETS": config.get("QUERY_BUDGETS", {}),
+    }
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """Query count and time of one request."""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Recorder of the request being handled; follows the request into
+# sync_to_async threads
+_recorder = contextvars.ContextVar("api_query_recorder", default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.count += 1
+        recorder.duration += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    """
+    Add ``record_queries`` to a connection's ``execute_wrappers`` for good
+    (see api.signals), so requests need not wrap every connection.
+    """
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_queries)
+
+
+class Series:
+    __slots__ = ("statuses", "latency", "latency_sum", "queries", "queries_sum", "db_time", "count")
+
+    def __init__(self, latency_buckets):
+        self.statuses = {}
+        self.latency = [0] * (len(latency_buckets) + 1)
+        self.latency_sum = 0.0
+        self.queries = [0] * (len(QUERY_BUCKETS) + 1)
+        self.queries_sum = 0
+        self.db_time = 0.0
+        self.count = 0
+
+
+class RequestMetrics:
+    """
+    Per route and method: request count by status, a latency histogram, a
+    queries-per-request histogram and total DB time.
+
+    Every thread writes to its own shard, so recording takes no lock; a
+    scrape merges the shards.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, route, method, status, duration, queries, db_time):
+        shard = self._shard()
+        series = shard.get((route, method))
+        if series is None:
+            series = shard[(route, method)] = Series(self.latency_buckets)
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        series.latency[bisect.bisect_left(self.latency_buckets, duration)] += 1
+        series.latency_sum += duration
+        series.queries[bisect.bisect_left(QUERY_BUCKETS, queries)] += 1
+        series.queries_sum += queries
+        series.db_time += db_time
+        series.count += 1
+
+    def snapshot(self):
+        """Merged series as ``{(route, method): Series}``."""
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for key, series in list(shard.items()):
+                total = merged.get(key)
+                if total is None:
+                    total = merged[key] = Series(self.latency_buckets)
+                for status, count in list(series.statuses.items()):
+                    total.statuses[status] = total.statuses.get(status, 0) + count
+                total.latency = [a + b for a, b in zip(total.latency, series.latency)]
+                total.queries = [a + b for a, b in zip(total.queries, series.queries)]
+                total.latency_sum += series.latency_sum
+                total.queries_sum += series.queries_sum
+                total.db_time += series.db_time
+                total.count += series.count
+        return merged
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+_request_metrics = None
+
+
+def get_request_metrics():
+    global _request_metrics
+    if _request_metrics is None:
+        _request_metrics = RequestMetrics(metrics_config()["LATENCY_BUCKETS"])
+    return _request_metrics
+
+
+def query_budget(match, method):
+    """The declared query budget for a resolved view, or None."""
+    budgets = metrics_config()["QUERY_BUDGETS"]
+    if match.route in budgets:
+        budget = budgets[match.route]
+    else:
+        budget = getattr(getattr(match.func, "view_class", match.func), "query_budget", None)
+    if isinstance(budget, dict):
+        budget = budget.get(method)
+    return budget
+
+
+class MetricsMiddleware:
+    """
+    Records latency, query count and DB time of every request, labelled by
+    URL pattern and method. Put it first in ``MIDDLEWARE`` so the timing
+    covers the other middleware. Queries run while a streaming response is
+    consumed are not counted.
+
+    With ``QUERY_BUDGET`` set to ``"log"`` or ``"raise"``, a view that runs
+    more queries than its ``query_budget`` attribute (an int, or a dict by
+    method) or its ``QUERY_BUDGETS`` entry is logged, or fails with
+    ``QueryBudgetExceeded``.
+
+    Runs natively under ASGI, so async views keep an async request chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = metrics_config()
+        if not config["ENABLED"]:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(config, request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        config = metrics_config()
+        if not config["ENABLED"]:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.record(config, request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def record(self, config, request, response, recorder, duration):
+        match = request.resolver_match
+        route = match.route if match is not None else UNMATCHED
+        get_request_metrics().observe(
+            route, request.method, response.status_code, duration, recorder.count, recorder.duration
+        )
+
+        if config["QUERY_BUDGET"] != "off" and match is not None:
+            budget = query_budget(match, request.method)
+            if budget is not None and recorder.count > budget:
+                message = f"{request.method} {route} ran {recorder.count} queries (budget {budget})"
+                if config["QUERY_BUDGET"] == "raise":
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def render_request_metrics(metrics):
+    lines = []
+    snapshot = sorted(metrics.snapshot().items())
+
+    lines.append("# HELP api_requests_total Requests by URL pattern, method and status.")
+    lines.append("# TYPE api_requests_total counter")
+    for (route, method), series in snapshot:
+        for status, count in sorted(series.statuses.items()):
+            lines.append(
+                f'api_requests_total{{route="{_escape(route)}",method="{_escape(method)}",status="{status}"}} {count}'
+            )
+
+    histograms = (
+        ("api_request_duration_seconds", "Request latency in seconds.", metrics.latency_buckets,
+         "latency", "latency_sum"),
+        ("api_request_db_queries", "Database queries per request.", QUERY_BUCKETS, "queries", "queries_sum"),
+    )
+    for name, help_text, buckets, counts_attr, sum_attr in histograms:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (route, method), series in snapshot:
+            labels = f'route="{_escape(route)}",method="{_escape(method)}"'
+            cumulative = 0
+            for bound, count in zip(buckets, getattr(series, counts_attr)):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {series.count}')
+            lines.append(f"{name}_sum{{{labels}}} {_format_value(getattr(series, sum_attr))}")
+            lines.append(f"{name}_count{{{labels}}} {series.count}")
+
+    lines.append("# HELP api_request_db_seconds_total Time spent in database queries.")
+    lines.append("# TYPE api_request_db_seconds_total counter")
+    for (route, method), series in snapshot:
+        lines.append(
+            f'api_request_db_seconds_total{{route="{_escape(route)}",method="{_escape(method)}"}} '
+            f"{_format_value(series.db_time)}"
+        )
+    return lines
+
+
+def render_stats(prefix, samples):
+    """
+    Gauges for the numeric values of ``stats()`` dicts, given as
+    ``[(labels, stats), ...]``; each metric's label sets stay grouped.
+    """
+    lines = []
+    keys = sorted({
+        key for _, stats in samples for key, value in stats.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    })
+    for key in keys:
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        for labels, stats in samples:
+            if key in stats:
+                name = f"{prefix}_{key}{{{labels}}}" if labels else f"{prefix}_{key}"
+                lines.append(f"{name} {_format_value(stats[key])}")
+    return lines
+
+
+def collect_stats():
+    """
+    ``(prefix, [(labels, stats), ...])`` for the caches, hashing pool,
+    throttle, admission control and connection pools.
+    """
+    from .admission import get_admission_controller
+    from .authentication import get_credential_cache, token_cache_stats
+    from .db.pool import pool_stats
+    from .hashing import get_hashing_service
+    from .product_cache import get_product_cache
+    from .throttling import throttle_stats
+
+    return [
+        ("api_product_cache", [("", get_product_cache().stats())]),
+        ("api_token_cache", [("", token_cache_stats())]),
+        ("api_credential_cache", [("", get_credential_cache().stats())]),
+        ("api_password_hashing", [("", get_hashing_service().stats())]),
+        ("api_throttle", [("", throttle_stats())]),
+        ("api_admission", [("", get_admission_controller().stats())]),
+        ("api_db_pool", [(f'alias="{_escape(alias)}"', stats) for alias, stats in sorted(pool_stats().items())]),
+    ]
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    lines = render_request_metrics(get_request_metrics())
+    for prefix, samples in collect_stats():
+        lines.extend(render_stats(prefix, samples))
+    return "\n".join(lines) + "\n"
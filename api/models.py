@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 
+from .hashing import ahash_password, hash_password
+
 
 # Custom User Manager
 
@@ -46,6 +48,20 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def set_password(self, raw_password):
+        # Hash on the shared pool (api.hashing) so bcrypt is bounded and
+        # applies backpressure instead of running on every request thread
+        if raw_password is None:
+            return super().set_password(raw_password)
+        self.password = hash_password(raw_password)
+        self._password = raw_password
+
+    async def aset_password(self, raw_password):
+        if raw_password is None:
+            return self.set_password(raw_password)
+        self.password = await ahash_password(raw_password)
+        self._password = raw_password
+
 
 # -------------------------------
 # Product Model
@@ -63,10 +79,48 @@ class Product(models.Model):
     date_added = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Composite indexes backing keyset pagination on (date_added, id)
+        indexes = [
+            models.Index(fields=["date_added", "id"], name="product_added_id_idx"),
+            models.Index(fields=["owner", "date_added", "id"], name="product_owner_added_idx"),
+            models.Index(fields=["manufacturer", "date_added", "id"], name="product_mfr_added_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
 
+class StockReservation(models.Model):
+    """
+    A temporary hold on product stock.
+
+    Holds are plain inserts into this table, so checkouts do not contend on
+    the product row. Committed holds are deducted from ``Product.quantity`` in
+    batches by ``manage.py settle_reservations``.
+    """
+    HELD = "held"
+    COMMITTED = "committed"
+    STATUS_CHOICES = [(HELD, "Held"), (COMMITTED, "Committed")]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reservations")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=HELD)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "status", "expires_at"], name="reservation_active_idx"),
+            models.Index(fields=["status", "expires_at"], name="reservation_sweep_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} ({self.status})"
+
+
 class HealthCheck(models.Model):
     checked_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ProductCache:
+    """
+    Read-through cache of serialized product representations.
+
+    Entries stay fresh for ``ttl`` seconds and are then served stale for up to
+    ``stale_ttl`` more while a single caller refreshes them. On a cold miss
+    one caller wins a ``cache.add`` lock and loads the product; the others wait
+    up to ``lock_timeout`` seconds for that result instead of all querying the
+    database at once.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(self, alias="default", ttl=60, stale_ttl=30, lock_timeout=5, prefix="api:product"):
+        self.alias = alias
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, pk):
+        return f"{self.prefix}:{pk}"
+
+    def lock_key(self, pk):
+        return f"{self.prefix}:{pk}:lock"
+
+    def reset_stats(self):
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "loads": 0, "lock_waits": 0}
+
+    def count(self, name):
+        with self._stats_lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self.counters)
+        served = stats["hits"] + stats["stale_hits"]
+        lookups = served + stats["misses"]
+        stats["hit_ratio"] = (served / lookups) if lookups else 0.0
+        return stats
+
+    def store(self, pk, data):
+        entry = {"data": data, "fresh_until": time.time() + self.ttl}
+        self.cache.set(self.key(pk), entry, self.ttl + self.stale_ttl)
+
+    async def astore(self, pk, data):
+        entry = {"data": data, "fresh_until": time.time() + self.ttl}
+        await self.cache.aset(self.key(pk), entry, self.ttl + self.stale_ttl)
+
+    def load(self, pk, loader):
+        self.count("loads")
+        try:
+            data = loader(pk)
+            if data is not None:
+                self.store(pk, data)
+            return data
+        finally:
+            self.cache.delete(self.lock_key(pk))
+
+    def get_or_load(self, pk, loader):
+        """Return the cached representation of ``pk``, calling ``loader(pk)`` on a miss."""
+        entry = self.cache.get(self.key(pk))
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                self.count("hits")
+                return entry["data"]
+            # Stale: one caller refreshes, everyone else keeps serving the old copy
+            if self.cache.add(self.lock_key(pk), 1, self.lock_timeout):
+                self.count("misses")
+                return self.load(pk, loader)
+            self.count("stale_hits")
+            return entry["data"]
+
+        self.count("misses")
+        if self.cache.add(self.lock_key(pk), 1, self.lock_timeout):
+            return self.load(pk, loader)
+
+        # Another caller is loading this key; wait for its result
+        self.count("lock_waits")
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            entry = self.cache.get(self.key(pk))
+            if entry is not None:
+                return entry["data"]
+            if self.cache.get(self.lock_key(pk)) is None:
+                break
+        return loader(pk)
+
+    async def aload(self, pk, loader):
+        self.count("loads")
+        try:
+            data = await loader(pk)
+            if data is not None:
+                await self.astore(pk, data)
+            return data
+        finally:
+            await self.cache.adelete(self.lock_key(pk))
+
+    async def aget_or_load(self, pk, loader):
+        """Async ``get_or_load``; ``loader`` is a coroutine function."""
+        entry = await self.cache.aget(self.key(pk))
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                self.count("hits")
+                return entry["data"]
+            if await self.cache.aadd(self.lock_key(pk), 1, self.lock_timeout):
+                self.count("misses")
+                return await self.aload(pk, loader)
+            self.count("stale_hits")
+            return entry["data"]
+
+        self.count("misses")
+        if await self.cache.aadd(self.lock_key(pk), 1, self.lock_timeout):
+            return await self.aload(pk, loader)
+
+        self.count("lock_waits")
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            entry = await self.cache.aget(self.key(pk))
+            if entry is not None:
+                return entry["data"]
+            if await self.cache.aget(self.lock_key(pk)) is None:
+                break
+        return await loader(pk)
+
+    def invalidate(self, pk):
+        self.invalidate_many([pk])
+
+    def invalidate_many(self, pks):
+        keys = [self.key(pk) for pk in pks]
+        if not keys:
+            return
+        self.cache.delete_many(keys)
+        # Delete again once the write is visible, so a reader that loaded the
+        # old row mid-transaction cannot leave it cached
+        transaction.on_commit(lambda: self.cache.delete_many(keys))
+
+    async def ainvalidate(self, pk):
+        # For async views, which always run in autocommit mode
+        await self.cache.adelete(self.key(pk))
+
+
+_product_cache = None
+
+
+def get_product_cache():
+    global _product_cache
+    if _product_cache is None:
+        config = getattr(settings, "PRODUCT_CACHE", {})
+        _product_cache = ProductCache(
+            alias=config.get("CACHE_ALIAS", "default"),
+            ttl=config.get("TTL", 60),
+            stale_ttl=config.get("STALE_TTL", 30),
+            lock_timeout=config.get("LOCK_TIMEOUT", 5),
+        )
+    return _product_cache
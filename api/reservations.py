@@ -0,0 +1,132 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import serializers
+
+from .exceptions import Conflict
+from .inventory import InsufficientStock
+from .models import Product, StockReservation
+from .product_cache import get_product_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockReservation
+        fields = ["id", "product", "quantity", "status", "created_at", "expires_at"]
+        read_only_fields = ["id", "product", "status", "created_at", "expires_at"]
+
+    def validate_quantity(self, value):
+        limit = settings.STOCK_RESERVATIONS["MAX_QUANTITY"]
+        if not 1 <= value <= limit:
+            raise serializers.ValidationError(f"Quantity must be between 1 and {limit}.")
+        return value
+
+
+class ReservationGone(Conflict):
+    default_detail = "The reservation does not exist, has expired or was already committed."
+    default_code = "reservation_gone"
+
+
+def active_holds(now, prefix="reservations__"):
+    # Committed holds count until the sweeper deducts them from Product.quantity
+    return (
+        Q(**{f"{prefix}status": StockReservation.COMMITTED})
+        | Q(**{f"{prefix}status": StockReservation.HELD, f"{prefix}expires_at__gt": now})
+    )
+
+
+def availability(product_id, now=None):
+    """Return ``(quantity, reserved)`` for a product in one query, or None if it does not exist."""
+    now = now or timezone.now()
+    return (
+        Product.objects.filter(pk=product_id)
+        .annotate(reserved=Coalesce(Sum("reservations__quantity", filter=active_holds(now)), Value(0)))
+        .values_list("quantity", "reserved")
+        .first()
+    )
+
+
+def reserve(product_id, user, quantity, ttl=None):
+    """
+    Hold ``quantity`` units of a product for ``ttl`` seconds.
+
+    The hold is inserted first and availability checked afterwards, counting
+    the new hold. Both statements autocommit, so of two racing holds the
+    later check always sees the other one: stock is never over-reserved,
+    at worst both are refused. Must not run inside an outer transaction.
+    """
+    ttl = settings.STOCK_RESERVATIONS["HOLD_TTL"] if ttl is None else ttl
+    now = timezone.now()
+    hold = StockReservation.objects.create(
+        product_id=product_id, user=user, quantity=quantity, expires_at=now + timedelta(seconds=ttl)
+    )
+    quantity_on_hand, reserved = availability(product_id, now)
+    if reserved > quantity_on_hand:
+        hold.delete()
+        raise InsufficientStock(f"Not enough stock for product {product_id}.")
+    return hold
+
+
+def commit(reservation_id, user):
+    committed = StockReservation.objects.filter(
+        pk=reservation_id, user=user, status=StockReservation.HELD, expires_at__gt=timezone.now()
+    ).update(status=StockReservation.COMMITTED)
+    if not committed:
+        raise ReservationGone()
+
+
+def release(reservation_id, user):
+    deleted, _ = StockReservation.objects.filter(
+        pk=reservation_id, user=user, status=StockReservation.HELD
+    ).delete()
+    if not deleted:
+        raise ReservationGone()
+
+
+def settle(batch_size=1000):
+    """
+    Deduct one batch of committed holds from ``Product.quantity`` and drop
+    expired holds. Returns ``(settled, expired)`` row counts.
+    """
+    now = timezone.now()
+    expired_ids = list(
+        StockReservation.objects.filter(status=StockReservation.HELD, expires_at__lte=now)
+        .values_list("id", flat=True)[:batch_size]
+    )
+    expired = StockReservation.objects.filter(pk__in=expired_ids).delete()[0] if expired_ids else 0
+
+    with transaction.atomic():
+        batch = list(
+            StockReservation.objects.select_for_update()
+            .filter(status=StockReservation.COMMITTED)
+            .order_by("id")
+            .values_list("id", "product_id", "quantity")[:batch_size]
+        )
+        totals = defaultdict(int)
+        for _, product_id, quantity in batch:
+            totals[product_id] += quantity
+
+        for product_id in sorted(totals):
+            total = totals[product_id]
+            updated = Product.objects.filter(pk=product_id, quantity__gte=total).update(
+                quantity=F("quantity") - total, date_updated=now
+            )
+            if not updated:
+                # Stock was lowered directly after the holds were taken; clamp at zero
+                logger.warning("Product %s oversold by settled reservations", product_id)
+                Product.objects.filter(pk=product_id).update(
+                    quantity=Case(When(quantity__gte=total, then=F("quantity") - total), default=Value(0)),
+                    date_updated=now,
+                )
+        StockReservation.objects.filter(pk__in=[row[0] for row in batch]).delete()
+
+    get_product_cache().invalidate_many(list(totals))
+    return len(batch), expired
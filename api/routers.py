@@ -0,0 +1,211 @@
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Replica alias picked for the current request, or None for the primary
+_replica = contextvars.ContextVar("api_replica", default=None)
+
+
+def replica_config():
+    config = getattr(settings, "DATABASE_REPLICAS", {})
+    return {
+        "ALIASES": config.get("ALIASES", {}),
+        "STRATEGY": config.get("STRATEGY", "weighted"),
+        "STICKY_SECONDS": config.get("STICKY_SECONDS", 5),
+        "FAILURE_COOLDOWN": config.get("FAILURE_COOLDOWN", 30),
+        "CACHE_ALIAS": config.get("CACHE_ALIAS", "default"),
+        "APP_LABELS": config.get("APP_LABELS", ["api"]),
+    }
+
+
+class ReplicaSet:
+    """
+    Picks a replica per request, by weight or by fewest in-flight requests,
+    skipping replicas that failed within the last ``FAILURE_COOLDOWN`` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._down_until = {}
+        self._active = defaultdict(int)
+
+    def available(self, aliases):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                alias: weight for alias, weight in aliases.items()
+                if weight > 0 and self._down_until.get(alias, 0) <= now
+            }
+
+    def mark_down(self, alias, cooldown):
+        logger.warning("Read replica %s failed; using other databases for %ss", alias, cooldown)
+        with self._lock:
+            self._down_until[alias] = time.monotonic() + cooldown
+
+    def pick(self, candidates, strategy):
+        if strategy == "least_loaded":
+            with self._lock:
+                return min(candidates, key=lambda alias: (self._active[alias] / candidates[alias], alias))
+        return random.choices(list(candidates), weights=list(candidates.values()))[0]
+
+    def choose(self):
+        """Return a reachable replica alias and count it as in use, or None."""
+        config = replica_config()
+        candidates = self.available(config["ALIASES"])
+        while candidates:
+            alias = self.pick(candidates, config["STRATEGY"])
+            try:
+                # A no-op for an open persistent connection
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                self.mark_down(alias, config["FAILURE_COOLDOWN"])
+                del candidates[alias]
+                continue
+            with self._lock:
+                self._active[alias] += 1
+            return alias
+        return None
+
+    def release(self, alias):
+        with self._lock:
+            self._active[alias] -= 1
+
+    def reset(self):
+        with self._lock:
+            self._down_until.clear()
+            self._active.clear()
+
+
+replicas = ReplicaSet()
+
+
+def client_key(request):
+    # The credentials identify an API client better than its address; only a
+    # digest is stored
+    identity = request.META.get("HTTP_AUTHORIZATION") or request.META.get("REMOTE_ADDR", "")
+    return "api:db:primary:" + hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def pin_to_primary(request):
+    config = replica_config()
+    caches[config["CACHE_ALIAS"]].set(client_key(request), 1, config["STICKY_SECONDS"])
+
+
+def is_pinned(request):
+    return caches[replica_config()["CACHE_ALIAS"]].get(client_key(request)) is not None
+
+
+async def apin_to_primary(request):
+    config = replica_config()
+    await caches[config["CACHE_ALIAS"]].aset(client_key(request), 1, config["STICKY_SECONDS"])
+
+
+async def ais_pinned(request):
+    return await caches[replica_config()["CACHE_ALIAS"]].aget(client_key(request)) is not None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Chooses the database for each request: a replica for safe methods,
+    unless the client wrote within ``STICKY_SECONDS`` (read-your-writes),
+    and the primary for everything else. Inert without configured replicas.
+    Runs natively under ASGI, so async views keep an async request chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_config()["ALIASES"]:
+            return self.get_response(request)
+
+        alias = None
+        if request.method in SAFE_METHODS and not is_pinned(request):
+            alias = replicas.choose()
+        token = _replica.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+            if alias is not None:
+                replicas.release(alias)
+
+        if request.method not in SAFE_METHODS:
+            pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_config()["ALIASES"]:
+            return await self.get_response(request)
+
+        alias = None
+        if request.method in SAFE_METHODS and not await ais_pinned(request):
+            # Connecting to a replica is blocking
+            alias = await sync_to_async(replicas.choose)()
+        token = _replica.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+            if alias is not None:
+                replicas.release(alias)
+
+        if request.method not in SAFE_METHODS:
+            await apin_to_primary(request)
+        return response
+
+    def process_exception(self, request, exception):
+        alias = _replica.get()
+        if alias is not None and isinstance(exception, DatabaseError):
+            replicas.mark_down(alias, replica_config()["FAILURE_COOLDOWN"])
+
+
+class ReplicaRouter:
+    """
+    Sends reads of the configured apps to the replica chosen by
+    ``ReplicaRoutingMiddleware``. Writes, reads inside a transaction and
+    anything outside a routed request (commands, the health prober) use the
+    primary. Replicas are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or model._meta.app_label not in replica_config()["APP_LABELS"]:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or Django would write an instance back to the replica it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_config()["ALIASES"]}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_config()["ALIASES"]:
+            return False
+        return None
@@ -1,9 +1,22 @@
-from rest_framework import serializers
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+from operator import attrgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import RelatedField
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.settings import api_settings
 from .models import User
 from .models import Product
+from .authentication import invalidate_user_credentials
+from .throttling import check_auth_failures, record_auth_failure
 
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
+    # No UniqueValidator: signup relies on the unique index instead of a pre-check query
+    email = serializers.EmailField(max_length=255)
 
     class Meta:
         model = User
@@ -35,8 +48,23 @@ class UserSerializer(serializers.ModelSerializer):
         # Handle password hashing if provided
         if 'password' in validated_data:
             instance.set_password(validated_data.pop('password'))
+            invalidate_user_credentials(instance.pk)
         return super().update(instance, validated_data)
 
+class ThrottledAuthTokenSerializer(AuthTokenSerializer):
+    """Counts wrong passwords like Basic auth does, and refuses before hashing once they run out."""
+
+    def validate(self, attrs):
+        request = self.context.get("request")
+        username = attrs.get("username")
+        check_auth_failures(request, username)
+        try:
+            return super().validate(attrs)
+        except serializers.ValidationError:
+            record_auth_failure(request, username)
+            raise
+
+
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
@@ -49,7 +77,125 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Quantity cannot be less than 0.")
         return value
 
-    def validate_sku(self, value):
-        if Product.objects.filter(sku=value).exclude(id=self.instance.id if self.instance else None).exists():
-            raise serializers.ValidationError("SKU must be unique.")
-        return value
+
+class ReadSerializer:
+    """
+    Read-only fast path for a ``ModelSerializer``: same output as ``.data``,
+    built from model instances or ``values_list`` rows with the field
+    accessors compiled once, skipping DRF's per-field machinery.
+
+    Plain columns are copied as-is and related fields are read from their
+    ``_id`` column. ISO 8601 datetimes are formatted here with the current
+    timezone looked up once per call rather than once per value; any other
+    field keeps its own ``to_representation``.
+    """
+
+    passthrough = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.names, self.sources, self.columns, self.converters = [], [], [], []
+        model = serializer_class.Meta.model
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            model_field = model._meta.get_field(field.source)
+            self.names.append(name)
+            self.sources.append(model_field.name)
+            self.columns.append(model_field.attname)
+            self.converters.append(self.compile_converter(field))
+        self.getter = attrgetter(*self.columns)
+        self.plain = all(converter is None for converter in self.converters)
+
+    def compile_converter(self, field):
+        if isinstance(field, (RelatedField,) + self.passthrough):
+            return None
+        if (
+            isinstance(field, serializers.DateTimeField)
+            and getattr(field, "format", api_settings.DATETIME_FORMAT) == ISO_8601
+            and not hasattr(field, "timezone")
+        ):
+            return format_datetime
+        return lambda value, tz: field.to_representation(value)
+
+    def from_row(self, row, tz=None):
+        """Represent one ``values_list(*self.columns)`` tuple."""
+        if self.plain:
+            return dict(zip(self.names, row))
+        return {
+            name: value if converter is None or value is None else converter(value, tz)
+            for name, converter, value in zip(self.names, self.converters, row)
+        }
+
+    def to_representation(self, instance, tz=None):
+        row = self.getter(instance)
+        return self.from_row(row if len(self.columns) > 1 else (row,), tz or current_timezone())
+
+    def many(self, instances):
+        tz = current_timezone()
+        return [self.to_representation(instance, tz) for instance in instances]
+
+    def from_queryset(self, queryset):
+        tz = current_timezone()
+        return [self.from_row(row, tz) for row in queryset.values_list(*self.columns)]
+
+
+def current_timezone():
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def format_datetime(value, tz):
+    # Same result as DRF's DateTimeField.to_representation with ISO_8601
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, dt_timezone.utc)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+product_reader = ReadSerializer(ProductSerializer)
+user_reader = ReadSerializer(UserSerializer)
+PRODUCT_FIELDS = tuple(product_reader.names)
+
+
+def parse_fieldset(params, available):
+    """
+    Turn ``?fields=a,b`` and/or ``?exclude=c`` into a tuple of field names in
+    declaration order, or None when neither is given.
+    """
+    fields, exclude = params.get("fields"), params.get("exclude")
+    if fields is None and exclude is None:
+        return None
+    selected = set(available)
+    for param, value in (("fields", fields), ("exclude", exclude)):
+        if value is None:
+            continue
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = names - set(available)
+        if unknown:
+            raise serializers.ValidationError({param: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+        selected = selected & names if param == "fields" else selected - names
+    if not selected:
+        raise serializers.ValidationError({"fields": "Select at least one field."})
+    return tuple(name for name in available if name in selected)
+
+
+def select_fields(data, fields):
+    return data if fields is None else {name: data[name] for name in fields}
+
+
+@lru_cache(maxsize=128)
+def product_serializer_for(fields):
+    """``ProductSerializer`` trimmed to ``fields``; built once per fieldset."""
+    meta = type("Meta", (ProductSerializer.Meta,), {"fields": list(fields)})
+    return type("SparseProductSerializer", (ProductSerializer,), {"Meta": meta})
+
+
+@lru_cache(maxsize=128)
+def product_reader_for(fields):
+    if fields is None:
+        return product_reader
+    return ReadSerializer(product_serializer_for(fields))
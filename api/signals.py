@@ -1,9 +1,43 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
+from .models import Product
+from .product_cache import get_product_cache
+from .authentication import invalidate_token, invalidate_user_credentials, invalidate_user_tokens
+from .metrics import install_query_recorder
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def drop_credentials_of_inactive_user(sender, instance=None, created=False, **kwargs):
+    if not created and not instance.is_active:
+        invalidate_user_credentials(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def drop_cached_tokens_of_user(sender, instance=None, created=False, **kwargs):
+    if not created:
+        invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def drop_cached_token(sender, instance=None, **kwargs):
+    invalidate_token(instance.key, instance.user_id)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def drop_cached_product(sender, instance=None, **kwargs):
+    get_product_cache().invalidate(instance.pk)
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    install_query_recorder(connection)
@@ -0,0 +1,17 @@
+import pytest
+from django.core.cache import caches
+from api.admission import get_admission_controller
+from api.authentication import get_credential_cache, get_token_cache
+from api.throttling import get_limiter
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Test databases roll back and reuse primary keys; start every test with empty caches
+    for cache in caches.all():
+        cache.clear()
+    get_credential_cache().clear()
+    get_token_cache().clear()
+    get_limiter().clear()
+    get_admission_controller().reset()
+    yield
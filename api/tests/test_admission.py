@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from unittest import mock
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.core.handlers.base import BaseHandler
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.admission import AdmissionControlMiddleware, AdmissionController
+from api.models import Product, User
+
+
+def signup(client, n):
+    return client.post("/v1/user/", {
+        "email": f"signup{n}@example.com", "password": "signuppass", "first_name": "S", "last_name": "U",
+    }, format="json")
+
+
+def slow_database(delay):
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(delay)
+        return execute(sql, params, many, context)
+    return connection.execute_wrapper(wrapper)
+
+
+class TestAdmissionController:
+
+    def test_priority_shares(self):
+        controller = AdmissionController(max_in_flight=4)
+        assert [controller.admit("signup") for _ in range(3)] == [True, True, False]
+        assert controller.admit("write")
+        assert not controller.admit("write")
+        assert controller.admit("read")
+        assert not controller.admit("read")
+        assert controller.is_saturated()
+        controller.release(0.01)
+        assert controller.admit("read")
+        assert controller.stats()["rejected_signup"] == 1
+
+    @mock.patch("api.admission.time.monotonic", return_value=100.0)
+    def test_latency_sheds_writes_not_reads(self, clock):
+        controller = AdmissionController(max_in_flight=4, target_latency=0.5, smoothing=0.5)
+        controller.admit("read")
+        controller.release(2.0)
+        assert controller.latency == pytest.approx(1.0)
+        assert controller.is_saturated()
+        assert not controller.admit("write")
+        assert not controller.admit("signup")
+        assert controller.admit("read")
+        controller.release(0.0)
+        controller.admit("read")
+        controller.release(0.0)
+        assert controller.latency == pytest.approx(0.25)
+        assert not controller.is_saturated()
+        assert controller.admit("write")
+
+    def test_latency_decays_while_idle(self):
+        with mock.patch("api.admission.time.monotonic", return_value=100.0) as clock:
+            controller = AdmissionController(target_latency=1.0, smoothing=1.0, half_life=5.0)
+            controller.admit("write")
+            controller.release(10.0)
+            assert not controller.admit("write")
+            clock.return_value = 110.0
+            assert controller.current_latency() == pytest.approx(2.5)
+            assert controller.is_saturated()
+            clock.return_value = 120.0
+            assert not controller.is_saturated()
+            assert controller.admit("write")
+            # The next finished request averages with the decayed value
+            controller.release(0.5)
+            assert controller.latency == pytest.approx(0.5)
+
+
+def test_async_chain_is_not_adapted(settings, caplog):
+    settings.DEBUG = True
+    with caplog.at_level(logging.DEBUG, logger="django.request"):
+        handler = BaseHandler()
+        handler.load_middleware(is_async=True)
+    assert "adapted" not in caplog.text
+    # process_view runs on the event loop too, not through sync_to_async
+    assert any(
+        getattr(method, "__func__", None) is AdmissionControlMiddleware.aprocess_view
+        for method in handler._view_middleware
+    )
+
+
+def test_async_requests_are_admitted_and_released():
+    controller = AdmissionController(max_in_flight=1)
+    in_flight = []
+
+    def view(request):
+        pass
+
+    async def get_response(request):
+        response = await middleware.process_view(request, view, (), {})
+        in_flight.append(controller.in_flight)
+        return response or HttpResponse()
+
+    middleware = AdmissionControlMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
+    with mock.patch("api.admission._controller", controller):
+        assert asyncio.run(middleware(RequestFactory().get("/"))).status_code == 200
+        assert in_flight == [1]
+        assert controller.in_flight == 0
+        controller.admit("read")
+        assert asyncio.run(middleware(RequestFactory().get("/"))).status_code == 503
+        assert controller.in_flight == 1
+
+
+@pytest.mark.django_db
+class TestAdmissionControlMiddleware:
+
+    def setup_method(self):
+        self.controller = AdmissionController(max_in_flight=4, target_latency=0.05, smoothing=1.0)
+        self.patch = mock.patch("api.admission._controller", self.controller)
+        self.patch.start()
+        self.owner = User.objects.create_user(email="owner@example.com", password="ownerpass1")
+        self.product = Product.objects.create(name="Gear", sku="AC-1", manufacturer="Acme", owner=self.owner)
+        self.url = f"/v1/product/{self.product.pk}/"
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.owner).key}")
+
+    def teardown_method(self):
+        self.patch.stop()
+
+    def test_reads_keep_the_last_slots(self):
+        for _ in range(3):
+            self.controller.admit("read")
+        assert self.client.get(self.url).status_code == 200
+        response = self.client.patch(self.url, {"quantity": 3}, format="json")
+        assert response.status_code == 503
+        assert response["Retry-After"] == "5"
+        assert signup(APIClient(), 1).status_code == 503
+        # POST on the batch endpoint is a read
+        assert self.client.post("/v1/product/batch", {"ids": [self.product.pk]}, format="json").status_code == 200
+        assert self.controller.in_flight == 3
+        assert APIClient().get("/healthz").status_code == 200
+
+        self.controller.admit("read")
+        assert self.client.get(self.url).status_code == 503
+        assert APIClient().get("/healthz").status_code == 503
+        # Probes and scrapes are never shed
+        assert APIClient().get("/healthz/live").status_code == 200
+        assert APIClient().get("/metrics").status_code == 200
+
+    def test_slow_database(self):
+        client = APIClient()
+        with slow_database(0.1):
+            # Reads are still served while the database is slow
+            assert client.get(self.url).status_code == 200
+            assert self.controller.latency > self.controller.target_latency
+            response = signup(client, 1)
+            assert response.status_code == 503
+            assert response.json() == {"detail": "Server overloaded, retry later."}
+            assert self.client.patch(self.url, {"quantity": 3}, format="json").status_code == 503
+            assert client.get("/healthz").status_code == 503
+            assert client.get("/healthz/live").status_code == 200
+
+        # Served from the product cache once the database is fast again
+        assert client.get(self.url).status_code == 200
+        assert client.get("/healthz").status_code == 200
+        assert signup(client, 2).status_code == 201
+        assert self.controller.in_flight == 0
+        body = client.get("/metrics").content.decode()
+        assert "api_admission_rejected_signup 1" in body
+        assert "api_admission_rejected_write 1" in body
+
+    def test_drained_instance_recovers_without_traffic(self):
+        client = APIClient()
+        with mock.patch("api.admission.time.monotonic", return_value=100.0) as clock:
+            # One slow admitted request, e.g. a large import
+            self.controller.admit("write")
+            self.controller.release(10.0)
+            assert client.get("/healthz").status_code == 503
+            assert signup(client, 1).status_code == 503
+            # Probes alone, no admitted requests: the average decays
+            clock.return_value = 130.0
+            assert client.get("/healthz").status_code == 503
+            clock.return_value = 160.0
+            assert client.get("/healthz").status_code == 200
+            assert signup(client, 2).status_code == 201
+
+    def test_disabled(self, settings):
+        settings.ADMISSION_CONTROL = {"ENABLED": False}
+        for _ in range(4):
+            self.controller.admit("read")
+        assert self.client.get(self.url).status_code == 200
+        assert APIClient().get("/healthz").status_code == 200
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.models import Product, User
+from webapp import settings_api
+
+
+@pytest.fixture
+def api_profile(settings):
+    settings.MIDDLEWARE = settings_api.MIDDLEWARE
+    settings.ROOT_URLCONF = settings_api.ROOT_URLCONF
+
+
+def test_profile_is_lean():
+    assert settings_api.DEBUG is False
+    assert not any("session" in name or "csrf" in name for name in settings_api.MIDDLEWARE)
+    assert "django.contrib.admin" not in settings_api.INSTALLED_APPS
+    assert settings_api.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] == ["api.renderers.FastJSONRenderer"]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("api_profile")
+class TestApiProfile:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(email="lean@example.com", password="leanpass1")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.user).key}")
+
+    def test_token_requests_touch_no_sessions(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/v1/user/self/")
+        assert response.status_code == 200
+        assert not any("django_session" in query["sql"] for query in queries)
+        assert "Set-Cookie" not in response
+        assert "Cookie" not in response.get("Vary", "")
+
+    def test_writes_need_no_csrf_token(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.user).key}")
+        data = {"name": "Lamp", "description": "LED", "sku": "LM-1", "manufacturer": "Ikea", "quantity": 1}
+        assert client.post("/v1/product/", data, format="json").status_code == 201
+        assert Product.objects.filter(sku="LM-1").exists()
+
+    def test_admin_is_not_routed(self):
+        assert APIClient().get("/admin/").status_code == 404
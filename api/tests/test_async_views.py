@@ -0,0 +1,169 @@
+import base64
+from unittest import mock
+
+import pytest
+from django.core.exceptions import PermissionDenied
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.views import IsOwnerOrReadOnly
+
+pytestmark = pytest.mark.urls("api.async_urls")
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=user).key}")
+    return client
+
+
+@pytest.mark.django_db
+class TestAsyncProductViews:
+
+    def setup_method(self):
+        self.owner = User.objects.create_user(email="async-owner@example.com", password="ownerpass")
+        self.other = User.objects.create_user(email="async-other@example.com", password="otherpass")
+        self.client = token_client(self.owner)
+        self.product = Product.objects.create(
+            name="Router", description="Wi-Fi 6", sku="RT-6", manufacturer="Asus", quantity=4, owner=self.owner
+        )
+        self.url = f"/v1/product/{self.product.id}/"
+
+    def test_create(self):
+        data = {"name": "Switch", "description": "8 port", "sku": "SW-8", "manufacturer": "TP-Link", "quantity": 2}
+        response = self.client.post("/v1/product/", data, format="json")
+        assert response.status_code == 201
+        assert response.json()["owner"] == self.owner.id
+        assert Product.objects.filter(sku="SW-8", owner=self.owner).exists()
+
+        duplicate = self.client.post("/v1/product/", data, format="json")
+        assert duplicate.status_code == 400
+        assert duplicate.json() == {"sku": ["SKU must be unique."]}
+
+    def test_create_requires_authentication(self):
+        response = APIClient().post("/v1/product/", {"name": "X"}, format="json")
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == "Token"
+
+    def test_list_falls_back_to_sync_view(self):
+        response = APIClient().get("/v1/product/")
+        assert response.status_code == 200
+        assert [item["sku"] for item in response.json()["results"]] == ["RT-6"]
+
+    def test_retrieve_is_public_cached_and_conditional(self, django_assert_num_queries):
+        response = APIClient().get(self.url)
+        assert response.status_code == 200
+        assert response.json()["name"] == "Router"
+        with django_assert_num_queries(0):
+            cached = APIClient().get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert cached.status_code == 304
+        assert APIClient().get("/v1/product/999999/").status_code == 404
+
+    def test_retrieve_fieldset(self):
+        assert APIClient().get(self.url + "?fields=sku,quantity").json() == {"sku": "RT-6", "quantity": 4}
+        assert APIClient().get(self.url + "?fields=secret").status_code == 400
+
+    def test_owner_can_patch(self):
+        response = self.client.patch(self.url, {"quantity": 9}, format="json")
+        assert response.status_code == 200
+        assert response.json()["quantity"] == 9
+        self.product.refresh_from_db()
+        assert self.product.quantity == 9
+        # The cached representation was dropped
+        assert APIClient().get(self.url).json()["quantity"] == 9
+
+    def test_write_permissions_match_sync_view(self):
+        assert token_client(self.other).patch(self.url, {"quantity": 1}, format="json").status_code == 403
+        assert token_client(self.other).delete(self.url).status_code == 403
+        assert APIClient().patch(self.url, {"quantity": 1}, format="json").status_code == 401
+        assert self.client.patch("/v1/product/999999/", {"quantity": 1}, format="json").status_code == 404
+
+    def test_stale_if_match_is_rejected(self):
+        etag = APIClient().get(self.url)["ETag"]
+        assert self.client.patch(self.url, {"quantity": 6}, format="json", HTTP_IF_MATCH=etag).status_code == 200
+        response = self.client.patch(self.url, {"quantity": 7}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+
+    def test_delete(self):
+        assert self.client.delete(self.url).status_code == 204
+        assert not Product.objects.filter(pk=self.product.pk).exists()
+
+    def test_form_and_multipart_bodies(self):
+        assert self.client.patch(self.url, {"quantity": 5}, format="multipart").status_code == 200
+        data = "name=Hub&sku=HB-1&manufacturer=Acme"
+        response = self.client.post("/v1/product/", data, content_type="application/x-www-form-urlencoded")
+        assert response.status_code == 201
+        assert response.json()["sku"] == "HB-1"
+        response = self.client.patch(self.url, "quantity: 1", content_type="text/plain")
+        assert response.status_code == 415
+
+    def test_content_negotiation(self):
+        assert APIClient().get(self.url + "?format=json").status_code == 200
+        indented = APIClient().get(self.url, HTTP_ACCEPT="application/json; indent=2")
+        assert indented["Content-Type"] == "application/json; indent=2"
+        assert indented.content.startswith(b'{\n  "id"')
+        assert APIClient().get(self.url, HTTP_ACCEPT="application/xml").status_code == 406
+        # The browsable API comes from the sync view
+        browsable = APIClient().get(self.url, HTTP_ACCEPT="text/html")
+        assert browsable.status_code == 200
+        assert browsable["Content-Type"].startswith("text/html")
+
+    def test_options_matches_sync_view(self):
+        # ProductDetailView does not allow OPTIONS
+        assert self.client.options(self.url).status_code == 405
+        response = self.client.options("/v1/user/self/")
+        assert response.status_code == 200
+        assert response.json()["name"] == "User Self"
+
+    def test_django_exceptions_are_mapped(self):
+        with mock.patch.object(IsOwnerOrReadOnly, "has_object_permission", side_effect=PermissionDenied):
+            response = self.client.delete(self.url)
+        assert response.status_code == 403
+        assert response.json() == {"detail": "You do not have permission to perform this action."}
+
+
+@pytest.mark.django_db
+class TestAsyncUserDetailView:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(
+            email="async-user@example.com", password="userpass1", first_name="Ada", last_name="L"
+        )
+        self.other = User.objects.create_user(email="async-user2@example.com", password="userpass2")
+        self.client = token_client(self.user)
+
+    def test_get_self_and_by_id(self):
+        for url in ("/v1/user/self/", f"/v1/user/{self.user.id}/"):
+            response = self.client.get(url)
+            assert response.status_code == 200
+            assert response.json()["email"] == "async-user@example.com"
+            assert "password" not in response.json()
+
+    def test_other_or_missing_user(self):
+        assert self.client.get(f"/v1/user/{self.other.id}/").status_code == 403
+        assert self.client.get("/v1/user/999999/").status_code == 404
+        assert APIClient().get("/v1/user/self/").status_code == 401
+
+    def test_basic_auth(self):
+        client = APIClient()
+        credentials = base64.b64encode(b"async-user@example.com:userpass1").decode()
+        client.credentials(HTTP_AUTHORIZATION=f"Basic {credentials}")
+        assert client.get("/v1/user/self/").status_code == 200
+
+        wrong = base64.b64encode(b"async-user@example.com:nope").decode()
+        client.credentials(HTTP_AUTHORIZATION=f"Basic {wrong}")
+        assert client.get("/v1/user/self/").status_code == 401
+
+    def test_patch_name_and_password(self):
+        response = self.client.patch("/v1/user/self/", {"first_name": "Grace", "password": "newpass99"}, format="json")
+        assert response.status_code == 200
+        assert response.json()["first_name"] == "Grace"
+        self.user.refresh_from_db()
+        assert self.user.first_name == "Grace"
+        assert self.user.check_password("newpass99")
+
+    def test_restricted_fields(self):
+        response = self.client.patch(f"/v1/user/{self.user.id}/", {"email": "x@example.com"}, format="json")
+        assert response.status_code == 400
+        self.user.refresh_from_db()
+        assert self.user.email == "async-user@example.com"
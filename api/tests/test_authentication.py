@@ -0,0 +1,198 @@
+import base64
+from unittest import mock
+
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.authentication import (
+    CachedTokenAuthentication, get_credential_cache, get_token_cache, token_cache_stats,
+)
+from api.caching import LRUCache
+
+
+def other_process():
+    # Signals handled by another worker only reach that worker's LRU
+    return mock.patch("api.authentication._token_cache", LRUCache(max_size=16, ttl=60))
+
+
+def basic_auth(email, password):
+    token = base64.b64encode(f"{email}:{password}".encode()).decode()
+    return f"Basic {token}"
+
+
+@pytest.mark.django_db
+class TestCachedBasicAuthentication:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.cache = get_credential_cache()
+        self.cache.clear()
+        self.user = User.objects.create_user(
+            email="basic@example.com",
+            password="basicpass",
+            first_name="Basic",
+            last_name="User"
+        )
+
+    def test_second_request_skips_password_hasher(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("basic@example.com", "basicpass"))
+        with mock.patch.object(User, "check_password", autospec=True, side_effect=User.check_password) as check:
+            assert self.client.get("/v1/basic-auth/").status_code == 200
+            assert self.client.get("/v1/basic-auth/").status_code == 200
+        assert check.call_count == 1
+        stats = self.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+    def test_wrong_password_is_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("basic@example.com", "wrong"))
+        assert self.client.get("/v1/basic-auth/").status_code == 401
+        assert len(self.cache) == 0
+
+    def test_password_change_drops_cached_credentials(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("basic@example.com", "basicpass"))
+        assert self.client.get("/v1/basic-auth/").status_code == 200
+
+        response = self.client.patch("/v1/user/self/", {"password": "changedpass"}, format="json")
+        assert response.status_code == 200
+        assert len(self.cache) == 0
+
+        assert self.client.get("/v1/basic-auth/").status_code == 401
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("basic@example.com", "changedpass"))
+        assert self.client.get("/v1/basic-auth/").status_code == 200
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION=basic_auth("basic@example.com", "basicpass"))
+        assert self.client.get("/v1/basic-auth/").status_code == 200
+
+        self.user.is_active = False
+        self.user.save()
+        assert len(self.cache) == 0
+        assert self.client.get("/v1/basic-auth/").status_code == 401
+
+    def test_lru_eviction_is_bounded(self):
+        self.cache.max_size = 2
+        try:
+            for i in range(3):
+                self.cache.set(f"key{i}", (i, "hash"))
+            assert len(self.cache) == 2
+            assert self.cache.get("key0") is None
+            assert self.cache.stats()["evictions"] == 1
+        finally:
+            self.cache.max_size = 1024
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.cache = get_token_cache()
+        self.cache.clear()
+        self.user = User.objects.create_user(
+            email="token@example.com",
+            password="tokenpass",
+            first_name="Token",
+            last_name="User"
+        )
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cache_hit_adds_no_queries(self, django_assert_num_queries):
+        auth = CachedTokenAuthentication()
+        user, token = auth.authenticate_credentials(self.token.key)
+        assert user.pk == self.user.pk
+
+        with django_assert_num_queries(0):
+            user, token = auth.authenticate_credentials(self.token.key)
+        assert user.email == "token@example.com"
+        assert token.key == self.token.key
+        assert token_cache_stats()["hits"] == 1
+
+    def test_cached_product_read_costs_no_queries(self, django_assert_num_queries):
+        product = Product.objects.create(
+            name="Mouse", sku="MOUSE1", manufacturer="Logitech", quantity=1, owner=self.user
+        )
+        assert self.client.get(f"/v1/product/{product.id}/").status_code == 200
+        with django_assert_num_queries(0):
+            assert self.client.get(f"/v1/product/{product.id}/").status_code == 200
+
+    def test_deleted_token_is_rejected(self):
+        assert self.client.get("/v1/user/self/").status_code == 200
+        self.token.delete()
+        assert self.client.get("/v1/user/self/").status_code == 401
+
+    def test_user_save_refreshes_snapshot(self):
+        assert self.client.get("/v1/user/self/").data["first_name"] == "Token"
+        self.user.first_name = "Renamed"
+        self.user.save()
+        assert self.client.get("/v1/user/self/").data["first_name"] == "Renamed"
+
+        self.user.is_active = False
+        self.user.save()
+        assert self.client.get("/v1/user/self/").status_code == 401
+
+    def test_update_through_cached_user_keeps_password(self):
+        response = self.client.patch("/v1/user/self/", {"last_name": "Patched"}, format="json")
+        assert response.status_code == 200
+        self.user.refresh_from_db()
+        assert self.user.last_name == "Patched"
+        assert self.user.check_password("tokenpass")
+
+    def test_shared_cache_tier(self, settings):
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, "SHARED_CACHE": "default"}
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        self.cache.clear()
+
+        shared_hits = token_cache_stats()["shared_hits"]
+        user, _ = auth.authenticate_credentials(self.token.key)
+        assert user.pk == self.user.pk
+        assert token_cache_stats()["shared_hits"] == shared_hits + 1
+
+        self.token.delete()
+        self.cache.clear()
+        with pytest.raises(AuthenticationFailed):
+            auth.authenticate_credentials(self.token.key)
+
+    def test_local_entries_outlive_invalidation_elsewhere_without_shared_cache(self):
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with other_process():
+            self.user.is_active = False
+            self.user.save()
+        # Stale for at most TOKEN_AUTH_CACHE["TTL"] seconds
+        user, _ = auth.authenticate_credentials(self.token.key)
+        assert user.is_active
+
+    def test_shared_generation_revokes_in_every_process(self, settings, django_assert_num_queries):
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, "SHARED_CACHE": "default"}
+        auth = CachedTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        with django_assert_num_queries(0):
+            auth.authenticate_credentials(self.token.key)
+
+        with other_process():
+            self.user.is_active = False
+            self.user.save()
+        assert self.cache.get(self.token.key) is not None
+        with pytest.raises(AuthenticationFailed, match="inactive"):
+            auth.authenticate_credentials(self.token.key)
+
+        self.user.is_active = True
+        self.user.save()
+        auth.authenticate_credentials(self.token.key)
+        with other_process():
+            self.token.delete()
+        with pytest.raises(AuthenticationFailed, match="Invalid token"):
+            auth.authenticate_credentials(self.token.key)
+
+    @pytest.mark.urls("api.async_urls")
+    def test_shared_generation_on_async_views(self, settings):
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, "SHARED_CACHE": "default"}
+        assert self.client.get("/v1/user/self/").status_code == 200
+        with other_process():
+            self.token.delete()
+        assert self.client.get("/v1/user/self/").status_code == 401
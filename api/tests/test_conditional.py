@@ -0,0 +1,126 @@
+import pytest
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIClient, APIRequestFactory
+from api.conditional import ConditionalRequestMixin, version_etag
+from api.models import User, Product
+from api.serializers import ProductSerializer
+
+@pytest.mark.django_db
+class TestProductConditionalRequests:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="etag@example.com", password="etagpass")
+        self.product = Product.objects.create(
+            name="Lamp", sku="LAMP1", manufacturer="Ikea", quantity=2, owner=self.user
+        )
+        self.url = f"/v1/product/{self.product.id}/"
+
+    def test_get_sets_validators(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert response["ETag"].startswith('"')
+        assert "GMT" in response["Last-Modified"]
+
+    def test_if_none_match_returns_304_without_queries(self, django_assert_num_queries):
+        etag = self.client.get(self.url)["ETag"]
+        with django_assert_num_queries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        assert self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+        old = "Mon, 01 Jan 2001 00:00:00 GMT"
+        assert self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=old).status_code == 200
+
+    def test_etag_changes_after_update(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(self.url, {"quantity": 4}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_stale_if_match_is_rejected(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.product.quantity = 9
+        self.product.save()
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(self.url, {"quantity": 1}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+        assert self.client.delete(self.url, HTTP_IF_MATCH=etag).status_code == 412
+        self.product.refresh_from_db()
+        assert self.product.quantity == 9
+
+    def test_delete_with_current_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_authenticate(user=self.user)
+        assert self.client.delete(self.url, HTTP_IF_MATCH=etag).status_code == 204
+
+
+@pytest.mark.django_db
+class TestUserConditionalRequests:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="etag-user@example.com", password="userpass", first_name="E", last_name="Tag"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_user_detail_304(self):
+        url = f"/v1/user/{self.user.id}/"
+        etag = self.client.get(url)["ETag"]
+        assert self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert self.client.get("/v1/user/self/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_other_user_is_still_forbidden(self):
+        other = User.objects.create_user(email="etag-other@example.com", password="otherpass")
+        response = self.client.get(f"/v1/user/{other.id}/", HTTP_IF_NONE_MATCH="*")
+        assert response.status_code == 403
+
+    def test_if_match_on_user_update(self):
+        etag = self.client.get("/v1/user/self/")["ETag"]
+        self.user.first_name = "Changed elsewhere"
+        self.user.save()
+
+        response = self.client.patch("/v1/user/self/", {"last_name": "X"}, format="json", HTTP_IF_MATCH=etag)
+        assert response.status_code == 412
+
+
+class DefaultProductView(ConditionalRequestMixin, generics.RetrieveAPIView):
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    permission_classes = [AllowAny]
+    last_modified_field = "date_updated"
+
+
+@pytest.mark.django_db
+class TestDefaultLastModified:
+
+    def setup_method(self):
+        owner = User.objects.create_user(email="default@example.com", password="defaultpass")
+        self.product = Product.objects.create(name="Pin", sku="CD-1", manufacturer="Acme", owner=owner)
+        self.view = DefaultProductView.as_view()
+        self.factory = APIRequestFactory()
+
+    def test_reads_last_modified_field(self, django_assert_num_queries):
+        response = self.view(self.factory.get("/"), pk=self.product.pk)
+        assert response.status_code == 200
+        assert response["ETag"] == version_etag(self.product.date_updated)
+        with django_assert_num_queries(1):
+            response = self.view(self.factory.get("/", HTTP_IF_NONE_MATCH=response["ETag"]), pk=self.product.pk)
+        assert response.status_code == 304
+
+    def test_unknown_object(self):
+        assert self.view(self.factory.get("/"), pk=999999).status_code == 404
+
+    def test_no_field_no_validators(self):
+        view = type("PlainView", (DefaultProductView,), {"last_modified_field": None}).as_view()
+        response = view(self.factory.get("/"), pk=self.product.pk)
+        assert response.status_code == 200
+        assert "ETag" not in response
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pytest
+from django.db import connections
+from api.db.pool import ConnectionPool, PoolTimeout
+from api.db.sqlite3.base import DatabaseWrapper
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_reuses_released_connections(self):
+        pool = ConnectionPool(max_size=2)
+        first, reused = pool.acquire(FakeConnection)
+        assert not reused
+        pool.release(first)
+        again, reused = pool.acquire(FakeConnection)
+        assert again is first and reused
+        stats = pool.stats()
+        assert (stats["created"], stats["reused"], stats["in_use"], stats["idle"]) == (1, 1, 1, 0)
+
+    def test_bounded_with_timeout(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.acquire(FakeConnection)
+        with pytest.raises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        stats = pool.stats()
+        assert (stats["size"], stats["timeouts"], stats["waits"]) == (1, 1, 0)
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        held, _ = pool.acquire(FakeConnection)
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire(FakeConnection)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(held)
+        waiter.join()
+        assert result[0] == (held, True)
+        stats = pool.stats()
+        assert stats["waits"] == 1 and stats["wait_time_max"] > 0
+
+    def test_recycles_old_connections(self):
+        pool = ConnectionPool(max_size=1, max_lifetime=0.01)
+        first, _ = pool.acquire(FakeConnection)
+        time.sleep(0.02)
+        pool.release(first)
+        assert first.closed
+        second, reused = pool.acquire(FakeConnection)
+        assert second is not first and not reused
+        assert pool.stats()["recycled"] == 1
+
+    def test_failed_health_check_replaces_connection(self):
+        def check(connection):
+            raise OSError("gone away")
+
+        pool = ConnectionPool(max_size=1, check_interval=0, check=check)
+        first, _ = pool.acquire(FakeConnection)
+        pool.release(first)
+        time.sleep(0.001)
+        second, reused = pool.acquire(FakeConnection)
+        assert first.closed and second is not first and not reused
+        assert pool.stats()["failed_checks"] == 1
+
+    def test_default_check_pings_with_select(self):
+        connection = sqlite3.connect(":memory:")
+        DatabaseWrapper.check_connection(connection)
+        connection.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            DatabaseWrapper.check_connection(connection)
+
+    def test_discarded_connection_frees_a_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        first, _ = pool.acquire(FakeConnection)
+        pool.release(first, discard=True)
+        assert first.closed
+        assert pool.acquire(FakeConnection)[0] is not first
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def setup_method(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        settings_dict = {
+            **connections["default"].settings_dict,
+            "NAME": self.path,
+            "CONN_MAX_AGE": 0,
+            "POOL": {"MAX_SIZE": 2},
+        }
+        self.wrapper = DatabaseWrapper(settings_dict, alias=f"pool-test-{id(self)}")
+
+    def teardown_method(self):
+        self.wrapper.close()
+        self.wrapper.get_pool().close_all()
+        os.remove(self.path)
+
+    def test_close_returns_connection_to_pool(self):
+        self.wrapper.ensure_connection()
+        raw = self.wrapper.connection
+        self.wrapper.close()
+        self.wrapper.ensure_connection()
+        assert self.wrapper.connection is raw
+        assert self.wrapper.pool_reused
+        stats = self.wrapper.get_pool().stats()
+        assert (stats["created"], stats["reused"], stats["in_use"]) == (1, 1, 1)
+
+    def test_open_transaction_is_rolled_back_on_release(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE item (id integer)")
+        self.wrapper.set_autocommit(False)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("INSERT INTO item VALUES (1)")
+        self.wrapper.close()
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM item")
+            assert cursor.fetchone()[0] == 0
+        assert self.wrapper.get_autocommit()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+from django.contrib.auth.hashers import check_password
+from rest_framework.test import APIClient
+from api.exceptions import HashingBusy
+from api.hashing import PasswordHashingService, get_hashing_service
+from api.models import User
+
+
+class TestPasswordHashingService:
+
+    def setup_method(self):
+        self.service = PasswordHashingService(workers=1, max_pending=1, acquire_timeout=0.1)
+
+    def teardown_method(self):
+        self.service.shutdown()
+
+    def test_hash_uses_configured_rounds(self):
+        hashed = self.service.hash_password("s3cret-pass")
+        assert hashed.startswith("bcrypt_sha256$$2b$04$")
+        assert check_password("s3cret-pass", hashed)
+        stats = self.service.stats()
+        assert (stats["submitted"], stats["completed"], stats["queue_depth"]) == (1, 1, 0)
+        assert stats["latency_max"] > 0
+
+    def test_async_hash(self):
+        hashed = asyncio.run(self.service.ahash_password("s3cret-pass"))
+        assert check_password("s3cret-pass", hashed)
+
+    def test_saturated_pool_rejects(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_hash(password):
+            started.set()
+            release.wait(5)
+            return "hashed"
+
+        with mock.patch("api.hashing.make_password", slow_hash):
+            holder = threading.Thread(target=self.service.hash_password, args=("first",))
+            holder.start()
+            started.wait(5)
+            assert self.service.stats()["queue_depth"] == 1
+            with pytest.raises(HashingBusy):
+                self.service.hash_password("second")
+            with pytest.raises(HashingBusy):
+                asyncio.run(self.service.ahash_password("third"))
+            release.set()
+            holder.join()
+
+        assert self.service.stats()["rejected"] == 2
+        # The slot is free again
+        assert check_password("fourth", self.service.hash_password("fourth"))
+
+
+@pytest.mark.django_db
+class TestUserPasswordsUsePool:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.service = get_hashing_service()
+        self.service.reset_stats()
+
+    def test_signup_and_password_change_hash_on_pool(self):
+        response = self.client.post("/v1/user/", {
+            "email": "pool@example.com", "password": "poolpass1", "first_name": "P", "last_name": "L"
+        }, format="json")
+        assert response.status_code == 201
+        user = User.objects.get(email="pool@example.com")
+        assert user.check_password("poolpass1")
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {response.data['token']}")
+        assert self.client.patch("/v1/user/self/", {"password": "poolpass2"}, format="json").status_code == 200
+        user.refresh_from_db()
+        assert user.check_password("poolpass2")
+        assert self.service.stats()["completed"] == 2
+
+    def test_busy_pool_answers_503(self):
+        with mock.patch.object(self.service, "hash_password", side_effect=HashingBusy()):
+            response = self.client.post("/v1/user/", {
+                "email": "busy@example.com", "password": "busypass1", "first_name": "B", "last_name": "Y"
+            }, format="json")
+        assert response.status_code == 503
+        assert not User.objects.filter(email="busy@example.com").exists()
@@ -1,4 +1,13 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 import pytest
+from django.core.management import call_command
+from django.db import OperationalError
+from django.utils import timezone
+from api.health import HEARTBEAT_ID, HealthProber
+from api.models import HealthCheck
 
 @pytest.mark.django_db
 def test_healthz_success(client):
@@ -15,3 +24,50 @@ def test_healthz_with_body(client):
 def test_healthz_with_query_params(client):
     response = client.get("/healthz?foo=bar")
     assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_healthz_does_not_write(client):
+    client.get("/healthz")
+    client.get("/healthz")
+    assert HealthCheck.objects.count() == 0
+
+@pytest.mark.django_db
+def test_healthz_answers_from_cached_probe(client, django_assert_num_queries):
+    client.get("/healthz/ready")
+    with django_assert_num_queries(0):
+        response = client.get("/healthz/ready")
+    assert response.status_code == 200
+
+def test_healthz_live_never_touches_db(client):
+    # No django_db mark: any database access would raise
+    response = client.get("/healthz/live")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == "no-cache, no-store, must-revalidate"
+
+@pytest.mark.django_db
+def test_healthz_reports_database_failure(client):
+    prober = HealthProber(background=False)
+    with mock.patch("api.views.get_prober", return_value=prober), \
+            mock.patch.object(prober, "check", side_effect=OperationalError("down")):
+        response = client.get("/healthz")
+    assert response.status_code == 503
+    assert response["Cache-Control"] == "no-cache, no-store, must-revalidate"
+
+@pytest.mark.django_db
+def test_heartbeat_mode_reuses_one_row():
+    prober = HealthProber(mode="heartbeat", background=False)
+    assert prober.probe()
+    assert prober.probe()
+    assert list(HealthCheck.objects.values_list("pk", flat=True)) == [HEARTBEAT_ID]
+
+@pytest.mark.django_db
+def test_prune_healthchecks_in_batches():
+    HealthCheck.objects.create(pk=HEARTBEAT_ID)
+    HealthCheck.objects.bulk_create([HealthCheck() for _ in range(5)])
+    HealthCheck.objects.update(checked_at=timezone.now() - timedelta(days=30))
+    recent = HealthCheck.objects.create()
+
+    out = StringIO()
+    call_command("prune_healthchecks", "--batch-size", "2", stdout=out)
+    assert "Deleted 5 HealthCheck rows in 3 batches." in out.getvalue()
+    assert set(HealthCheck.objects.values_list("pk", flat=True)) == {HEARTBEAT_ID, recent.pk}
@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+from django.db import OperationalError, connection
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.inventory import MAX_QUANTITY, InsufficientStock, apply_adjustments
+
+@pytest.mark.django_db
+class TestInventoryAdjustments:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="stock@example.com", password="stockpass")
+        self.client.force_authenticate(user=self.user)
+        self.a = Product.objects.create(name="A", sku="STOCK-A", manufacturer="Acme", quantity=10, owner=self.user)
+        self.b = Product.objects.create(name="B", sku="STOCK-B", manufacturer="Acme", quantity=2, owner=self.user)
+
+    def adjust(self, *adjustments):
+        return self.client.post("/v1/product/inventory/", {"adjustments": list(adjustments)}, format="json")
+
+    def test_batch_by_sku_and_id(self):
+        response = self.adjust({"sku": "STOCK-A", "delta": -3}, {"id": self.b.id, "delta": 5}, {"sku": "STOCK-A", "delta": 1})
+        assert response.status_code == 200
+        assert response.data["results"] == [
+            {"id": self.a.id, "sku": "STOCK-A", "quantity": 8},
+            {"id": self.b.id, "sku": "STOCK-B", "quantity": 7},
+        ]
+
+    def test_floor_rolls_back_whole_batch(self):
+        response = self.adjust({"sku": "STOCK-A", "delta": -1}, {"sku": "STOCK-B", "delta": -3})
+        assert response.status_code == 409
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        assert (self.a.quantity, self.b.quantity) == (10, 2)
+
+    def test_unknown_product_and_bad_entries(self):
+        response = self.adjust({"sku": "NOPE", "delta": 1})
+        assert response.status_code == 400
+        assert self.adjust({"sku": "STOCK-A", "id": self.a.id, "delta": 1}).status_code == 400
+        assert self.adjust().status_code == 400
+
+    def test_quantity_overflow_is_a_validation_error(self):
+        assert self.adjust({"sku": "STOCK-A", "delta": MAX_QUANTITY + 1}).status_code == 400
+        assert self.adjust({"sku": "STOCK-A", "delta": -MAX_QUANTITY - 1}).status_code == 400
+        # In range per entry, but the sum would overflow the column
+        response = self.adjust({"sku": "STOCK-B", "delta": -1}, {"sku": "STOCK-A", "delta": MAX_QUANTITY - 5})
+        assert response.status_code == 400
+        assert "would exceed" in response.data["adjustments"][0]
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        assert (self.a.quantity, self.b.quantity) == (10, 2)
+        assert self.adjust({"sku": "STOCK-A", "delta": MAX_QUANTITY - 10}).status_code == 200
+
+    def test_only_owner_can_adjust(self):
+        other = User.objects.create_user(email="stock-other@example.com", password="otherpass")
+        self.client.force_authenticate(user=other)
+        assert self.adjust({"sku": "STOCK-A", "delta": -1}).status_code == 403
+
+    def test_cached_detail_reflects_adjustment(self):
+        url = f"/v1/product/{self.a.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.adjust({"sku": "STOCK-A", "delta": -4})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.data["quantity"] == 6
+
+
+def run_concurrently(owner, product_id, deltas, per_thread):
+    outcomes = {"applied": 0, "insufficient": 0, "errors": []}
+    lock = threading.Lock()
+
+    def worker(delta):
+        try:
+            for _ in range(per_thread):
+                while True:
+                    try:
+                        apply_adjustments(owner, [{"id": product_id, "delta": delta}])
+                        outcome = "applied"
+                        break
+                    except InsufficientStock:
+                        outcome = "insufficient"
+                        break
+                    except OperationalError:
+                        # SQLite allows one writer at a time; the batch rolled back, so retry
+                        continue
+                with lock:
+                    outcomes[outcome] += 1
+        except Exception as exc:
+            outcomes["errors"].append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(delta,)) for delta in deltas]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_adjustments_lose_no_updates():
+    owner = User.objects.create_user(email="stress@example.com", password="stresspass")
+    product = Product.objects.create(name="Hot", sku="HOT", manufacturer="Acme", quantity=100, owner=owner)
+
+    # 6 threads add stock and 2 remove it, all on the same row
+    outcomes = run_concurrently(owner, product.id, [1, 1, 1, 1, 1, 1, -1, -1], per_thread=25)
+
+    assert outcomes["errors"] == []
+    assert outcomes["applied"] == 200
+    product.refresh_from_db()
+    assert product.quantity == 100 + 6 * 25 - 2 * 25
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_decrements_stop_at_zero():
+    owner = User.objects.create_user(email="drain@example.com", password="drainpass")
+    product = Product.objects.create(name="Last", sku="LAST", manufacturer="Acme", quantity=10, owner=owner)
+
+    outcomes = run_concurrently(owner, product.id, [-1] * 8, per_thread=5)
+
+    assert outcomes["errors"] == []
+    assert (outcomes["applied"], outcomes["insufficient"]) == (10, 30)
+    product.refresh_from_db()
+    assert product.quantity == 0
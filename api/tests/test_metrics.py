@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.metrics import MetricsMiddleware, QueryBudgetExceeded, RequestMetrics, _recorder, record_queries
+from api.metrics import get_request_metrics
+from api.models import Product, User
+
+DETAIL_ROUTE = "v1/product/<int:pk>/"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    get_request_metrics().reset()
+    yield
+
+
+def test_shards_are_merged():
+    metrics = RequestMetrics(latency_buckets=(0.1, 1))
+
+    def record(duration):
+        metrics.observe("v1/product/", "GET", 200, duration, 2, 0.01)
+
+    threads = [threading.Thread(target=record, args=(duration,)) for duration in (0.05, 0.5, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.observe("v1/product/", "GET", 404, 0.05, 1, 0.0)
+
+    series = metrics.snapshot()[("v1/product/", "GET")]
+    assert series.count == 4
+    assert series.statuses == {200: 3, 404: 1}
+    assert series.latency == [2, 1, 1]
+    assert series.queries_sum == 7
+    assert series.db_time == pytest.approx(0.03)
+
+
+def test_async_requests(settings):
+    settings.METRICS = {"QUERY_BUDGET": "raise", "QUERY_BUDGETS": {DETAIL_ROUTE: 2}}
+
+    async def view(request):
+        request.resolver_match = resolve(request.path)
+        for _ in range(request.queries):
+            # The recorder follows the request into sync_to_async threads
+            await sync_to_async(record_queries)(lambda *args: None, "SELECT 1", None, False, {})
+        return HttpResponse()
+
+    def send(queries):
+        request = RequestFactory().get("/v1/product/1/")
+        request.queries = queries
+        return asyncio.run(middleware(request))
+
+    middleware = MetricsMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    assert send(2).status_code == 200
+    series = get_request_metrics().snapshot()[(DETAIL_ROUTE, "GET")]
+    assert series.count == 1
+    assert series.queries_sum == 2
+    with pytest.raises(QueryBudgetExceeded, match=r"ran 3 queries \(budget 2\)"):
+        send(3)
+    assert _recorder.get() is None
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+
+    def setup_method(self):
+        self.owner = User.objects.create_user(email="metrics@example.com", password="metricspass")
+        self.product = Product.objects.create(name="Probe", sku="PR-1", manufacturer="Acme", owner=self.owner)
+        self.url = f"/v1/product/{self.product.pk}/"
+
+    def test_records_requests_queries_and_latency(self):
+        client = APIClient()
+        assert client.get(self.url).status_code == 200
+        assert client.get(self.url).status_code == 200
+        client.get("/no/such/page")
+
+        series = get_request_metrics().snapshot()[(DETAIL_ROUTE, "GET")]
+        assert series.count == 2
+        # The second read is served from the product cache
+        assert series.queries_sum == 1
+        assert series.queries[:2] == [1, 1]
+        assert series.latency_sum > 0
+        assert ("<unmatched>", "GET") in get_request_metrics().snapshot()
+
+    def test_metrics_endpoint(self):
+        APIClient().get(self.url)
+        response = APIClient().get("/metrics")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+        assert f'api_requests_total{{route="{DETAIL_ROUTE}",method="GET",status="200"}} 1' in body
+        assert f'api_request_db_queries_bucket{{route="{DETAIL_ROUTE}",method="GET",le="1"}} 1' in body
+        assert f'api_request_duration_seconds_count{{route="{DETAIL_ROUTE}",method="GET"}} 1' in body
+        assert "# TYPE api_request_duration_seconds histogram" in body
+        for gauge in ("api_product_cache_hit_ratio", "api_token_cache_hits", "api_password_hashing_submitted"):
+            assert gauge in body
+        assert APIClient().post("/metrics").status_code == 405
+
+    def test_query_budget_raise(self):
+        with override_settings(METRICS={"QUERY_BUDGET": "raise", "QUERY_BUDGETS": {DETAIL_ROUTE: 0}}):
+            with pytest.raises(QueryBudgetExceeded, match=r"GET v1/product/<int:pk>/ ran 1 queries \(budget 0\)"):
+                APIClient().get(self.url)
+            # Served from the cache: within budget
+            assert APIClient().get(self.url).status_code == 200
+
+    def test_query_budget_log(self, caplog):
+        with override_settings(METRICS={"QUERY_BUDGET": "log", "QUERY_BUDGETS": {DETAIL_ROUTE: {"GET": 0}}}):
+            with caplog.at_level(logging.WARNING, logger="api.metrics"):
+                assert APIClient().get(self.url).status_code == 200
+        assert "ran 1 queries (budget 0)" in caplog.text
+
+    def test_disabled(self):
+        with override_settings(METRICS={"ENABLED": False}):
+            APIClient().get(self.url)
+        assert get_request_metrics().snapshot() == {}
+
+    def test_user_detail_reuses_authenticated_user(self, django_assert_num_queries):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.owner).key}")
+        # Only the token lookup; get_object() does not reload the user
+        with django_assert_num_queries(1):
+            assert client.get(f"/v1/user/{self.owner.pk}/").status_code == 200
@@ -0,0 +1,36 @@
+import pytest
+from rest_framework.test import APIClient
+from api.models import User, Product
+
+@pytest.mark.django_db
+class TestProductBatch:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="batch@example.com", password="batchpass")
+        self.products = [
+            Product.objects.create(name=f"Item {i}", sku=f"BAT{i}", manufacturer="Acme", quantity=i, owner=self.user)
+            for i in range(4)
+        ]
+
+    def test_get_preserves_order_and_reports_missing(self, django_assert_num_queries):
+        ids = [self.products[2].id, 999999, self.products[0].id, self.products[2].id]
+        with django_assert_num_queries(1):
+            response = self.client.get(f"/v1/product/batch?ids={','.join(map(str, ids))}")
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data["results"]] == [self.products[2].id, self.products[0].id]
+        assert response.data["missing"] == [999999]
+
+    def test_post_body_variant_is_public(self):
+        ids = [p.id for p in reversed(self.products)]
+        response = self.client.post("/v1/product/batch/", {"ids": ids}, format="json")
+        assert response.status_code == 200
+        assert [item["sku"] for item in response.data["results"]] == ["BAT3", "BAT2", "BAT1", "BAT0"]
+
+    def test_batch_size_is_capped(self):
+        response = self.client.post("/v1/product/batch", {"ids": list(range(1, 202))}, format="json")
+        assert response.status_code == 400
+
+    def test_invalid_ids(self):
+        assert self.client.get("/v1/product/batch?ids=1,abc").status_code == 400
+        assert self.client.get("/v1/product/batch").status_code == 400
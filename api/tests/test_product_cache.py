@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.product_cache import ProductCache, get_product_cache
+
+@pytest.mark.django_db
+class TestProductDetailCache:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.cache = get_product_cache()
+        self.cache.reset_stats()
+        self.user = User.objects.create_user(email="cache@example.com", password="cachepass")
+        self.product = Product.objects.create(
+            name="Drone", description="Quadcopter", sku="DRONE1", manufacturer="DJI", quantity=3, owner=self.user
+        )
+        self.url = f"/v1/product/{self.product.id}/"
+
+    def test_second_read_is_served_from_cache(self, django_assert_num_queries):
+        assert self.client.get(self.url).data["name"] == "Drone"
+        with django_assert_num_queries(0):
+            response = self.client.get(self.url)
+        assert response.data["name"] == "Drone"
+        stats = self.cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_save_and_delete_invalidate(self):
+        self.client.get(self.url)
+        self.product.name = "Drone v2"
+        self.product.save()
+        assert self.client.get(self.url).data["name"] == "Drone v2"
+
+        self.client.force_authenticate(user=self.user)
+        assert self.client.patch(self.url, {"quantity": 7}, format="json").status_code == 200
+        assert self.client.get(self.url).data["quantity"] == 7
+
+        self.product.delete()
+        assert self.client.get(self.url).status_code == 404
+
+    def test_import_upsert_invalidates(self):
+        self.client.get(self.url)
+        self.client.force_authenticate(user=self.user)
+        body = '{"name": "Imported", "sku": "DRONE1", "manufacturer": "DJI", "quantity": 1}\n'
+        self.client.generic("POST", "/v1/product/import/", body, content_type="application/x-ndjson")
+        assert self.client.get(self.url).data["name"] == "Imported"
+
+    def test_missing_product_is_404(self):
+        assert self.client.get("/v1/product/999999/").status_code == 404
+
+
+def test_concurrent_misses_load_once():
+    cache = ProductCache(ttl=60, lock_timeout=2, prefix="test:stampede")
+    calls = []
+
+    def loader(pk):
+        calls.append(pk)
+        time.sleep(0.2)
+        return {"id": pk}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(1, loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{"id": 1}] * 8
+    assert cache.stats()["lock_waits"] == 7
+
+
+def test_stale_entry_refreshed_by_one_caller():
+    cache = ProductCache(ttl=0, stale_ttl=60, prefix="test:stale")
+    cache.get_or_load(1, lambda pk: {"version": 1})
+    # Simulate another request holding the refresh lock
+    cache.cache.add(cache.lock_key(1), 1, 5)
+    assert cache.get_or_load(1, lambda pk: {"version": 2}) == {"version": 1}
+    assert cache.stats()["stale_hits"] == 1
+
+    cache.cache.delete(cache.lock_key(1))
+    assert cache.get_or_load(1, lambda pk: {"version": 2}) == {"version": 2}
@@ -0,0 +1,67 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.serializers import ProductSerializer
+
+@pytest.mark.django_db
+class TestProductExport:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="export@example.com", password="exportpass")
+        self.other = User.objects.create_user(email="export-other@example.com", password="otherpass")
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Product.objects.create(
+                name=f"Item {i}", description="line one\nline two", sku=f"EXP{i}",
+                manufacturer="Acme", quantity=i, owner=self.user if i < 3 else self.other,
+            )
+
+    def read(self, response):
+        body = b"".join(response.streaming_content)
+        if response.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body.decode()
+
+    def test_ndjson_matches_serializer_output(self):
+        response = self.client.get("/v1/product/export/")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        expected = ProductSerializer(Product.objects.order_by("id"), many=True).data
+        assert rows == [dict(item) for item in expected]
+
+    def test_csv_for_one_owner(self):
+        response = self.client.get(f"/v1/product/export/?output=csv&owner={self.other.id}")
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert [row["sku"] for row in rows] == ["EXP3", "EXP4"]
+        assert rows[0]["description"] == "line one\nline two"
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get("/v1/product/export/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        assert response["Content-Encoding"] == "gzip"
+        assert len(self.read(response).splitlines()) == 5
+
+    def test_chunks_are_keyset_queries(self, django_assert_num_queries):
+        from api.exporters import export_products
+        # 5 rows in chunks of 2: three full/partial chunks plus the empty terminator
+        with django_assert_num_queries(4):
+            list(export_products("ndjson", chunk_size=2))
+
+    def test_requires_auth_and_valid_output(self):
+        assert self.client.get("/v1/product/export/?output=xml").status_code == 400
+        self.client.logout()
+        assert self.client.get("/v1/product/export/").status_code == 401
+
+    def test_management_command(self, tmp_path):
+        path = tmp_path / "products.csv.gz"
+        call_command("export_products", str(path), "--format", "csv", "--gzip",
+                     "--owner", "export@example.com")
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(path.read_bytes()).decode())))
+        assert len(rows) == 3
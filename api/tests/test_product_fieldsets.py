@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.serializers import product_reader_for, product_serializer_for
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="fields@example.com", password="fieldspass")
+        self.products = [
+            Product.objects.create(
+                name=f"Book {i}", description="x" * 5000, sku=f"BOOK-{i}", manufacturer="Penguin",
+                quantity=i, owner=self.user
+            )
+            for i in range(3)
+        ]
+
+    def test_list_fields_loads_only_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/v1/product/?fields=quantity,name,sku")
+        assert response.status_code == 200
+        assert response.data["results"][0] == {"name": "Book 0", "sku": "BOOK-0", "quantity": 0}
+        assert len(queries) == 1
+        assert '"description"' not in queries[0]["sql"]
+
+    def test_list_exclude(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/v1/product/?exclude=description")
+        item = response.data["results"][0]
+        assert "description" not in item and item["sku"] == "BOOK-0"
+        assert '"description"' not in queries[0]["sql"]
+
+    def test_fields_and_exclude_combine(self):
+        response = self.client.get("/v1/product/?fields=name,sku,description&exclude=description")
+        assert response.data["results"][0] == {"name": "Book 0", "sku": "BOOK-0"}
+
+    def test_pagination_still_works_with_fieldset(self):
+        first = self.client.get("/v1/product/?fields=sku&page_size=2")
+        assert [item["sku"] for item in first.data["results"]] == ["BOOK-0", "BOOK-1"]
+        second = self.client.get(first.data["next"])
+        assert [item["sku"] for item in second.data["results"]] == ["BOOK-2"]
+
+    def test_invalid_fieldsets(self):
+        assert self.client.get("/v1/product/?fields=name,secret").status_code == 400
+        assert self.client.get("/v1/product/?exclude=bogus").status_code == 400
+        assert self.client.get("/v1/product/?fields=name&exclude=name").status_code == 400
+        assert self.client.get(f"/v1/product/{self.products[0].id}/?fields=secret").status_code == 400
+
+    def test_detail_fieldset(self):
+        url = f"/v1/product/{self.products[1].id}/"
+        assert self.client.get(url + "?fields=id,sku").data == {"id": self.products[1].id, "sku": "BOOK-1"}
+        # Full representation still cached and served
+        assert self.client.get(url).data["description"] == "x" * 5000
+
+    def test_batch_fieldset(self):
+        ids = ",".join(str(product.id) for product in self.products[:2])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/v1/product/batch?ids={ids}&exclude=description,owner")
+        assert response.status_code == 200
+        assert [set(item) for item in response.data["results"]] == [
+            {"id", "name", "sku", "manufacturer", "quantity", "date_added"}
+        ] * 2
+        assert '"description"' not in queries[0]["sql"]
+
+    def test_serializer_class_is_cached_per_fieldset(self):
+        assert product_serializer_for(("name", "sku")) is product_serializer_for(("name", "sku"))
+        assert product_reader_for(("name", "sku")) is product_reader_for(("name", "sku"))
+        assert product_reader_for(None).names[0] == "id"
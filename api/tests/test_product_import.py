@@ -0,0 +1,113 @@
+import json
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connections, router
+from django.db.models.query import QuerySet
+from rest_framework.test import APIClient
+from api.importers import UPSERT_FIELDS, ProductImporter
+from api.models import User, Product
+
+CSV_BODY = (
+    "name,description,sku,manufacturer,quantity\n"
+    "Laptop,\"Thin, light\",IMP001,Apple,3\n"
+    "Phone,,IMP002,Apple,-1\n"
+    "Tablet,iPad,IMP003,Apple,2\n"
+)
+
+@pytest.mark.django_db
+class TestProductImport:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="import@example.com", password="importpass")
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, body, content_type, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return self.client.generic("POST", f"/v1/product/import/?{query}", body, content_type=content_type)
+
+    def test_csv_import_reports_row_errors(self):
+        response = self.post(CSV_BODY, "text/csv")
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert response.data["failed"] == 1
+        assert response.data["errors"][0]["row"] == 2
+        assert "quantity" in response.data["errors"][0]["errors"]
+        assert Product.objects.get(sku="IMP001").description == "Thin, light"
+
+    def test_ndjson_upserts_on_sku(self):
+        Product.objects.create(name="Old", sku="IMP010", manufacturer="Sony", quantity=1, owner=self.user)
+        lines = [
+            {"name": "New", "sku": "IMP010", "manufacturer": "Sony", "quantity": 9},
+            {"name": "Fresh", "sku": "IMP011", "manufacturer": "Sony", "quantity": 1},
+        ]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n\nnot json\n"
+        response = self.post(body, "application/x-ndjson")
+        assert response.status_code == 200
+        assert (response.data["created"], response.data["updated"], response.data["failed"]) == (1, 1, 1)
+        product = Product.objects.get(sku="IMP010")
+        assert (product.name, product.quantity) == ("New", 9)
+
+    def test_one_sku_query_per_chunk(self, django_assert_max_num_queries):
+        body = "".join(
+            json.dumps({"name": f"P{i}", "sku": f"CHUNK{i}", "manufacturer": "Acme", "quantity": i}) + "\n"
+            for i in range(20)
+        )
+        # Per chunk: savepoint, SKU lookup, upsert, owner re-check, release -> 4 chunks of 5 rows
+        with django_assert_max_num_queries(20):
+            response = self.post(body, "application/x-ndjson", chunk_size=5)
+        assert response.data["created"] == 20
+
+    def test_cannot_take_over_another_users_sku(self):
+        other = User.objects.create_user(email="rival@example.com", password="rivalpass")
+        Product.objects.create(name="Theirs", sku="IMP001", manufacturer="Apple", quantity=1, owner=other)
+        response = self.post(CSV_BODY, "text/csv")
+        assert {error["row"] for error in response.data["errors"]} == {1, 2}
+        assert Product.objects.get(sku="IMP001").owner == other
+
+    def test_sku_inserted_concurrently_by_another_user(self):
+        other = User.objects.create_user(email="racer@example.com", password="racerpass")
+        Product.objects.create(name="Theirs", sku="IMP003", manufacturer="Apple", quantity=1, owner=other)
+        lookup = ProductImporter.lookup
+        calls = []
+
+        def stale_lookup(skus):
+            # The first lookup ran before the other user's insert committed
+            calls.append(skus)
+            return {} if len(calls) == 1 else lookup(skus)
+
+        with mock.patch.object(ProductImporter, "lookup", side_effect=stale_lookup):
+            response = self.post(CSV_BODY, "text/csv")
+        assert len(calls) == 2
+        assert {error["row"] for error in response.data["errors"]} == {2, 3}
+        assert response.data["created"] == 1
+        theirs = Product.objects.get(sku="IMP003")
+        assert (theirs.owner, theirs.name) == (other, "Theirs")
+
+    def test_upsert_without_conflict_target(self):
+        # MySQL: ON DUPLICATE KEY UPDATE takes no unique_fields
+        connection = connections[router.db_for_write(Product)]
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False), \
+                mock.patch.object(QuerySet, "bulk_create", autospec=True) as bulk_create:
+            response = self.post(CSV_BODY, "text/csv")
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        _, kwargs = bulk_create.call_args
+        assert "unique_fields" not in kwargs
+        assert kwargs["update_conflicts"] and kwargs["update_fields"] == UPSERT_FIELDS
+
+    def test_unsupported_content_type(self):
+        response = self.client.post("/v1/product/import/", {"sku": "X"}, format="json")
+        assert response.status_code == 415
+
+    def test_management_command(self, tmp_path):
+        path = tmp_path / "products.csv"
+        path.write_text(CSV_BODY)
+        out, err = StringIO(), StringIO()
+        call_command("import_products", str(path), "--owner", "import@example.com",
+                     "--chunk-size", "2", stdout=out, stderr=err)
+        assert "Created 2, updated 0, failed 1." in out.getvalue()
+        assert "row 2" in err.getvalue()
@@ -0,0 +1,71 @@
+import pytest
+from rest_framework.test import APIClient
+from api.models import User, Product
+
+@pytest.mark.django_db
+class TestProductList:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.owner = User.objects.create_user(email="list@example.com", password="listpass")
+        self.other = User.objects.create_user(email="other-list@example.com", password="otherpass")
+        self.products = [
+            Product.objects.create(
+                name=f"Item {i}",
+                sku=f"LIST{i:03d}",
+                manufacturer="Acme" if i % 2 else "Globex",
+                quantity=i,
+                owner=self.owner if i < 6 else self.other,
+            )
+            for i in range(10)
+        ]
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_list_is_public(self):
+        response = self.client.get("/v1/product/")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 10
+        assert response.data["next"] is None
+
+    def test_keyset_pages_cover_every_product_once(self):
+        ids = self.collect("/v1/product/?page_size=3")
+        assert ids == [p.id for p in self.products]
+
+    def test_rows_sharing_a_timestamp_are_not_skipped(self):
+        Product.objects.update(date_added=self.products[0].date_added)
+        ids = self.collect("/v1/product/?page_size=4")
+        assert ids == sorted(p.id for p in self.products)
+
+    def test_page_size_is_bounded(self):
+        response = self.client.get("/v1/product/?page_size=100000")
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 10
+
+    def test_filters(self):
+        ids = self.collect(f"/v1/product/?owner={self.other.id}")
+        assert ids == [p.id for p in self.products[6:]]
+
+        ids = self.collect("/v1/product/?manufacturer=Acme&min_quantity=3&max_quantity=7")
+        assert ids == [self.products[i].id for i in (3, 5, 7)]
+
+    def test_invalid_filter_and_cursor(self):
+        assert self.client.get("/v1/product/?owner=abc").status_code == 400
+        assert self.client.get("/v1/product/?cursor=garbage").status_code == 404
+
+    def test_deep_page_is_single_query(self, django_assert_num_queries):
+        first = self.client.get("/v1/product/?page_size=2")
+        with django_assert_num_queries(1):
+            response = self.client.get(first.data["next"])
+        assert response.status_code == 200
+
+    def test_create_still_requires_auth(self):
+        data = {"name": "X", "sku": "NOAUTH", "manufacturer": "Acme", "quantity": 1}
+        assert self.client.post("/v1/product/", data, format="json").status_code == 401
@@ -0,0 +1,59 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.views import ProductDetailView
+
+@pytest.mark.django_db
+class TestProductUpdate:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="update-prod@example.com", password="updatepass")
+        self.client.force_authenticate(user=self.user)
+        self.product = Product.objects.create(
+            name="Monitor", description="27 inch", sku="MON27", manufacturer="Dell", quantity=5, owner=self.user
+        )
+        self.url = f"/v1/product/{self.product.id}/"
+
+    def test_patch_is_one_select_and_one_narrow_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {"quantity": 8}, format="json")
+        assert response.status_code == 200
+        assert response.data["quantity"] == 8
+        assert len(queries) == 2
+        update_sql = queries[1]["sql"]
+        assert update_sql.startswith("UPDATE")
+        assert '"quantity"' in update_sql
+        assert '"description"' not in update_sql and '"name"' not in update_sql
+        self.product.refresh_from_db()
+        assert self.product.quantity == 8
+
+    def test_unchanged_put_does_not_write(self):
+        data = {"name": "Monitor", "description": "27 inch", "sku": "MON27", "manufacturer": "Dell", "quantity": 5}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(self.url, data, format="json")
+        assert response.status_code == 200
+        assert not any(query["sql"].startswith("UPDATE") for query in queries)
+
+    def test_lost_race_returns_409(self):
+        original_get_object = ProductDetailView.get_object
+
+        def get_object_then_concurrent_write(view):
+            instance = original_get_object(view)
+            # Another request commits between our read and our write
+            Product.objects.filter(pk=instance.pk).update(quantity=1, date_updated=timezone.now())
+            return instance
+
+        with mock.patch.object(ProductDetailView, "get_object", autospec=True,
+                               side_effect=get_object_then_concurrent_write):
+            response = self.client.patch(self.url, {"quantity": 9}, format="json")
+            assert response.status_code == 409
+            assert self.client.delete(self.url).status_code == 409
+
+        self.product.refresh_from_db()
+        assert self.product.quantity == 1
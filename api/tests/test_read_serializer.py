@@ -0,0 +1,68 @@
+import json
+from io import BytesIO
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from api.models import User, Product
+from api.renderers import FastJSONParser, FastJSONRenderer
+from api.serializers import ProductSerializer, UserSerializer, product_reader, user_reader
+
+@pytest.mark.django_db
+class TestReadSerializer:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(
+            email="reader@example.com", password="readerpass", first_name="Rea", last_name="Der"
+        )
+        self.products = [
+            Product.objects.create(
+                name=f"Lamp {i}", description="", sku=f"LAMP-{i}", manufacturer="Ikea", quantity=i, owner=self.user
+            )
+            for i in range(3)
+        ]
+
+    def test_matches_model_serializer(self):
+        for product in self.products:
+            assert product_reader.to_representation(product) == ProductSerializer(product).data
+        assert user_reader.to_representation(self.user) == UserSerializer(self.user).data
+        assert "password" not in user_reader.to_representation(self.user)
+
+    def test_active_timezone_is_respected(self):
+        with timezone.override("Europe/Berlin"):
+            expected = ProductSerializer(self.products, many=True).data
+            assert product_reader.many(self.products) == expected
+        assert "+0" in expected[0]["date_added"]
+
+    def test_rows_match_instances(self):
+        queryset = Product.objects.order_by("id")
+        assert product_reader.from_queryset(queryset) == ProductSerializer(queryset, many=True).data
+
+    def test_list_and_detail_endpoints_use_same_shape(self):
+        client = APIClient()
+        listed = client.get("/v1/product/").data["results"]
+        assert listed == ProductSerializer(Product.objects.order_by("date_added", "id"), many=True).data
+        detail = client.get(f"/v1/product/{self.products[0].id}/").data
+        assert detail == ProductSerializer(self.products[0]).data
+
+
+class TestFastJSON:
+
+    data = {"name": "Lamp", "quantity": 3, "tags": ["a", "ü"], "nested": {"ok": True, "none": None}}
+
+    def test_renders_like_drf(self):
+        assert json.loads(FastJSONRenderer().render(self.data)) == json.loads(JSONRenderer().render(self.data))
+
+    def test_stdlib_fallback(self):
+        with override_settings(JSON_BACKEND="json"):
+            assert FastJSONRenderer().render(self.data) == JSONRenderer().render(self.data)
+
+    def test_parser_round_trip_and_errors(self):
+        for backend in ("orjson", "json"):
+            with override_settings(JSON_BACKEND=backend):
+                assert FastJSONParser().parse(BytesIO(FastJSONRenderer().render(self.data))) == self.data
+                with pytest.raises(ParseError):
+                    FastJSONParser().parse(BytesIO(b"{not json"))
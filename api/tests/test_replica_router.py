@@ -0,0 +1,189 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import caches
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.models import Product, User
+from api.routers import ReplicaRouter, ReplicaRoutingMiddleware, replicas
+
+
+def replica_settings(**overrides):
+    config = {"ALIASES": {"replica1": 1, "replica2": 1}, "STICKY_SECONDS": 5, "FAILURE_COOLDOWN": 30}
+    return override_settings(DATABASE_REPLICAS={**config, **overrides})
+
+
+@pytest.fixture(autouse=True)
+def reset_replicas():
+    replicas.reset()
+    yield
+    replicas.reset()
+
+
+class TestReplicaRouting:
+
+    def setup_method(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(self.read_database)
+        self.model = Product
+        self.routed = []
+        # Reachable replicas without opening connections
+        self.connections = {alias: mock.Mock(in_atomic_block=False) for alias in ("default", "replica1", "replica2")}
+        self.patcher = mock.patch("api.routers.connections", self.connections)
+        self.patcher.start()
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    def read_database(self, request):
+        self.routed.append(self.router.db_for_read(self.model))
+        return HttpResponse()
+
+    def send(self, method, token="alice"):
+        request = getattr(self.factory, method)("/v1/product/", HTTP_AUTHORIZATION=f"Token {token}")
+        self.middleware(request)
+        return self.routed[-1]
+
+    def test_inert_without_replicas(self):
+        assert self.send("get") is None
+        assert self.router.db_for_read(Product) is None
+
+    @replica_settings()
+    def test_safe_methods_read_from_a_replica(self):
+        assert self.send("get") in ("replica1", "replica2")
+        assert self.send("head", token="bob") in ("replica1", "replica2")
+        assert self.send("post", token="carol") is None
+        # Outside a request (commands, the health prober) reads use the primary
+        assert self.router.db_for_read(Product) is None
+
+    @replica_settings()
+    def test_only_api_models_are_routed(self):
+        self.model = Token
+        assert self.send("get") is None
+
+    @replica_settings(STICKY_SECONDS=5)
+    def test_client_sticks_to_primary_after_a_write(self):
+        self.send("patch")
+        assert self.send("get") is None
+        # Other clients still read from replicas
+        assert self.send("get", token="bob") in ("replica1", "replica2")
+
+        # The pin expires with its cache entry
+        caches["default"].clear()
+        assert self.send("get") in ("replica1", "replica2")
+
+    @replica_settings()
+    def test_async_requests_are_routed(self):
+        async def read_database(request):
+            return self.read_database(request)
+
+        middleware = ReplicaRoutingMiddleware(read_database)
+        assert iscoroutinefunction(middleware)
+
+        def send(method, token="alice"):
+            request = getattr(self.factory, method)("/v1/product/", HTTP_AUTHORIZATION=f"Token {token}")
+            asyncio.run(middleware(request))
+            return self.routed[-1]
+
+        assert send("get") in ("replica1", "replica2")
+        send("patch")
+        assert send("get") is None
+        assert send("get", token="bob") in ("replica1", "replica2")
+        assert self.router.db_for_read(Product) is None
+
+    @replica_settings(ALIASES={"replica1": 3, "replica2": 0})
+    def test_weighted_selection_skips_zero_weight(self):
+        assert {self.send("get") for _ in range(10)} == {"replica1"}
+
+    @replica_settings(STRATEGY="least_loaded")
+    def test_least_loaded_selection(self):
+        assert replicas.choose() == "replica1"
+        assert self.send("get") == "replica2"
+        replicas.release("replica1")
+        assert self.send("get") == "replica1"
+
+    @replica_settings()
+    def test_unreachable_replica_falls_back(self):
+        self.connections["replica1"].ensure_connection.side_effect = OperationalError
+        assert {self.send("get") for _ in range(10)} == {"replica2"}
+        # Skipped for its cooldown even once reachable again
+        self.connections["replica1"].ensure_connection.side_effect = None
+        assert {self.send("get") for _ in range(10)} == {"replica2"}
+
+        self.connections["replica2"].ensure_connection.side_effect = OperationalError
+        assert self.send("get") is None
+
+    @replica_settings()
+    def test_reads_inside_a_transaction_use_primary(self):
+        self.connections["default"].in_atomic_block = True
+        assert self.send("get") == "default"
+
+    @replica_settings(ALIASES={"replica1": 1})
+    def test_database_error_marks_replica_down(self):
+        self.send("get")
+        request = self.factory.get("/v1/product/")
+
+        def failing_view(request):
+            self.middleware.process_exception(request, OperationalError("replica gone"))
+            return HttpResponse(status=500)
+
+        ReplicaRoutingMiddleware(failing_view)(request)
+        assert self.send("get") is None
+
+    @replica_settings()
+    def test_writes_and_migrations_use_primary(self):
+        assert self.router.db_for_write(Product) == "default"
+        assert self.router.db_for_write(Product, instance=Product(sku="X")) == "default"
+        assert self.router.allow_migrate("replica1", "api") is False
+        assert self.router.allow_migrate("default", "api") is None
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica1", "replica2"])
+class TestReplicaReads:
+
+    def setup_method(self):
+        self.owner = User.objects.create_user(email="replica-owner@example.com", password="ownerpass")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.owner).key}")
+        Product.objects.create(name="Mirror", sku="MR-1", manufacturer="Acme", owner=self.owner)
+
+    @replica_settings(ALIASES={"replica1": 1})
+    def test_list_reads_from_replica_until_client_writes(self):
+        with CaptureQueriesContext(connections["replica1"]) as replica_queries:
+            response = self.client.get("/v1/product/")
+        assert response.status_code == 200
+        assert [item["sku"] for item in response.json()["results"]] == ["MR-1"]
+        assert any("api_product" in query["sql"] for query in replica_queries)
+
+        data = {"name": "Lens", "sku": "LN-1", "manufacturer": "Acme", "description": "50mm", "quantity": 1}
+        assert self.client.post("/v1/product/", data, format="json").status_code == 201
+        with CaptureQueriesContext(connections["replica1"]) as replica_queries:
+            skus = [item["sku"] for item in self.client.get("/v1/product/").json()["results"]]
+        assert sorted(skus) == ["LN-1", "MR-1"]
+        assert not replica_queries.captured_queries
+
+    @replica_settings(ALIASES={"replica1": 1})
+    def test_product_cache_fills_from_primary(self):
+        # A lagging replica must not feed the shared cache: another client's
+        # sticky-primary read after a write would be served the stale entry
+        product = Product.objects.get(sku="MR-1")
+        url = f"/v1/product/{product.pk}/"
+        reader = APIClient()
+        with CaptureQueriesContext(connections["replica1"]) as replica_queries, \
+                CaptureQueriesContext(connections["default"]) as primary_queries:
+            assert reader.get(url).status_code == 200
+        assert not replica_queries.captured_queries
+        assert any("api_product" in query["sql"] for query in primary_queries)
+
+        assert self.client.patch(url, {"quantity": 7}, format="json").status_code == 200
+        with CaptureQueriesContext(connections["replica1"]) as replica_queries:
+            assert reader.get(url).json()["quantity"] == 7
+        assert not replica_queries.captured_queries
+        assert self.client.get(url).json()["quantity"] == 7
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from api.models import User, Product, StockReservation
+
+@pytest.mark.django_db
+class TestStockReservations:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user(email="seller@example.com", password="sellerpass")
+        self.buyer = User.objects.create_user(email="buyer@example.com", password="buyerpass")
+        self.client.force_authenticate(user=self.buyer)
+        self.product = Product.objects.create(
+            name="Sneaker", sku="FLASH1", manufacturer="Nike", quantity=5, owner=self.seller
+        )
+        self.reserve_url = f"/v1/product/{self.product.id}/reservations/"
+        self.availability_url = f"/v1/product/{self.product.id}/availability/"
+
+    def reserve(self, quantity):
+        return self.client.post(self.reserve_url, {"quantity": quantity}, format="json")
+
+    def test_hold_reduces_availability_not_quantity(self, django_assert_max_num_queries):
+        with django_assert_max_num_queries(3):
+            response = self.reserve(3)
+        assert response.status_code == 201
+        assert response.data["status"] == StockReservation.HELD
+        self.product.refresh_from_db()
+        assert self.product.quantity == 5
+
+        data = self.client.get(self.availability_url).data
+        assert (data["quantity"], data["reserved"], data["available"]) == (5, 3, 2)
+
+    def test_over_reservation_is_refused(self):
+        assert self.reserve(4).status_code == 201
+        assert self.reserve(2).status_code == 409
+        assert StockReservation.objects.count() == 1
+
+    def test_release_and_expiry_free_stock(self):
+        hold_id = self.reserve(5).data["id"]
+        assert self.client.delete(f"/v1/reservations/{hold_id}/").status_code == 204
+        assert self.reserve(5).status_code == 201
+
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        assert self.client.get(self.availability_url).data["available"] == 5
+        assert self.reserve(5).status_code == 201
+
+    def test_commit_then_settle(self):
+        first = self.reserve(2).data["id"]
+        second = self.reserve(1).data["id"]
+        assert self.client.post(f"/v1/reservations/{first}/commit/").status_code == 200
+        assert self.client.post(f"/v1/reservations/{second}/commit/").status_code == 200
+        assert self.client.post(f"/v1/reservations/{second}/commit/").status_code == 409
+
+        out = StringIO()
+        call_command("settle_reservations", "--batch-size", "1", stdout=out)
+        assert "Settled 2 reservations" in out.getvalue()
+        self.product.refresh_from_db()
+        assert self.product.quantity == 2
+        assert not StockReservation.objects.exists()
+        assert self.client.get(f"/v1/product/{self.product.id}/").data["quantity"] == 2
+
+    def test_only_holder_can_commit_or_release(self):
+        hold_id = self.reserve(1).data["id"]
+        self.client.force_authenticate(user=self.seller)
+        assert self.client.post(f"/v1/reservations/{hold_id}/commit/").status_code == 409
+        assert self.client.delete(f"/v1/reservations/{hold_id}/").status_code == 409
+
+    def test_expired_hold_cannot_be_committed(self):
+        hold_id = self.reserve(1).data["id"]
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        assert self.client.post(f"/v1/reservations/{hold_id}/commit/").status_code == 409
+
+    def test_invalid_requests(self):
+        assert self.reserve(0).status_code == 400
+        assert self.client.post("/v1/product/999999/reservations/", {"quantity": 1}, format="json").status_code == 404
+        assert self.client.get("/v1/product/999999/availability/").status_code == 404
@@ -0,0 +1,69 @@
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework.authtoken.models import Token
+from api.models import Product, User
+
+
+def seed(prefix, *args):
+    call_command("seed_dataset", "--prefix", prefix, *args, stdout=StringIO())
+
+
+def dataset(prefix):
+    """Products per owner rank and the product columns, independent of ids and prefix."""
+    owners = list(User.objects.filter(email__startswith=f"{prefix}-").order_by("email").values_list("id", flat=True))
+    rank = {owner_id: index for index, owner_id in enumerate(owners)}
+    rows = Product.objects.filter(sku__startswith=f"{prefix}-").order_by("sku").values_list(
+        "owner_id", "name", "description", "manufacturer", "quantity"
+    )
+    return [(rank[owner_id], *values) for owner_id, *values in rows]
+
+
+@pytest.mark.django_db
+class TestSeedDataset:
+
+    def test_users_share_one_hash_and_get_tokens(self):
+        seed("a", "--users", "30", "--products", "100", "--batch-size", "7")
+        users = User.objects.filter(email__startswith="a-")
+        assert users.count() == 30
+        assert users.values("password").distinct().count() == 1
+        assert users.first().check_password("seedpass123")
+        assert Token.objects.filter(user__in=users).count() == 30
+        assert Product.objects.filter(sku__startswith="a-").count() == 100
+
+    def test_deterministic_by_seed(self):
+        seed("a", "--users", "20", "--products", "200", "--seed", "7")
+        seed("b", "--users", "20", "--products", "200", "--seed", "7")
+        seed("c", "--users", "20", "--products", "200", "--seed", "8")
+        assert dataset("a") == dataset("b")
+        assert dataset("a") != dataset("c")
+
+    def test_zipf_skew(self):
+        seed("z", "--users", "50", "--products", "2000", "--skew", "1.2")
+        per_rank = Counter(rank for rank, *_ in dataset("z"))
+        # Rank 1 owns far more than an even share (40) and more than rank 10
+        assert per_rank[0] > 200
+        assert per_rank[0] > per_rank[9]
+
+        seed("u", "--users", "50", "--products", "2000", "--skew", "0")
+        assert max(Counter(rank for rank, *_ in dataset("u")).values()) < 100
+
+    def test_descriptions_vary_in_length(self):
+        seed("d", "--users", "5", "--products", "300", "--description-length", "100")
+        lengths = [len(description) for _, _, description, *_ in dataset("d")]
+        assert 0 in lengths
+        assert max(lengths) > 200
+        assert all(not description.startswith(" ") for _, _, description, *_ in dataset("d"))
+
+    def test_batched_inserts(self, django_assert_max_num_queries):
+        # Statements scale with batches, not rows
+        with django_assert_max_num_queries(40):
+            seed("q", "--users", "10", "--products", "1000", "--batch-size", "500")
+
+    def test_existing_prefix_is_rejected(self):
+        seed("a", "--users", "2", "--products", "0")
+        with pytest.raises(CommandError, match="already exists"):
+            seed("a", "--users", "2")
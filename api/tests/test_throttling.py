@@ -0,0 +1,250 @@
+import base64
+from unittest import mock
+
+import pytest
+from django.contrib.auth import authenticate
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.hashing import averify_password
+from api.models import Product, User
+from api.throttling import TokenBucketLimiter, parse_rate, throttle_stats
+
+RATES = {
+    "default": {"ip": "100/m", "user": "3/m", "token": "100/m"},
+    "product_read": {"ip": "5/m"},
+    "signup": {"ip": "2/h"},
+}
+
+
+@pytest.fixture
+def throttling(settings):
+    settings.THROTTLING = {"RATES": RATES, "AUTH_FAILURES": {"ip": "10/h", "account": "3/h"}}
+
+
+def basic(email, password):
+    return "Basic " + base64.b64encode(f"{email}:{password}".encode()).decode()
+
+
+def test_parse_rate():
+    assert parse_rate("100/m") == (100, 60)
+    assert parse_rate("10/hour") == (10, 3600)
+    assert parse_rate("5/15m") == (5, 900)
+    with pytest.raises(ImproperlyConfigured):
+        parse_rate("fast")
+
+
+class TestTokenBucketLimiter:
+
+    def test_burst_then_refill(self):
+        limiter = TokenBucketLimiter()
+        with mock.patch("api.throttling.time.monotonic", return_value=1000.0) as clock:
+            assert [limiter.consume("k", "3/m") for _ in range(3)] == [0, 0, 0]
+            assert limiter.consume("k", "3/m") == pytest.approx(20)
+            assert limiter.wait("k", "3/m") == pytest.approx(20)
+            clock.return_value = 1020.0
+            assert limiter.wait("k", "3/m") == 0
+            assert limiter.consume("k", "3/m") == 0
+            assert limiter.consume("k", "3/m") > 0
+        assert limiter.stats()["throttled"] == 2
+
+    def test_bounded(self):
+        limiter = TokenBucketLimiter(max_buckets=2)
+        for key in ("a", "b", "c"):
+            limiter.consume(key, "1/h")
+        assert limiter.stats()["buckets"] == 2
+        assert limiter.stats()["evictions"] == 1
+        # "a" was evicted and comes back full; "c" is still empty
+        assert limiter.consume("a", "1/h") == 0
+        assert limiter.consume("c", "1/h") > 0
+
+    def test_shared_tier_spans_processes(self):
+        shared = caches["default"]
+        first, second = TokenBucketLimiter(shared=shared), TokenBucketLimiter(shared=shared)
+        assert first.consume("k", "2/h") == 0
+        assert second.consume("k", "2/h") == 0
+        # Both local buckets have tokens left, the shared window does not
+        assert second.wait("k", "2/h") > 0
+        assert first.consume("k", "2/h") > 0
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("throttling")
+class TestViewThrottles:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(email="throttle@example.com", password="throttlepass")
+        self.product = Product.objects.create(name="Bolt", sku="TH-1", manufacturer="Acme", owner=self.user)
+
+    def test_scopes_per_view(self):
+        client = APIClient()
+        url = f"/v1/product/{self.product.pk}/"
+        assert [client.get(url).status_code for _ in range(6)] == [200] * 5 + [429]
+        response = client.get(url)
+        assert int(response["Retry-After"]) > 0
+        # Other scopes have their own buckets
+        assert client.get("/healthz").status_code == 200
+        response = client.post("/v1/user/", {
+            "email": "new@example.com", "password": "newpass123", "first_name": "N", "last_name": "U",
+        }, format="json")
+        assert response.status_code == 201
+
+    def test_signup_is_throttled_per_ip_before_hashing(self):
+        client = APIClient()
+        statuses = []
+        with mock.patch("api.models.User.set_password", autospec=True) as set_password:
+            for n in range(3):
+                statuses.append(client.post("/v1/user/", {
+                    "email": f"signup{n}@example.com", "password": "signuppass", "first_name": "S", "last_name": "U",
+                }, format="json").status_code)
+        assert statuses == [201, 201, 429]
+        assert set_password.call_count == 2
+        # A different client address has its own bucket
+        assert client.post("/v1/user/", {
+            "email": "other@example.com", "password": "signuppass", "first_name": "S", "last_name": "U",
+        }, format="json", REMOTE_ADDR="10.0.0.9").status_code == 201
+
+    def test_forwarded_for_cannot_dodge_the_ip_bucket(self):
+        client = APIClient()
+        statuses = [
+            client.post("/v1/user/", {
+                "email": f"spoof{n}@example.com", "password": "signuppass", "first_name": "S", "last_name": "U",
+            }, format="json", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}").status_code
+            for n in range(3)
+        ]
+        assert statuses == [201, 201, 429]
+
+    def test_forwarded_for_behind_trusted_proxy(self, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        client = APIClient()
+        statuses = [
+            client.post("/v1/user/", {
+                "email": f"proxied{n}@example.com", "password": "signuppass", "first_name": "S", "last_name": "U",
+            }, format="json", HTTP_X_FORWARDED_FOR=f"203.0.113.{n % 2}").status_code
+            for n in range(5)
+        ]
+        # Two clients behind the proxy, two signups each
+        assert statuses == [201, 201, 201, 201, 429]
+
+    def test_per_user_bucket(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=self.user).key}")
+        assert [client.get("/v1/user/self/").status_code for _ in range(4)] == [200, 200, 200, 429]
+        # Same address, different user
+        other = User.objects.create_user(email="other@example.com", password="otherpass1")
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=other).key}")
+        assert client.get("/v1/user/self/").status_code == 200
+
+    def test_disabled(self, settings):
+        settings.THROTTLING = {**settings.THROTTLING, "ENABLED": False}
+        client = APIClient()
+        url = f"/v1/product/{self.product.pk}/"
+        assert {client.get(url).status_code for _ in range(10)} == {200}
+
+    def test_unknown_scope(self, settings):
+        settings.THROTTLING = {"RATES": {"default": {"ip": "10/m"}}}
+        with pytest.raises(ImproperlyConfigured, match="product_read"):
+            APIClient().get(f"/v1/product/{self.product.pk}/")
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("throttling")
+class TestAuthFailureThrottle:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(email="victim@example.com", password="rightpass1")
+        self.hasher = mock.patch.object(
+            BasicAuthentication, "authenticate_credentials", autospec=True,
+            side_effect=BasicAuthentication.authenticate_credentials,
+        )
+
+    def attempt(self, password, email="victim@example.com", **extra):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic(email, password))
+        return client.get("/v1/user/self/", **extra).status_code
+
+    def test_account_blocked_before_hashing(self):
+        with self.hasher as check:
+            assert [self.attempt("wrong") for _ in range(3)] == [401, 401, 401]
+            assert self.attempt("wrong") == 429
+            # The right password is refused too while the account is locked
+            assert self.attempt("rightpass1", REMOTE_ADDR="10.0.0.2") == 429
+        assert check.call_count == 3
+
+    def test_ip_blocked_despite_spoofed_forwarded_for(self):
+        with self.hasher as check:
+            statuses = [
+                self.attempt("wrong", email=f"spoof{n}@example.com", HTTP_X_FORWARDED_FOR=f"198.51.100.{n}")
+                for n in range(11)
+            ]
+        assert statuses == [401] * 10 + [429]
+        assert check.call_count == 10
+
+    def test_ip_blocked_across_accounts(self):
+        with self.hasher as check:
+            statuses = [self.attempt("wrong", email=f"guess{n}@example.com") for n in range(11)]
+        assert statuses == [401] * 10 + [429]
+        assert check.call_count == 10
+        assert self.attempt("rightpass1", REMOTE_ADDR="10.0.0.3") == 200
+
+    def test_cached_credentials_skip_the_check(self):
+        assert self.attempt("rightpass1") == 200
+        for _ in range(3):
+            self.attempt("wrong", REMOTE_ADDR="10.0.0.4")
+        # Verified credentials are answered from the credential cache
+        assert self.attempt("rightpass1") == 200
+
+    def test_token_endpoint_counts_failures_before_hashing(self):
+        def obtain(password, **extra):
+            return APIClient().post("/v1/token/", {"username": "victim@example.com", "password": password},
+                                    format="json", **extra)
+
+        before = throttle_stats()
+        with mock.patch("rest_framework.authtoken.serializers.authenticate", wraps=authenticate) as check:
+            assert [obtain("wrong").status_code for _ in range(3)] == [400, 400, 400]
+            assert obtain("wrong").status_code == 429
+            assert obtain("rightpass1", REMOTE_ADDR="10.0.0.5").status_code == 429
+        assert check.call_count == 3
+        assert throttle_stats()["auth_failures"] - before["auth_failures"] == 3
+
+    def test_token_endpoint_is_throttled(self, settings):
+        settings.THROTTLING = {**settings.THROTTLING, "RATES": {"default": {"ip": "2/m"}}}
+        data = {"username": "victim@example.com", "password": "rightpass1"}
+        statuses = [APIClient().post("/v1/token/", data, format="json").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
+
+    def test_counted_in_metrics(self):
+        before = throttle_stats()
+        for _ in range(4):
+            self.attempt("wrong")
+        after = throttle_stats()
+        assert after["auth_failures"] - before["auth_failures"] == 3
+        assert after["auth_blocked"] - before["auth_blocked"] == 1
+        body = APIClient().get("/metrics").content.decode()
+        assert f"api_throttle_auth_blocked {after['auth_blocked']}" in body
+
+
+@pytest.mark.django_db
+@pytest.mark.urls("api.async_urls")
+@pytest.mark.usefixtures("throttling")
+class TestAsyncThrottles:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(email="async@example.com", password="rightpass1")
+        self.product = Product.objects.create(name="Nut", sku="TH-2", manufacturer="Acme", owner=self.user)
+
+    def test_product_read_scope(self):
+        client = APIClient()
+        url = f"/v1/product/{self.product.pk}/"
+        assert [client.get(url).status_code for _ in range(6)] == [200] * 5 + [429]
+        assert "Retry-After" in client.get(url)
+
+    def test_auth_failures_skip_the_hasher(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=basic("async@example.com", "wrong"))
+        with mock.patch("api.authentication.averify_password", wraps=averify_password) as verify:
+            statuses = [client.get(f"/v1/user/{self.user.pk}/").status_code for _ in range(4)]
+        assert statuses == [401, 401, 401, 429]
+        assert verify.call_count == 3
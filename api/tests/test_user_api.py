@@ -1,5 +1,9 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
 from api.models import User
 
 @pytest.mark.django_db
@@ -124,3 +128,34 @@ class TestUserAPI:
         assert user.first_name == "UpdatedFirst"
         assert user.last_name == "UpdatedLast"
         assert user.check_password("newallowedpass")
+
+    def test_create_user_query_count(self, django_assert_num_queries):
+        data = {
+            "email": "lean@example.com",
+            "password": "lean123",
+            "first_name": "Lean",
+            "last_name": "Signup"
+        }
+        # SAVEPOINT, INSERT user, INSERT token, RELEASE SAVEPOINT
+        with django_assert_num_queries(4):
+            response = self.client.post("/v1/user/", data, format="json")
+        assert response.status_code == 201
+        user = User.objects.get(email="lean@example.com")
+        assert response.data["token"] == user.auth_token.key
+        assert Token.objects.filter(user=user).count() == 1
+
+    def test_bulk_create_users_command(self, tmp_path):
+        User.objects.create_user(email="taken@example.com", password="taken123")
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "email,password,first_name,last_name\n"
+            "bulk1@example.com,pass1,Bulk,One\n"
+            "bulk2@example.com,pass2,Bulk,Two\n"
+            "taken@example.com,pass3,Taken,Already\n"
+        )
+        out = StringIO()
+        call_command("bulk_create_users", str(path), "--workers", "2", "--batch-size", "2", stdout=out)
+        assert "Created 2 users, skipped 1" in out.getvalue()
+        user = User.objects.get(email="bulk2@example.com")
+        assert user.check_password("pass2")
+        assert Token.objects.filter(user=user).exists()
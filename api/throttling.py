@@ -0,0 +1,249 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import exceptions
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])[a-z]*\s*$")
+
+_limiter = None
+_auth_stats = {"failures": 0, "blocked": 0}
+
+
+def throttling_config():
+    config = getattr(settings, "THROTTLING", {})
+    return {
+        "ENABLED": config.get("ENABLED", True),
+        "RATES": config.get("RATES", {}),
+        "AUTH_FAILURES": config.get("AUTH_FAILURES", {}),
+    }
+
+
+@lru_cache(maxsize=64)
+def parse_rate(rate):
+    """``"100/m"``, ``"10/hour"`` or ``"5/15m"`` -> ``(capacity, period in seconds)``."""
+    match = RATE_RE.match(rate)
+    if match is None or int(match.group(1)) < 1:
+        raise ImproperlyConfigured(f"Invalid throttle rate {rate!r}; expected e.g. '100/m' or '5/15m'.")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def digest(value):
+    # Usernames and token keys never sit in bucket keys in the clear
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by string, held in a size-bounded in-process LRU.
+
+    A rate of N per period is a bucket holding up to N tokens and refilling
+    at N per period. A bucket is only ``(tokens, last update)``, refilled
+    lazily when touched, so a check is O(1) however many clients there are.
+    Evicted buckets come back full.
+
+    With ``shared`` (a Django cache) every request the local bucket lets
+    through is also counted in a fixed-window counter shared by all
+    processes, so a client spread over several workers still gets at most
+    N per period in total.
+    """
+
+    def __init__(self, max_buckets=100000, shared=None):
+        self.max_buckets = max_buckets
+        self.shared = shared
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.throttled = 0
+        self.evictions = 0
+
+    def _tokens(self, key, capacity, refill, now):
+        entry = self._buckets.get(key)
+        if entry is None:
+            return capacity
+        self._buckets.move_to_end(key)
+        tokens, updated = entry
+        return min(capacity, tokens + (now - updated) * refill)
+
+    def consume(self, key, rate, cost=1):
+        """Take ``cost`` tokens: 0 if allowed, otherwise the seconds until they are available."""
+        capacity, period = parse_rate(rate)
+        refill = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, capacity, refill, now)
+            allowed = tokens >= cost
+            self._buckets[key] = (tokens - cost if allowed else tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        wait = 0 if allowed else (cost - tokens) / refill
+        if allowed and self.shared is not None:
+            wait = self._consume_shared(key, capacity, period, cost)
+        if wait:
+            self.throttled += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def wait(self, key, rate, cost=1):
+        """Seconds until ``cost`` tokens are available, without taking them (0 if they are)."""
+        capacity, period = parse_rate(rate)
+        refill = capacity / period
+        with self._lock:
+            entry = self._buckets.get(key)
+            tokens = capacity if entry is None else min(capacity, entry[0] + (time.monotonic() - entry[1]) * refill)
+        if tokens < cost:
+            return (cost - tokens) / refill
+        if self.shared is not None:
+            now = time.time()
+            window = int(now // period)
+            if self.shared.get(f"api:throttle:{key}:{window}", 0) + cost > capacity:
+                return (window + 1) * period - now
+        return 0
+
+    def _consume_shared(self, key, capacity, period, cost):
+        now = time.time()
+        window = int(now // period)
+        cache_key = f"api:throttle:{key}:{window}"
+        self.shared.add(cache_key, 0, period + 1)
+        try:
+            count = self.shared.incr(cache_key, cost)
+        except ValueError:
+            # Expired between add() and incr()
+            self.shared.set(cache_key, cost, period + 1)
+            count = cost
+        return (window + 1) * period - now if count > capacity else 0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._buckets)
+        return {
+            "buckets": size,
+            "max_buckets": self.max_buckets,
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+            "evictions": self.evictions,
+        }
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        config = getattr(settings, "THROTTLING", {})
+        alias = config.get("SHARED_CACHE")
+        _limiter = TokenBucketLimiter(
+            max_buckets=config.get("MAX_BUCKETS", 100000),
+            shared=caches[alias] if alias else None,
+        )
+    return _limiter
+
+
+def throttle_stats():
+    stats = get_limiter().stats()
+    stats["auth_failures"] = _auth_stats["failures"]
+    stats["auth_blocked"] = _auth_stats["blocked"]
+    return stats
+
+
+def client_ip(request):
+    # X-Forwarded-For is only trusted with REST_FRAMEWORK["NUM_PROXIES"] > 0
+    return BaseThrottle().get_ident(request)
+
+
+def view_scope(view, method):
+    """The view's ``throttle_scope`` for ``method``; None when it is not throttled."""
+    scope = getattr(view, "throttle_scope", "default")
+    if isinstance(scope, dict):
+        scope = scope.get(method, "default")
+    return scope
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Throttles requests against per-IP, per-user and per-token buckets.
+
+    The view's ``throttle_scope`` (a name, or a dict by HTTP method) selects
+    an entry of ``THROTTLING["RATES"]`` giving a rate for some of "ip",
+    "user" and "token"; views without one use "default". A scope of None
+    turns throttling off for that view or method.
+    """
+
+    def allow_request(self, request, view):
+        config = throttling_config()
+        if not config["ENABLED"]:
+            return True
+        scope = view_scope(view, request.method)
+        if scope is None:
+            return True
+        rates = config["RATES"].get(scope)
+        if rates is None:
+            if scope != "default":
+                raise ImproperlyConfigured(f"No THROTTLING rates for scope {scope!r}.")
+            return True
+
+        user = getattr(request, "user", None)
+        token = getattr(getattr(request, "auth", None), "key", None)
+        idents = (
+            ("ip", self.get_ident(request)),
+            ("user", user.pk if user is not None and user.is_authenticated else None),
+            ("token", digest(token) if token else None),
+        )
+        limiter = get_limiter()
+        for kind, ident in idents:
+            rate = rates.get(kind)
+            if rate and ident is not None:
+                self.delay = limiter.consume(f"{scope}:{kind}:{ident}", rate)
+                if self.delay:
+                    return False
+        return True
+
+    def wait(self):
+        return self.delay
+
+
+def auth_failure_buckets(request, userid):
+    rates = throttling_config()["AUTH_FAILURES"]
+    buckets = []
+    if rates.get("ip") and request is not None:
+        buckets.append((f"auth_failures:ip:{client_ip(request)}", rates["ip"]))
+    if rates.get("account"):
+        buckets.append((f"auth_failures:account:{digest(userid.lower())}", rates["account"]))
+    return buckets
+
+
+def check_auth_failures(request, userid):
+    """
+    Raise ``Throttled`` when the client IP or the account has no failed
+    password attempts left, before any password is hashed.
+    """
+    if not throttling_config()["ENABLED"]:
+        return
+    limiter = get_limiter()
+    for key, rate in auth_failure_buckets(request, userid):
+        wait = limiter.wait(key, rate)
+        if wait:
+            _auth_stats["blocked"] += 1
+            raise exceptions.Throttled(wait)
+
+
+def record_auth_failure(request, userid):
+    if not throttling_config()["ENABLED"]:
+        return
+    _auth_stats["failures"] += 1
+    limiter = get_limiter()
+    for key, rate in auth_failure_buckets(request, userid):
+        limiter.consume(key, rate)
@@ -1,10 +1,13 @@
-from django.urls import path
-from .views import UserCreateView, UserSelfView, UserDetailView, ProductCreateView, ProductDetailView, healthz, BasicAuthOnlyView
-from rest_framework.authtoken.views import obtain_auth_token
+from django.urls import path, re_path
+from .views import UserCreateView, UserSelfView, UserDetailView, ProductListCreateView, ProductBatchView, InventoryAdjustView, ProductImportView, ProductExportView, ProductDetailView, healthz, healthz_live, metrics, BasicAuthOnlyView, ObtainTokenView
+from .views import ProductReservationView, ProductAvailabilityView, ReservationDetailView, ReservationCommitView
 
 urlpatterns = [
 
     path("healthz", healthz, name="healthz"),
+    path("healthz/live", healthz_live, name="healthz-live"),
+    path("healthz/ready", healthz, name="healthz-ready"),
+    path("metrics", metrics, name="metrics"),
 
     # User endpoints
     path("v1/user/", UserCreateView.as_view(), name="user-create"),
@@ -12,9 +15,19 @@ urlpatterns = [
     path('v1/user/self/', UserSelfView.as_view(), name='user-detail'),
 
     # Product endpoints
-    path("v1/product/", ProductCreateView.as_view(), name="product-create"),
+    path("v1/product/", ProductListCreateView.as_view(), name="product-list"),
+    re_path(r"^v1/product/batch/?$", ProductBatchView.as_view(), name="product-batch"),
+    path("v1/product/inventory/", InventoryAdjustView.as_view(), name="product-inventory"),
+    path("v1/product/import/", ProductImportView.as_view(), name="product-import"),
+    path("v1/product/export/", ProductExportView.as_view(), name="product-export"),
     path("v1/product/<int:pk>/", ProductDetailView.as_view(), name="product-detail"),
+    path("v1/product/<int:pk>/reservations/", ProductReservationView.as_view(), name="product-reservations"),
+    path("v1/product/<int:pk>/availability/", ProductAvailabilityView.as_view(), name="product-availability"),
 
-    path("v1/token/", obtain_auth_token, name="api_token_auth"),
+    # Stock reservations
+    path("v1/reservations/<int:pk>/", ReservationDetailView.as_view(), name="reservation-detail"),
+    path("v1/reservations/<int:pk>/commit/", ReservationCommitView.as_view(), name="reservation-commit"),
+
+    path("v1/token/", ObtainTokenView.as_view(), name="api_token_auth"),
     path("v1/basic-auth/", BasicAuthOnlyView.as_view(), name="basic_auth_test"),
 ]
\ No newline at end of file
@@ -1,24 +1,41 @@
+import csv
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
 from django.shortcuts import render
+from django.utils import timezone
 from rest_framework.response import Response
 from rest_framework import status
-from .models import User, Product, HealthCheck
-from .serializers import UserSerializer, ProductSerializer
+from .models import User, Product, StockReservation
+from .admission import admission_exempt, is_saturated
+from .health import get_prober
+from .metrics import render_metrics
+from .pagination import KeysetPagination
+from .importers import IMPORT_FORMATS, ProductImporter, iter_rows
+from .exporters import EXPORT_CONTENT_TYPES, export_products
+from .product_cache import get_product_cache
+from .conditional import ConditionalRequestMixin
+from .exceptions import Conflict
+from .inventory import InventoryBatchSerializer, apply_adjustments
+from . import reservations
+from .reservations import ReservationSerializer
+from .serializers import UserSerializer, ProductSerializer, PRODUCT_FIELDS, product_reader, user_reader
+from .serializers import ThrottledAuthTokenSerializer
+from .throttling import BucketThrottle
+from .serializers import parse_fieldset, product_reader_for, select_fields
 from rest_framework.permissions import AllowAny
 from rest_framework import generics, permissions
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
-from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.exceptions import ValidationError
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
-from django.db import DatabaseError
+from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.views import APIView
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
-@csrf_exempt
-@require_http_methods(["GET"])  # only allow GET
-def healthz(request):
+def _health_response(request, probe):
     # Reject if request has a body
     if request.method == "GET" and request.body:
         return HttpResponse(status=400)
@@ -27,11 +44,7 @@ def healthz(request):
     if request.GET:
         return HttpResponse(status=400)
 
-    try:
-        HealthCheck.objects.create()
-        response = HttpResponse(status=200)
-    except DatabaseError:
-        response = HttpResponse(status=503)
+    response = HttpResponse(status=200 if probe() else 503)
 
     # Required headers
     response["Cache-Control"] = "no-cache, no-store, must-revalidate"
@@ -41,30 +54,63 @@ def healthz(request):
     return response
 
 
+@admission_exempt
+@csrf_exempt
+@require_http_methods(["GET"])  # only allow GET
+def healthz(request):
+    # Readiness: answered from the prober's cached database check, never writes.
+    # A saturated instance reports not ready so the load balancer drains it.
+    return _health_response(request, lambda: not is_saturated() and get_prober().is_ready())
+
+
+@admission_exempt
+@csrf_exempt
+@require_http_methods(["GET"])
+def healthz_live(request):
+    # Liveness: the process is up and serving; never touches the database
+    return _health_response(request, lambda: True)
+
+
+@admission_exempt
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics(request):
+    # Prometheus scrape target: request, cache, hashing and pool metrics
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class ObtainTokenView(ObtainAuthToken):
+    # DRF's view turns throttling off and would run the hasher for every guess
+    serializer_class = ThrottledAuthTokenSerializer
+    throttle_classes = [BucketThrottle]
+
+
 class UserCreateView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
     http_method_names = ["post"]
+    query_budget = 4
+    throttle_scope = "signup"
+    admission_priority = "signup"
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        email = serializer.validated_data.get('email')
-        if not email:
-            raise ValidationError({"email": "This field is required."})
-
-        if User.objects.filter(email=email).exists():
+        # The unique index on email is the duplicate check; the user and the
+        # token (created by api.signals.create_auth_token) commit together.
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
             return Response(
-                {"error": "User with this email already exists."},
+                {"email": ["user with this email already exists."]},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        self.perform_create(serializer)
-        user = User.objects.get(email=email)
-
-        token, created = Token.objects.get_or_create(user=user)
+        # Set by the signal when it created the token; no extra query
+        token = serializer.instance.auth_token
 
         headers = self.get_success_headers(serializer.data)
 
@@ -74,15 +120,34 @@ class UserCreateView(generics.CreateAPIView):
         return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+class UserLastModifiedMixin(ConditionalRequestMixin):
+    last_modified_field = "account_updated"
 
+    def get_user_last_modified(self, user):
+        if self.request.method in SAFE_METHODS:
+            # request.user was just loaded (or invalidated on save), no query needed
+            return user.account_updated
+        return User.objects.filter(pk=user.pk).values_list("account_updated", flat=True).first()
 
-class UserSelfView(generics.RetrieveUpdateAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        return Response(user_reader.to_representation(self.get_object()))
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.set_last_modified(serializer.instance)
+
+
+class UserSelfView(UserLastModifiedMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {"GET": 1, "PUT": 3, "PATCH": 3}
 
     def get_object(self):
         return self.request.user
 
+    def get_last_modified(self):
+        return self.get_user_last_modified(self.request.user)
+
     def update(self, request, *args, **kwargs):
         # Disallow updates to email or account timestamps
         disallowed_fields = {"email", "account_created", "account_updated"}
@@ -94,10 +159,56 @@ class UserSelfView(generics.RetrieveUpdateAPIView):
         return super().update(request, *args, **kwargs)
 
 
-class ProductCreateView(generics.CreateAPIView):
+class SparseFieldsetMixin:
+    """
+    ``?fields=name,sku`` / ``?exclude=description`` on product reads. Only the
+    selected columns are loaded (``.only()``) and serialized.
+    """
+
+    def get_fieldset(self):
+        if not hasattr(self, "_fieldset"):
+            self._fieldset = parse_fieldset(self.request.query_params, PRODUCT_FIELDS)
+        return self._fieldset
+
+    def get_reader(self):
+        return product_reader_for(self.get_fieldset())
+
+
+class ProductListCreateView(SparseFieldsetMixin, generics.ListCreateAPIView):
     serializer_class = ProductSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    http_method_names = ["post"]
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    http_method_names = ["get", "post"]
+    query_budget = {"GET": 2, "POST": 3}
+    throttle_scope = {"GET": "product_read", "HEAD": "product_read"}
+
+    # query param -> (lookup, parser)
+    filters = {
+        "owner": ("owner_id", int),
+        "manufacturer": ("manufacturer", str),
+        "min_quantity": ("quantity__gte", int),
+        "max_quantity": ("quantity__lte", int),
+    }
+
+    def get_queryset(self):
+        queryset = Product.objects.all()
+        lookups = {}
+        for param, (lookup, parse) in self.filters.items():
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                lookups[lookup] = parse(value)
+            except ValueError:
+                raise ValidationError({param: "Must be an integer."})
+        return queryset.filter(**lookups)
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        # The cursor is built from the last row's (date_added, id)
+        queryset = self.get_queryset().only(*reader.sources, *KeysetPagination.ordering)
+        page = self.paginate_queryset(self.filter_queryset(queryset))
+        return self.get_paginated_response(reader.many(page))
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
@@ -108,25 +219,287 @@ class IsOwnerOrReadOnly(BasePermission):
         # Read-only (GET, HEAD, OPTIONS) always allowed
         if request.method in SAFE_METHODS:
             return True
-        # Write (PATCH, PUT, DELETE) only for owner
-        return obj.owner == request.user
+        # Write (PATCH, PUT, DELETE) only for owner; compare ids so the owner row isn't loaded
+        return obj.owner_id == request.user.pk
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(SparseFieldsetMixin, ConditionalRequestMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsOwnerOrReadOnly]
     http_method_names = ["get", "put", "patch", "delete"]
+    query_budget = {"GET": 2, "PUT": 4, "PATCH": 4, "DELETE": 7}
+    throttle_scope = {"GET": "product_read", "HEAD": "product_read"}
+    last_modified_field = "date_updated"
+
+    @staticmethod
+    def load_entry(pk):
+        # Fills read the primary: a lagging replica would cache a row older
+        # than a write that just invalidated it, for the entry's whole lifetime
+        product = Product.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).first()
+        if product is None:
+            return None
+        return {"data": product_reader.to_representation(product), "last_modified": product.date_updated}
+
+    def get_cached_entry(self):
+        if not hasattr(self, "_cached_entry"):
+            self._cached_entry = get_product_cache().get_or_load(self.kwargs["pk"], self.load_entry)
+        return self._cached_entry
+
+    def check_preconditions(self, request):
+        if request.method in SAFE_METHODS:
+            return super().check_preconditions(request)
+        # Writes evaluate preconditions against the row they load (see update/destroy)
+        return None
+
+    def get_last_modified(self):
+        entry = self.get_cached_entry()
+        return entry["last_modified"] if entry is not None else None
+
+    def retrieve(self, request, *args, **kwargs):
+        # Reads are public (IsOwnerOrReadOnly), so the cached representation
+        # can be served without loading the object. The cache holds the full
+        # representation; a fieldset is cut from it rather than cached apart.
+        fieldset = self.get_fieldset()
+        entry = self.get_cached_entry()
+        if entry is None:
+            raise NotFound()
+        return Response(select_fields(entry["data"], fieldset))
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop("partial", False)
+        # get_object() also enforces IsOwnerOrReadOnly; the row is loaded once
+        instance = self.get_object()
+        self.enforce_preconditions(request, instance.date_updated)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+    @staticmethod
+    def changed_fields(instance, validated_data):
+        return {field: value for field, value in validated_data.items() if getattr(instance, field) != value}
 
     def perform_update(self, serializer):
-        if self.request.user != self.get_object().owner:
-            raise PermissionDenied("You can only update your own products.")
-        serializer.save()
+        instance = serializer.instance
+        changes = self.changed_fields(instance, serializer.validated_data)
+        if changes:
+            # Write only the changed columns, and only if nobody else updated
+            # the row since it was loaded
+            now = timezone.now()
+            updated = Product.objects.filter(pk=instance.pk, date_updated=instance.date_updated).update(
+                date_updated=now, **changes
+            )
+            if not updated:
+                raise Conflict()
+            for field, value in changes.items():
+                setattr(instance, field, value)
+            instance.date_updated = now
+            # QuerySet.update() sends no post_save
+            get_product_cache().invalidate(instance.pk)
+        self.set_last_modified(instance)
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.enforce_preconditions(request, instance.date_updated)
+        self.perform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     def perform_destroy(self, instance):
-        if instance.owner != self.request.user:
+        if instance.owner_id != self.request.user.pk:
             raise PermissionDenied("You do not have permission to delete this product.")
-        instance.delete()
+        deleted, _ = Product.objects.filter(pk=instance.pk, date_updated=instance.date_updated).delete()
+        if not deleted:
+            raise Conflict()
+
+class ProductBatchView(SparseFieldsetMixin, APIView):
+    """
+    Fetch many products in one request: ``GET ?ids=1,2,3`` or ``POST {"ids": [...]}``.
+
+    Results keep the requested order and unknown ids are listed under
+    ``missing``. Reads are public, as with IsOwnerOrReadOnly; POST is only a
+    transport for long id lists. ``?fields=`` / ``?exclude=`` apply as on the
+    list endpoint.
+    """
+    permission_classes = [AllowAny]
+    http_method_names = ["get", "post"]
+    query_budget = 2
+    throttle_scope = "product_read"
+    admission_priority = "read"
+    max_ids = 200
+
+    def parse_ids(self, raw):
+        if isinstance(raw, str):
+            raw = [part for part in raw.split(",") if part.strip()]
+        if not isinstance(raw, list) or not raw:
+            raise ValidationError({"ids": "Provide a non-empty list of product ids."})
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw))
+        except (TypeError, ValueError):
+            raise ValidationError({"ids": "Product ids must be integers."})
+        if len(ids) > self.max_ids:
+            raise ValidationError({"ids": f"At most {self.max_ids} ids per request."})
+        return ids
+
+    def batch_response(self, ids):
+        reader = self.get_reader()
+        products = Product.objects.only(*reader.sources).in_bulk(ids)
+        found = [products[pk] for pk in ids if pk in products]
+        return Response({
+            "results": reader.many(found),
+            "missing": [pk for pk in ids if pk not in products],
+        })
+
+    def get(self, request):
+        return self.batch_response(self.parse_ids(request.query_params.get("ids", "")))
+
+    def post(self, request):
+        data = request.data
+        return self.batch_response(self.parse_ids(data.get("ids") if isinstance(data, dict) else data))
+
+
+class InventoryAdjustView(APIView):
+    """
+    Apply a batch of stock changes: ``{"adjustments": [{"sku"|"id": ..., "delta": n}]}``.
+
+    All adjustments succeed or none do (409 when a product would go below
+    zero). Responds with the resulting quantities.
+    """
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["post"]
+
+    def post(self, request):
+        serializer = InventoryBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = apply_adjustments(request.user, serializer.validated_data["adjustments"])
+        return Response({"results": quantities})
+
+
+class ProductReservationView(APIView):
+    """Hold stock of a product for the caller: ``POST {"quantity": n}``."""
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["post"]
+    query_budget = 4
+
+    def post(self, request, pk):
+        serializer = ReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not Product.objects.filter(pk=pk).exists():
+            raise NotFound()
+        hold = reservations.reserve(pk, request.user, serializer.validated_data["quantity"])
+        return Response(ReservationSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+
+class ReservationDetailView(APIView):
+    """``DELETE`` releases a hold; ``POST .../commit/`` confirms it for settlement."""
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["delete"]
+
+    def delete(self, request, pk):
+        reservations.release(pk, request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ReservationCommitView(APIView):
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["post"]
+
+    def post(self, request, pk):
+        reservations.commit(pk, request.user)
+        return Response({"id": pk, "status": StockReservation.COMMITTED})
+
+
+class ProductAvailabilityView(APIView):
+    """Public: on-hand quantity, quantity held by active reservations, and what is left."""
+    permission_classes = [AllowAny]
+    http_method_names = ["get"]
+    query_budget = 2
+    throttle_scope = "product_read"
+
+    def get(self, request, pk):
+        row = reservations.availability(pk)
+        if row is None:
+            raise NotFound()
+        quantity, reserved = row
+        return Response({
+            "id": pk,
+            "quantity": quantity,
+            "reserved": reserved,
+            "available": max(quantity - reserved, 0),
+        })
+
+
+class ProductImportView(APIView):
+    """
+    Bulk upsert of the caller's products from a CSV or NDJSON request body.
+
+    The body is parsed as a stream (``request.data`` is never touched) and
+    written in chunks; the response is a per-row error report.
+    """
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["post"]
+
+    def post(self, request):
+        content_type = request.content_type.split(";")[0].strip().lower()
+        fmt = IMPORT_FORMATS.get(content_type)
+        if fmt is None:
+            return Response(
+                {"error": "Content-Type must be text/csv or application/x-ndjson."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+        config = settings.PRODUCT_IMPORT
+        try:
+            chunk_size = int(request.query_params.get("chunk_size", config["CHUNK_SIZE"]))
+        except ValueError:
+            raise ValidationError({"chunk_size": "Must be an integer."})
+        chunk_size = max(1, min(chunk_size, config["MAX_CHUNK_SIZE"]))
+
+        importer = ProductImporter(request.user, chunk_size=chunk_size)
+        try:
+            report = importer.run(iter_rows(request._request, fmt))
+        except (csv.Error, UnicodeDecodeError) as exc:
+            # Chunks before the malformed line are already committed
+            report = importer.report()
+            report["error"] = f"Malformed input: {exc}"
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class ProductExportView(APIView):
+    """
+    Streams products as NDJSON (default) or CSV with ``?output=csv``.
+
+    Rows are read in keyset-paginated chunks of plain tuples, so memory stays
+    flat regardless of table size. ``?owner=<id>`` limits the dump to one
+    user's products; ``Accept-Encoding: gzip`` compresses each chunk.
+    """
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["get"]
+
+    def get(self, request):
+        fmt = request.query_params.get("output", "ndjson")
+        if fmt not in EXPORT_CONTENT_TYPES:
+            raise ValidationError({"output": "Must be ndjson or csv."})
+
+        owner_id = request.query_params.get("owner")
+        if owner_id is not None:
+            try:
+                owner_id = int(owner_id)
+            except ValueError:
+                raise ValidationError({"owner": "Must be an integer."})
+
+        compress = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        response = StreamingHttpResponse(
+            export_products(fmt, owner_id=owner_id, compress=compress),
+            content_type=EXPORT_CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = f'attachment; filename="products.{fmt}"'
+        response["Vary"] = "Accept-Encoding"
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        return response
+
 
 class BasicAuthOnlyView(APIView):
     permission_classes = [IsAuthenticated]
@@ -134,13 +507,23 @@ class BasicAuthOnlyView(APIView):
     def get(self, request):
         return Response({"message": f"Hello {request.user.email}, you are authenticated!"})
 
-class UserDetailView(generics.RetrieveUpdateAPIView):
+class UserDetailView(UserLastModifiedMixin, generics.RetrieveUpdateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ["get", "put", "patch"]
+    query_budget = {"GET": 2, "PUT": 3, "PATCH": 3}
+
+    def get_last_modified(self):
+        if self.kwargs["pk"] != self.request.user.pk:
+            # Someone else's account: get_object() answers 403
+            return None
+        return self.get_user_last_modified(self.request.user)
 
     def get_object(self):
+        if self.kwargs["pk"] == self.request.user.pk:
+            # request.user was just loaded by authentication; no query needed
+            return self.request.user
         user = super().get_object()
         # Prevent users from accessing/updating others
         if self.request.user != user:
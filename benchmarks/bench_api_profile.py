@@ -0,0 +1,108 @@
+"""
+Per-request overhead and worker memory of the default settings
+(webapp.settings: DEBUG on, sessions, CSRF, messages, admin, browsable API)
+vs the API-only profile (webapp.settings_api).
+
+    python -m benchmarks.bench_api_profile --requests 2000
+
+Each profile runs in its own process on in-memory SQLite and calls the WSGI
+handler directly, so the numbers are the framework's cost without a server.
+RSS is read from /proc after the requests.
+"""
+import argparse
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import setup_django
+
+PROFILES = (
+    ("default", "webapp.settings"),
+    ("api", "webapp.settings_api"),
+)
+
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(settings_module, requests):
+    setup_django(settings_module, sqlite=True, test_environment=False)
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from rest_framework.authtoken.models import Token
+    from api.models import Product, User
+
+    owner = User.objects.create_user(email="bench-profile@example.com", password="benchpass")
+    token = Token.objects.get(user=owner).key
+    Product.objects.bulk_create(
+        Product(name=f"Product {i}", sku=f"PRF-{i}", manufacturer="Bench", quantity=i, owner=owner)
+        for i in range(20)
+    )
+    product = Product.objects.first()
+    application = WSGIHandler()
+
+    def call(path, **extra):
+        path, _, query = path.partition("?")
+        environ = {
+            "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80", "HTTP_HOST": "localhost", "HTTP_ACCEPT": "application/json",
+            "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(), **extra,
+        }
+        statuses = []
+        response = application(environ, lambda status, headers: statuses.append(status))
+        b"".join(response)
+        response.close()
+        return statuses[0]
+
+    scenarios = {
+        "GET /v1/product/{id}/": lambda: call(f"/v1/product/{product.pk}/"),
+        "GET /v1/product/?page_size=20": lambda: call("/v1/product/?page_size=20"),
+        "GET /v1/user/self/ (token)": lambda: call("/v1/user/self/", HTTP_AUTHORIZATION=f"Token {token}"),
+    }
+    results = {"debug": settings.DEBUG, "middleware": len(settings.MIDDLEWARE), "apps": len(settings.INSTALLED_APPS)}
+    for name, scenario in scenarios.items():
+        assert scenario().startswith("200"), name
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            scenario()
+            timings.append((time.perf_counter() - started) * 1e6)
+        results[name] = statistics.mean(timings)
+    results["rss_mb"] = rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.requests)))
+        return
+
+    for label, settings_module in PROFILES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_api_profile", "--requests", str(args.requests),
+             "--worker", settings_module],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results = json.loads(output.splitlines()[-1])
+        print(f"{label} ({settings_module}): DEBUG={results.pop('debug')}, "
+              f"{results.pop('middleware')} middleware, {results.pop('apps')} apps, "
+              f"RSS {results.pop('rss_mb'):.1f} MB")
+        for name, mean in results.items():
+            print(f"  {name:32} {mean:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Concurrent-connection throughput of the sync DRF views vs the native async
+views in api.async_views, both driven through Django's ASGI request handler.
+
+    python -m benchmarks.bench_async --connections 50 --requests 20
+
+Each connection is a coroutine issuing requests back to back with a token:
+GET /v1/product/<pk>/ (mostly product-cache hits), PATCH of the
+connection's own product, and GET /v1/user/self/.
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import Timer, setup_django
+
+SCENARIOS = ("product_get", "product_patch", "user_get")
+
+
+async def run_connections(urls, key, pks, connections, requests, scenario):
+    from django.test import AsyncClient
+
+    async def connection(index):
+        client = AsyncClient()
+        headers = {"Authorization": f"Token {key}"}
+        pk = pks[index]
+        for i in range(requests):
+            if scenario == "product_get":
+                response = await client.get(f"/v1/product/{pk}/", headers=headers)
+            elif scenario == "product_patch":
+                response = await client.patch(
+                    f"/v1/product/{pk}/", {"quantity": i}, content_type="application/json", headers=headers
+                )
+            else:
+                response = await client.get("/v1/user/self/", headers=headers)
+            assert response.status_code == 200, (urls, scenario, response.status_code)
+
+    await asyncio.gather(*(connection(index) for index in range(connections)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per connection.")
+    args = parser.parse_args()
+
+    setup_django(threaded=True)
+    from django.test import override_settings
+    from rest_framework.authtoken.models import Token
+    from api.models import Product, User
+
+    user = User.objects.create_user(email="bench-async@example.com", password="benchpass")
+    key = Token.objects.get(user=user).key
+    pks = [
+        Product.objects.create(
+            name=f"Product {i}", sku=f"ASYNC-{i}", manufacturer="Bench", quantity=10, owner=user
+        ).pk
+        # One product per connection so concurrent PATCHes never conflict
+        for i in range(args.connections)
+    ]
+
+    total = args.connections * args.requests
+    for scenario in SCENARIOS:
+        for label, urls in (("sync", "api.urls"), ("async", "api.async_urls")):
+            with override_settings(ROOT_URLCONF=urls), Timer() as timer:
+                asyncio.run(run_connections(urls, key, pks, args.connections, args.requests, scenario))
+            print(f"{scenario:14} {label:5}: {total / timer.elapsed:8.1f} req/s "
+                  f"({args.connections} connections x {args.requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
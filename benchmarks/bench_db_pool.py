@@ -0,0 +1,68 @@
+"""
+Request latency with a new database connection per request (Django's
+default CONN_MAX_AGE = 0) vs the pooled backend (api.db), on a SQLite file.
+
+    python -m benchmarks.bench_db_pool --requests 500 --connect-latency 3
+
+Opening a SQLite file costs microseconds, unlike a MySQL TCP + auth
+handshake; --connect-latency adds a sleep to every real connect to stand in
+for it. Requests are GET /v1/product/?page_size=1, one query each.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import setup_django
+
+ENGINES = (
+    ("unpooled", "django.db.backends.sqlite3"),
+    ("pooled", "api.db.sqlite3"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Milliseconds added to each connect.")
+    args = parser.parse_args()
+
+    setup_django(threaded=True)
+    from django.db import close_old_connections, connections
+    from django.db.backends.sqlite3 import base as sqlite_base
+    from rest_framework.test import APIClient
+    from api.db.pool import pool_stats
+    from api.models import Product, User
+
+    owner = User.objects.create_user(email="bench-pool@example.com", password="benchpass")
+    Product.objects.create(name="Pooled", sku="POOL-1", manufacturer="Bench", owner=owner)
+    connections["default"].close()
+
+    connect = sqlite_base.DatabaseWrapper.get_new_connection
+
+    def slow_connect(self, conn_params):
+        time.sleep(args.connect_latency / 1000)
+        return connect(self, conn_params)
+
+    sqlite_base.DatabaseWrapper.get_new_connection = slow_connect
+
+    client = APIClient()
+    for label, engine in ENGINES:
+        connections.settings["default"].update(ENGINE=engine, CONN_MAX_AGE=0, POOL={"MAX_SIZE": 4})
+        connections["default"] = connections.create_connection("default")
+        timings = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            response = client.get("/v1/product/?page_size=1")
+            # What a server's request_finished handler does; the test client skips it
+            close_old_connections()
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200
+        timings.sort()
+        print(f"{label:8}: mean {statistics.mean(timings):6.3f} ms, "
+              f"p50 {timings[len(timings) // 2]:6.3f} ms, p99 {timings[int(len(timings) * 0.99)]:6.3f} ms")
+        connections["default"].close()
+    print("pool:", pool_stats()["default"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Endpoint benchmark suite: latency, throughput and exact query counts of the
+main API endpoints, with a JSON baseline to compare later runs against.
+
+    python -m benchmarks.bench_endpoints --output benchmarks/baseline.json
+    python -m benchmarks.bench_endpoints --compare benchmarks/baseline.json --threshold 0.25
+
+Requests go through the test client against webapp.settings_test (SQLite;
+--threads > 1 switches to a temporary SQLite file). Each scenario first
+sends one request with every cache empty ("queries_cold"), then --warmup
+untimed requests, then --iterations timed ones per thread, and finally one
+counted request in the warm state ("queries").
+
+--compare exits with status 1 when a scenario's p50 or mean latency grew, or
+its throughput fell, by more than --threshold (a fraction), or when any query
+count grew at all. Latency baselines only compare on the same machine; query
+counts compare anywhere.
+"""
+import argparse
+import base64
+import itertools
+import json
+import platform
+import statistics
+import sys
+import threading
+import time
+from functools import partial
+
+from benchmarks.common import run_threads, setup_django
+
+PASSWORD = "benchpass1"
+SCENARIOS = {}
+_sequence = itertools.count()
+
+
+def scenario(name, status):
+    """Register ``factory(count)``, which returns ``count`` zero-argument request callables."""
+    def register(factory):
+        SCENARIOS[name] = (factory, status)
+        return factory
+    return register
+
+
+def token_client(user):
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.get(user=user).key}")
+    return client
+
+
+def basic_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    credentials = base64.b64encode(f"{user.email}:{PASSWORD}".encode()).decode()
+    client.credentials(HTTP_AUTHORIZATION=f"Basic {credentials}")
+    return client
+
+
+def make_user():
+    from api.models import User
+    return User.objects.create_user(email=f"bench-{next(_sequence)}@example.com", password=PASSWORD)
+
+
+def make_product(owner):
+    from api.models import Product
+    n = next(_sequence)
+    return Product.objects.create(
+        name=f"Bench {n}", description="Benchmark product", sku=f"BENCH-{n}", manufacturer="Bench",
+        quantity=100, owner=owner,
+    )
+
+
+def product_data():
+    n = next(_sequence)
+    return {"name": f"Bench {n}", "description": "Created by the benchmark", "sku": f"BENCH-{n}",
+            "manufacturer": "Bench", "quantity": 5}
+
+
+@scenario("GET /healthz", 200)
+def healthz(count):
+    from rest_framework.test import APIClient
+    client = APIClient()
+    return [partial(client.get, "/healthz")] * count
+
+
+@scenario("GET /v1/product/ (anonymous)", 200)
+def product_list(count):
+    from rest_framework.test import APIClient
+    owner = make_user()
+    for _ in range(20):
+        make_product(owner)
+    client = APIClient()
+    return [partial(client.get, "/v1/product/?page_size=20")] * count
+
+
+@scenario("GET /v1/product/{id}/ (anonymous)", 200)
+def product_retrieve(count):
+    from rest_framework.test import APIClient
+    product = make_product(make_user())
+    client = APIClient()
+    return [partial(client.get, f"/v1/product/{product.pk}/")] * count
+
+
+@scenario("POST /v1/product/ (token)", 201)
+def product_create(count):
+    client = token_client(make_user())
+    return [partial(client.post, "/v1/product/", product_data(), format="json") for _ in range(count)]
+
+
+@scenario("PATCH /v1/product/{id}/ (token)", 200)
+def product_update(count):
+    owner = make_user()
+    product = make_product(owner)
+    client = token_client(owner)
+    url = f"/v1/product/{product.pk}/"
+    return [partial(client.patch, url, {"quantity": i % 50}, format="json") for i in range(count)]
+
+
+@scenario("DELETE /v1/product/{id}/ (token)", 204)
+def product_delete(count):
+    owner = make_user()
+    client = token_client(owner)
+    return [partial(client.delete, f"/v1/product/{make_product(owner).pk}/") for _ in range(count)]
+
+
+@scenario("GET /v1/user/self/ (token)", 200)
+def user_self_token(count):
+    client = token_client(make_user())
+    return [partial(client.get, "/v1/user/self/")] * count
+
+
+@scenario("GET /v1/user/self/ (basic, cached)", 200)
+def user_self_basic(count):
+    client = basic_client(make_user())
+    return [partial(client.get, "/v1/user/self/")] * count
+
+
+@scenario("GET /v1/user/self/ (basic, bcrypt)", 200)
+def user_self_basic_uncached(count):
+    # A different account per request, so every request verifies a password
+    return [partial(basic_client(make_user()).get, "/v1/user/self/") for _ in range(count)]
+
+
+@scenario("POST /v1/user/", 201)
+def signup(count):
+    from rest_framework.test import APIClient
+    client = APIClient()
+    return [
+        partial(client.post, "/v1/user/", {
+            "email": f"signup-{next(_sequence)}@example.com", "password": PASSWORD,
+            "first_name": "Bench", "last_name": "User",
+        }, format="json")
+        for _ in range(count)
+    ]
+
+
+def clear_caches():
+    from django.core.cache import caches
+    from api.authentication import get_credential_cache, get_token_cache
+
+    for cache in caches.all():
+        cache.clear()
+    get_token_cache().clear()
+    get_credential_cache().clear()
+
+
+def count_queries(request, status):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        response = request()
+    assert response.status_code == status, (response.status_code, getattr(response, "data", None))
+    return len(queries)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def measure(name, iterations, warmup, threads):
+    factory, status = SCENARIOS[name]
+    clear_caches()
+    queries_cold = count_queries(factory(1)[0], status)
+
+    timings = []
+    lock = threading.Lock()
+
+    def worker(requests):
+        local = []
+        for request in requests[:warmup]:
+            request()
+        for request in requests[warmup:warmup + iterations]:
+            started = time.perf_counter()
+            response = request()
+            local.append(time.perf_counter() - started)
+            assert response.status_code == status, (name, response.status_code)
+        with lock:
+            timings.extend(local)
+
+    # Built up front so fixtures are not timed; one extra request per batch
+    # counts the warm queries on the same fixtures afterwards
+    batches = [factory(warmup + iterations + 1) for _ in range(threads)]
+    started = time.perf_counter()
+    if threads == 1:
+        worker(batches[0])
+    else:
+        pending = iter(batches)
+        run_threads(lambda: worker(next(pending)), threads)
+    elapsed = time.perf_counter() - started
+
+    queries = count_queries(batches[0][-1], status)
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": percentile(timings, 0.5) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        # Includes warmup requests, which ran inside the same window
+        "throughput_rps": threads * (warmup + iterations) / elapsed,
+        "queries": queries,
+        "queries_cold": queries_cold,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print a comparison table and return the number of regressions."""
+    regressions = 0
+    print(f"\n{'scenario':40} {'metric':15} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:40} (not in baseline)")
+            continue
+        for metric, higher_is_worse in (("p50_ms", True), ("mean_ms", True), ("throughput_rps", False)):
+            change = now[metric] / before[metric] - 1 if before[metric] else 0.0
+            worse = change > threshold if higher_is_worse else change < -threshold
+            better = change < -threshold if higher_is_worse else change > threshold
+            flag = "REGRESSION" if worse else ("improved" if better else "")
+            regressions += worse
+            print(f"{name:40} {metric:15} {before[metric]:10.2f} {now[metric]:10.2f} {change:+8.1%} {flag}")
+        for metric in ("queries", "queries_cold"):
+            if now[metric] != before[metric]:
+                worse = now[metric] > before[metric]
+                regressions += worse
+                print(f"{name:40} {metric:15} {before[metric]:10d} {now[metric]:10d} "
+                      f"{now[metric] - before[metric]:+8d} {'REGRESSION' if worse else 'improved'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="Timed requests per scenario and thread.")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--only", help="Run scenarios whose name contains this text.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    setup_django(threaded=args.threads > 1)
+    import django
+
+    names = [name for name in SCENARIOS if not args.only or args.only in name]
+    results = {}
+    print(f"{'scenario':40} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'queries':>8} {'cold':>5}")
+    for name in names:
+        result = results[name] = measure(name, args.iterations, args.warmup, args.threads)
+        print(f"{name:40} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f} "
+              f"{result['throughput_rps']:9.1f} {result['queries']:8d} {result['queries_cold']:5d}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "machine": platform.machine(),
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "threads": args.threads,
+            },
+            "scenarios": results,
+        }
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline["scenarios"], results, args.threshold)
+        if regressions:
+            print(f"\n{regressions} regression(s) beyond {args.threshold:.0%} or in query counts")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
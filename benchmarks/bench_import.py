@@ -0,0 +1,61 @@
+"""
+Rows/second of the bulk product import at several chunk sizes.
+
+    python -m benchmarks.bench_import --rows 20000 --chunk-sizes 100 500 1000 5000
+"""
+import argparse
+import json
+from io import BytesIO
+
+from benchmarks.common import Timer, setup_django
+
+
+def build_ndjson(rows, prefix):
+    lines = (
+        json.dumps({
+            "name": f"Product {i}",
+            "description": "Benchmark product " * 4,
+            "sku": f"{prefix}-{i}",
+            "manufacturer": "Acme",
+            "quantity": i % 100,
+        })
+        for i in range(rows)
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 500, 1000, 5000])
+    args = parser.parse_args()
+
+    setup_django()
+    from api.importers import ProductImporter, iter_rows
+    from api.models import Product, User
+
+    owner = User.objects.create_user(email="bench-import@example.com", password="benchpass")
+
+    print(f"{'chunk size':>10} {'rows':>8} {'seconds':>8} {'rows/s':>10}")
+
+    # Baseline: what POST /v1/product/ does per row (serializer checks + single INSERT)
+    from api.serializers import ProductSerializer
+    baseline_rows = min(args.rows, 2000)
+    with Timer() as timer:
+        for line in build_ndjson(baseline_rows, "SINGLE").splitlines():
+            serializer = ProductSerializer(data=json.loads(line))
+            serializer.is_valid(raise_exception=True)
+            serializer.save(owner=owner)
+    print(f"{'per row':>10} {baseline_rows:>8} {timer.elapsed:>8.2f} {baseline_rows / timer.elapsed:>10.0f}")
+
+    for chunk_size in args.chunk_sizes:
+        Product.objects.all().delete()
+        body = BytesIO(build_ndjson(args.rows, f"C{chunk_size}"))
+        with Timer() as timer:
+            report = ProductImporter(owner, chunk_size=chunk_size).run(iter_rows(body, "ndjson"))
+        assert report["created"] == args.rows, report["errors"][:3]
+        print(f"{chunk_size:>10} {args.rows:>8} {timer.elapsed:>8.2f} {args.rows / timer.elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Checkout throughput on one hot SKU: reservation holds vs direct quantity updates.
+
+"direct" decrements ``Product.quantity`` with a conditional F() update, so
+every checkout writes the same product row. "holds" inserts a reservation
+row and checks availability, leaving the product row untouched until
+``settle()`` applies all committed holds in one batch.
+
+    python -m benchmarks.bench_reservations --threads 8 --checkouts 200
+
+SQLite serialises all writers, so the row-lock contention this avoids on
+MySQL only shows up there; run with DJANGO_SETTINGS_MODULE=webapp.settings
+against a MySQL instance for meaningful numbers.
+"""
+import argparse
+
+from benchmarks.common import Timer, run_threads, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--checkouts", type=int, default=200, help="Checkouts per thread.")
+    args = parser.parse_args()
+
+    setup_django(threaded=True)
+    from api.inventory import InsufficientStock, apply_adjustments
+    from api.models import Product, StockReservation, User
+    from api import reservations
+
+    seller = User.objects.create_user(email="bench-seller@example.com", password="benchpass")
+    buyer = User.objects.create_user(email="bench-buyer@example.com", password="benchpass")
+    total = args.threads * args.checkouts
+
+    def direct(product_id):
+        for _ in range(args.checkouts):
+            try:
+                apply_adjustments(seller, [{"id": product_id, "delta": -1}])
+            except InsufficientStock:
+                pass
+
+    def holds(product_id):
+        for _ in range(args.checkouts):
+            try:
+                hold = reservations.reserve(product_id, buyer, 1)
+                reservations.commit(hold.pk, buyer)
+            except InsufficientStock:
+                pass
+
+    print(f"{'mode':>8} {'checkouts':>10} {'seconds':>8} {'checkouts/s':>12}")
+    for mode, worker in (("direct", direct), ("holds", holds)):
+        product = Product.objects.create(
+            name="Hot", sku=f"HOT-{mode}", manufacturer="Acme", quantity=total, owner=seller
+        )
+        with Timer() as timer:
+            run_threads(worker, args.threads, product.pk)
+            if mode == "holds":
+                while reservations.settle(batch_size=1000)[0]:
+                    pass
+        product.refresh_from_db()
+        assert product.quantity == 0, product.quantity
+        assert not StockReservation.objects.filter(product=product).exists()
+        print(f"{mode:>8} {total:>10} {timer.elapsed:>8.2f} {total / timer.elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Read serialization micro-benchmarks: ProductSerializer(many=True).data vs
+the precompiled ReadSerializer (from instances and from values_list rows),
+and DRF's JSONRenderer vs FastJSONRenderer on the result.
+
+    python -m benchmarks.bench_serializers --sizes 1 100 10000
+"""
+import argparse
+
+from benchmarks.common import Timer, setup_django
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            func()
+        timings.append(timer.elapsed)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from api.models import Product, User
+    from api.renderers import FastJSONRenderer
+    from api.serializers import ProductSerializer, product_reader
+
+    owner = User.objects.create_user(email="bench-serializers@example.com", password="benchpass")
+    Product.objects.bulk_create(
+        Product(name=f"Product {i}", description="Bench product", sku=f"SER-{i}", manufacturer="Bench",
+                quantity=i % 50, owner=owner)
+        for i in range(max(args.sizes))
+    )
+
+    print(f"{'products':>8} {'case':28} {'ms':>9}")
+    for size in args.sizes:
+        queryset = Product.objects.order_by("id")[:size]
+        instances = list(queryset)
+        data = product_reader.many(instances)
+        cases = [
+            ("ProductSerializer.data", lambda: ProductSerializer(instances, many=True).data),
+            ("ReadSerializer (instances)", lambda: product_reader.many(instances)),
+            ("ReadSerializer (values_list)", lambda: product_reader.from_queryset(queryset)),
+            ("JSONRenderer", lambda: JSONRenderer().render(data)),
+            ("FastJSONRenderer", lambda: FastJSONRenderer().render(data)),
+        ]
+        with override_settings(JSON_BACKEND="orjson"):
+            for label, func in cases:
+                print(f"{size:>8} {label:28} {best_of(args.repeat, func) * 1000:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Signup throughput: POST /v1/user/ one account at a time, and the
+bulk_create_users command with 1 and N hashing processes.
+
+    python -m benchmarks.bench_signup --signups 50 --bulk 2000 --workers 4
+
+bcrypt dominates both paths, so results scale with the hasher's work factor.
+"""
+import argparse
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from benchmarks.common import Timer, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signups", type=int, default=50)
+    parser.add_argument("--bulk", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries, Timer() as timer:
+        for i in range(args.signups):
+            response = client.post("/v1/user/", {
+                "email": f"signup{i}@example.com", "password": "benchpass",
+                "first_name": "Bench", "last_name": "User",
+            }, format="json")
+            assert response.status_code == 201, response.data
+    print(f"POST /v1/user/: {args.signups / timer.elapsed:.1f} signups/s, "
+          f"{len(queries) / args.signups:.1f} queries/signup")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["email", "password", "first_name", "last_name"])
+        for i in range(args.bulk):
+            writer.writerow([f"bulk{i}@example.com", f"pass{i}", "Bulk", "User"])
+    try:
+        for workers in sorted({1, args.workers}):
+            from api.models import User
+            User.objects.filter(email__startswith="bulk").delete()
+            with Timer() as timer:
+                call_command("bulk_create_users", handle.name, "--workers", str(workers), stdout=StringIO())
+            print(f"bulk_create_users --workers {workers}: {args.bulk / timer.elapsed:.1f} accounts/s")
+    finally:
+        os.remove(handle.name)
+
+
+if __name__ == "__main__":
+    main()
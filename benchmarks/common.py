@@ -0,0 +1,83 @@
+"""
+Shared setup for the scripts in this directory.
+
+Benchmarks run against the in-memory SQLite database from
+``webapp.settings_test`` so they need no MySQL server; absolute numbers are
+therefore only comparable with other runs of the same script.
+"""
+import atexit
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(settings_module="webapp.settings_test", threaded=False, sqlite=False, test_environment=True):
+    """
+    Configure Django and create the schema.
+
+    ``threaded=True`` swaps the in-memory database for a temporary SQLite
+    file, since every thread gets its own connection and a private
+    ``:memory:`` database would be empty. ``sqlite=True`` runs a MySQL-backed
+    profile (``webapp.settings``, ``webapp.settings_api``) on in-memory
+    SQLite. ``test_environment=False`` keeps the profile's ``DEBUG``, which
+    ``setup_test_environment`` turns off.
+    """
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if sqlite:
+        settings.DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+        settings.HEALTHCHECK = {**settings.HEALTHCHECK, "BACKGROUND": False}
+    if threaded and settings.DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+        handle, path = tempfile.mkstemp(prefix="webapp-bench-", suffix=".sqlite3")
+        os.close(handle)
+        atexit.register(os.remove, path)
+        settings.DATABASES["default"]["NAME"] = path
+        settings.DATABASES["default"].setdefault("OPTIONS", {})["timeout"] = 30
+
+    # Benchmarks send far more requests per client than any throttle allows
+    settings.THROTTLING = {**settings.THROTTLING, "ENABLED": False}
+    # and run more concurrent requests than admission control admits
+    settings.ADMISSION_CONTROL = {**settings.ADMISSION_CONTROL, "ENABLED": False}
+    django.setup()
+    if test_environment:
+        # Lets the test client's "testserver" host through ALLOWED_HOSTS
+        from django.test.utils import setup_test_environment
+        setup_test_environment()
+    call_command("migrate", verbosity=0)
+
+
+def run_threads(target, threads, *args):
+    """Run ``target(*args)`` in ``threads`` threads, closing each thread's DB connection."""
+    from django.db import connection
+
+    def runner():
+        try:
+            target(*args)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=runner) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
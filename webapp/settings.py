@@ -10,8 +10,15 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.admission.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +60,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'webapp.urls'
@@ -77,26 +87,217 @@ WSGI_APPLICATION = 'webapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connection settings come from the environment (defaults match
+# docker-compose.yml). Without DB_POOL each thread keeps its connection open
+# for DB_CONN_MAX_AGE seconds and pings it before reuse (CONN_HEALTH_CHECKS).
+# With DB_POOL=1 connections come from a bounded per-process pool
+# (api.db.mysql); every request returns its connection, so CONN_MAX_AGE is 0
+# and reuse, pinging and recycling are the pool's job.
+DB_POOL = env_bool('DB_POOL', False)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': 'webapp_db',
-        'USER': 'webapp_user',
-        'PASSWORD': 'mypassword@234',
-        'HOST': '127.0.0.1',
-        'PORT': '3307',
+        'ENGINE': 'api.db.mysql' if DB_POOL else 'django.db.backends.mysql',
+        'NAME': os.environ.get('DB_NAME', 'webapp_db'),
+        'USER': os.environ.get('DB_USER', 'webapp_user'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'mypassword@234'),
+        'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DB_PORT', '3307'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', True),
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '5')),  # seconds to wait for a free connection
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),  # below MySQL's wait_timeout
+            'MAX_IDLE': int(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+            'CHECK_INTERVAL': int(os.environ.get('DB_POOL_CHECK_INTERVAL', '30')),  # ping if idle longer
+        },
     }
 }
 
+# Read replicas. DB_REPLICA_HOSTS is a comma-separated list of host[:port]
+# serving copies of DB_NAME (same credentials), added as "replica1",
+# "replica2", ...; DB_REPLICA_WEIGHTS optionally weights them (default 1).
+# Safe-method requests read api tables from a replica chosen by STRATEGY
+# ("weighted" or "least_loaded"); a client that wrote reads from the primary
+# for STICKY_SECONDS, and a failing replica is skipped for FAILURE_COOLDOWN.
+DATABASE_REPLICAS = {
+    'ALIASES': {},  # alias -> weight
+    'STRATEGY': os.environ.get('DB_REPLICA_STRATEGY', 'weighted'),
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5')),
+    'FAILURE_COOLDOWN': int(os.environ.get('DB_REPLICA_FAILURE_COOLDOWN', '30')),
+    'CACHE_ALIAS': 'default',
+    'APP_LABELS': ['api'],
+}
+
+_replica_weights = [int(weight) for weight in os.environ.get('DB_REPLICA_WEIGHTS', '').split(',') if weight.strip()]
+for _index, _host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    _host, _, _port = _host.strip().partition(':')
+    _alias = f'replica{_index + 1}'
+    DATABASES[_alias] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS['ALIASES'][_alias] = _replica_weights[_index] if _index < len(_replica_weights) else 1
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
 #Django Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        "rest_framework.authentication.BasicAuthentication",
+        'api.authentication.CachedTokenAuthentication',
+        "api.authentication.CachedBasicAuthentication",
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.BucketThrottle',
+    ],
+    # Trusted reverse proxies in front of the app. With 0, client IPs for
+    # throttling come from REMOTE_ADDR and X-Forwarded-For (which any client
+    # can set) is ignored; with N, the Nth address from the right is used.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
+}
+
+# JSON encoder/decoder behind api.renderers: "orjson" (used when the optional
+# orjson package is installed) or "json" for the stdlib.
+JSON_BACKEND = "orjson"
+
+# Verified Basic-auth credentials are cached so bcrypt only runs on a miss
+BASIC_AUTH_CACHE = {
+    "MAX_SIZE": 1024,
+    "TTL": 300,  # seconds
+}
+
+# Token -> user snapshots, so token-authenticated requests skip the
+# authtoken_token/api_user join. Set SHARED_CACHE to a CACHES alias to share
+# entries across worker processes.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": 4096,
+    # Without SHARED_CACHE, also how long other processes may still accept a
+    # deleted token or a deactivated user
+    "TTL": 60,  # seconds
+    "SHARED_CACHE": None,
+}
+
+# Token-bucket throttling (api.throttling). A view's throttle_scope picks an
+# entry of RATES with limits per client IP, per user and per token; a rate of
+# "N/period" ("s", "m", "h", "d", optionally "N/15m") allows bursts of N and
+# refills N per period. AUTH_FAILURES limits failed Basic-auth password
+# checks per client IP and per account: once used up, requests get a 429
+# before bcrypt runs. Buckets live in a per-process LRU of MAX_BUCKETS; set
+# SHARED_CACHE to a CACHES alias to also enforce the limits across workers.
+THROTTLING = {
+    "ENABLED": True,
+    "MAX_BUCKETS": 100000,
+    "SHARED_CACHE": None,
+    "RATES": {
+        "default": {"ip": "600/m", "user": "600/m", "token": "600/m"},
+        "product_read": {"ip": "1200/m", "user": "1200/m", "token": "1200/m"},
+        "signup": {"ip": "20/h"},
+    },
+    "AUTH_FAILURES": {
+        "ip": "30/10m",
+        "account": "10/h",
+    },
+}
+
+# Caches. LocMemCache is per process; point "default" at Redis or Memcached
+# to share entries between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "webapp-default",
+    }
+}
+
+# Read-through cache of serialized products for GET /v1/product/<pk>/.
+# Entries are fresh for TTL seconds, then served stale for up to STALE_TTL
+# more while one request refreshes them.
+PRODUCT_CACHE = {
+    "CACHE_ALIAS": "default",
+    "TTL": 60,  # seconds
+    "STALE_TTL": 30,
+    "LOCK_TIMEOUT": 5,
+}
+
+# Bulk product import (POST /v1/product/import/ and `manage.py import_products`)
+PRODUCT_IMPORT = {
+    "CHUNK_SIZE": 500,  # rows validated and upserted per transaction
+    "MAX_CHUNK_SIZE": 5000,
+}
+
+# Stock holds (POST /v1/product/<pk>/reservations/). Committed holds are
+# deducted from Product.quantity by `manage.py settle_reservations`.
+STOCK_RESERVATIONS = {
+    "HOLD_TTL": 600,  # seconds before an uncommitted hold expires
+    "MAX_QUANTITY": 100,  # units per hold
+}
+
+# /healthz readiness is answered from an in-memory result refreshed by a
+# background prober. PROBE_MODE is "select" (SELECT 1) or "heartbeat"
+# (updates a single HealthCheck row).
+HEALTHCHECK = {
+    "PROBE_INTERVAL": 5,  # seconds
+    "PROBE_MODE": "select",
+    "BACKGROUND": True,
+}
+
+# Serve the product and user detail endpoints (and product create) from the
+# native async views in api.async_views. Only useful under ASGI (webapp.asgi);
+# under WSGI every async view is run through an event loop per request.
+ASYNC_API_VIEWS = False
+
+# Request metrics (api.metrics.MetricsMiddleware), scraped from /metrics in
+# the Prometheus text format. QUERY_BUDGET is "off", "log" or "raise": what to
+# do when a view runs more queries than its query_budget attribute or its
+# QUERY_BUDGETS entry (URL pattern -> count).
+METRICS = {
+    "ENABLED": True,
+    "LATENCY_BUCKETS": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],  # seconds
+    "QUERY_BUDGET": "log",
+    "QUERY_BUDGETS": {},
+}
+
+# Load shedding (api.admission.AdmissionControlMiddleware), per process.
+# Reads may fill all MAX_IN_FLIGHT concurrent request slots, writes and
+# signups only their PRIORITIES share. While the moving average of request
+# latency is above TARGET_LATENCY, writes and signups are refused and
+# /healthz answers 503 so the load balancer drains the instance; the average
+# decays while no request finishes, so a drained instance recovers. Refused
+# requests get a 503 with Retry-After: RETRY_AFTER.
+ADMISSION_CONTROL = {
+    "ENABLED": True,
+    "MAX_IN_FLIGHT": 32,
+    "TARGET_LATENCY": 1.0,  # seconds
+    "SMOOTHING": 0.2,  # weight of the latest request in the moving average
+    "HALF_LIFE": 5.0,  # seconds without a finished request for the average to halve
+    "PRIORITIES": {"read": 1.0, "write": 0.75, "signup": 0.5},
+    "RETRY_AFTER": 5,  # seconds
+}
+
+# Password hashing runs on a bounded pool (api.hashing) rather than on request
+# threads. EXECUTOR is "thread" (bcrypt releases the GIL) or "process". Up to
+# MAX_PENDING hashes may be queued or running; callers wait ACQUIRE_TIMEOUT
+# seconds for a slot and then get a 503. BCRYPT_ROUNDS is the work factor.
+PASSWORD_HASHING = {
+    "EXECUTOR": "thread",
+    "WORKERS": 4,
+    "MAX_PENDING": 64,
+    "ACQUIRE_TIMEOUT": 2,  # seconds
+    "BCRYPT_ROUNDS": 12,
 }
 
 
@@ -121,7 +322,7 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'api.hashing.ConfigurableBCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.BCryptPasswordHasher',
 ]
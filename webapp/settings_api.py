@@ -0,0 +1,57 @@
+"""
+Settings profile for API-only workers:
+
+    DJANGO_SETTINGS_MODULE=webapp.settings_api gunicorn webapp.wsgi
+
+The API authenticates with Token/Basic credentials only, so the session,
+CSRF, auth, messages and clickjacking middleware and the admin, sessions,
+messages and staticfiles apps are left out, along with the browsable API.
+Serve /admin/ from workers running webapp.settings.
+"""
+from .settings import *
+
+# DEBUG also wraps every cursor to record its queries
+DEBUG = env_bool('DEBUG', False)
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'rest_framework.authtoken',
+    'api',
+]
+
+MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.admission.AdmissionControlMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'api.routers.ReplicaRoutingMiddleware',
+]
+
+ROOT_URLCONF = 'webapp.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+    ],
+}
+
+# JSON responses are not framed, and no view relies on cookie authentication
+SILENCED_SYSTEM_CHECKS = ['security.W002', 'security.W003']
@@ -4,5 +4,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',   # in-memory database
-    }
+    },
+    # Mirrors of default for api.routers tests; unused unless a test lists
+    # them in DATABASE_REPLICAS
+    'replica1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+    'replica2': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
+
+# Probe inline in tests; a background thread would outlive the test database
+HEALTHCHECK = {**HEALTHCHECK, "BACKGROUND": False}
+
+# Minimum bcrypt work factor; production hashes still verify
+PASSWORD_HASHING = {**PASSWORD_HASHING, "BCRYPT_ROUNDS": 4}
+
+# A view over its declared query budget fails the test
+METRICS = {**METRICS, "QUERY_BUDGET": "raise"}
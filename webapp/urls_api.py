@@ -0,0 +1,11 @@
+"""
+URL configuration for API-only workers (webapp.settings_api): the API
+without the admin site.
+"""
+from django.conf import settings
+from django.urls import path, include
+
+
+urlpatterns = [
+    path('', include('api.async_urls' if settings.ASYNC_API_VIEWS else 'api.urls')),
+]